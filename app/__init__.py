@@ -5,6 +5,7 @@ from app.config import settings
 from app.containers import Container
 from app.extensions import init_celery, socketio, db
 from app.core.logger_config import logger
+from app.services.best_classification import register_best_classification_listener
 from app.models import *
 
 
@@ -27,8 +28,10 @@ def create_app(container: Container | None = None) -> Flask:
     celery = init_celery(app)
         
     db.init_app(app)
+    register_best_classification_listener()
     with app.app_context():
         #db.drop_all()
         db.create_all()
+        container.tipi_index().ensure_fresh(db.session)
 
     return app
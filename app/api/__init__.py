@@ -1,8 +1,14 @@
 from flask import Flask
 from flask_restful import Api
 
-from app.api.classification_resource import PartnumberClassification
+from app.api.cache_resource import ClassificationCacheStats
+from app.api.classification_resource import BatchPartnumberClassification, PartnumberClassification, UploadPartnumberClassification
+from app.api.export_resource import ClassificationExportResource
 from app.api.health_check import CheckWebSocketConnection, HealthCheck
+from app.api.metrics_resource import MetricsResource
+from app.api.partnumber_resource import PartnumberClassificationsResource, PartnumberResource
+from app.api.task_resource import TaskEventsPollResource, TaskEventsResource, TaskStatusResource
+from app.api.tipi_resource import TipiLookupResource, TipiSearchResource
     
 
 def initialize_api(app: Flask) -> Api:
@@ -11,5 +17,17 @@ def initialize_api(app: Flask) -> Api:
     api.add_resource(HealthCheck, "/")
     api.add_resource(CheckWebSocketConnection, "/ws")
     api.add_resource(PartnumberClassification, "/classify-partnumber")
+    api.add_resource(BatchPartnumberClassification, "/classify-partnumbers")
+    api.add_resource(UploadPartnumberClassification, "/classify-partnumbers/upload")
+    api.add_resource(ClassificationCacheStats, "/cache/stats")
+    api.add_resource(MetricsResource, "/metrics")
+    api.add_resource(ClassificationExportResource, "/classifications/export")
+    api.add_resource(TaskStatusResource, "/tasks/<string:task_id>")
+    api.add_resource(TaskEventsResource, "/tasks/<string:task_id>/events")
+    api.add_resource(TaskEventsPollResource, "/tasks/<string:task_id>/events/poll")
+    api.add_resource(TipiSearchResource, "/tipi/search")
+    api.add_resource(TipiLookupResource, "/tipi/<string:ncm>")
+    api.add_resource(PartnumberResource, "/partnumbers/<string:code>")
+    api.add_resource(PartnumberClassificationsResource, "/partnumbers/<string:code>/classifications")
 
     return api
@@ -0,0 +1,19 @@
+from flask_restful import Resource
+from dependency_injector.wiring import inject, Provide
+
+from app.containers import Container
+from app.services.classification_cache import ClassificationCache
+
+
+class ClassificationCacheStats(Resource):
+    @inject
+    def __init__(
+        self,
+        cache: ClassificationCache = Provide[Container.classification_cache],
+    ):
+        self.cache = cache
+        super().__init__()
+
+
+    def get(self):
+        return self.cache.stats(), 200
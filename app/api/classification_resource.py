@@ -6,8 +6,21 @@ import uuid
 
 from app.containers import Container
 from app.core.logger_config import logger
-from app.schemas.classification_schemas import SingleClassificationRequest, StartSingleClassificationSchema
+from app.core.metrics import ENQUEUE_SECONDS, REQUEST_VALIDATION_SECONDS
+from app.core.tracing import span, traced
+from app.schemas.classification_schemas import BatchClassificationRequest, SingleClassificationRequest, StartBatchClassificationSchema, StartSingleClassificationSchema
+from app.services.admission import AdmissionController, AdmissionDecision
+from app.services.ai_rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE
 from app.services.protocols import IClassificationService
+from app.services.upload_ingestion import UploadFileError, read_upload_rows, upload_format
+
+
+def admission_rejected(decision: AdmissionDecision):
+    """Recusa do controle de admissão, com o `Retry-After` no cabeçalho e no corpo."""
+    return {
+        "message": decision.reason,
+        "retry_after": decision.retry_after,
+    }, decision.status, {"Retry-After": str(decision.retry_after)}
 
 
 class PartnumberClassification(Resource):
@@ -15,22 +28,40 @@ class PartnumberClassification(Resource):
     def __init__(
         self, 
         service: IClassificationService = Provide[Container.classification_service],
+        admission: AdmissionController = Provide[Container.admission_controller],
     ):
         self.service = service
+        self.admission = admission
         super().__init__()
 
 
+    @traced("http.classify_partnumber")
     def post(self):
         try:
-            body = SingleClassificationRequest(**request.get_json())
+            with REQUEST_VALIDATION_SECONDS.labels("classify-partnumber").time():
+                body = SingleClassificationRequest(**request.get_json())
         except ValidationError as e:
             return {"errors": e.errors()}, 400
+
+        cached = self.service.get_cached_classification(body)
+        if cached is not None:
+            logger.info(f"Classificação do partnumber {body.partnumber} servida pelo cache.")
+            return {
+                **cached.model_dump(),
+                "cached": True
+            }, 200
+
+        # o cache responde mesmo sob carga; só o que entraria na fila passa pela admissão
+        rejected = self.admission.check(PRIORITY_INTERACTIVE)
+        if rejected is not None:
+            return admission_rejected(rejected)
         
         room_id = str(uuid.uuid4())
         
         body = body.model_dump(exclude_none=True)
         body["room_id"] = room_id
-        task_id = self.service.start_single_classification(schema= StartSingleClassificationSchema(**body))
+        with ENQUEUE_SECONDS.labels("single").time(), span("api.enqueue", kind="single"):
+            task_id = self.service.start_single_classification(schema= StartSingleClassificationSchema(**body))
         
         print("Pedido de classificação foi recebido")
         return { 
@@ -38,5 +69,93 @@ class PartnumberClassification(Resource):
             "task_id": task_id,
             "room_id": room_id
         }, 202
-    
-    
\ No newline at end of file
+
+
+class BatchPartnumberClassification(Resource):
+    @inject
+    def __init__(
+        self, 
+        service: IClassificationService = Provide[Container.classification_service],
+        admission: AdmissionController = Provide[Container.admission_controller],
+    ):
+        self.service = service
+        self.admission = admission
+        super().__init__()
+
+
+    @traced("http.classify_partnumbers")
+    def post(self):
+        try:
+            with REQUEST_VALIDATION_SECONDS.labels("classify-partnumbers").time():
+                body = BatchClassificationRequest(**request.get_json())
+        except ValidationError as e:
+            return {"errors": e.errors()}, 400
+
+        rejected = self.admission.check(PRIORITY_BULK)
+        if rejected is not None:
+            return admission_rejected(rejected)
+
+        room_id = str(uuid.uuid4())
+
+        with ENQUEUE_SECONDS.labels("batch").time(), span("api.enqueue", kind="batch"):
+            task_id = self.service.start_batch_classification(
+                schema=StartBatchClassificationSchema(items=body.items, room_id=room_id)
+            )
+
+        logger.info(f"Pedido de classificação em lote recebido com {len(body.items)} itens.")
+        return {
+            "message": "Seu pedido de classificação em lote foi aceito...",
+            "task_id": task_id,
+            "room_id": room_id,
+            "total": len(body.items)
+        }, 202
+
+
+class UploadPartnumberClassification(Resource):
+    @inject
+    def __init__(
+        self,
+        service: IClassificationService = Provide[Container.classification_service],
+        admission: AdmissionController = Provide[Container.admission_controller],
+    ):
+        self.service = service
+        self.admission = admission
+        super().__init__()
+
+
+    @traced("http.upload_partnumbers")
+    def post(self):
+        """
+        Recebe a planilha como `multipart/form-data` (campo `file`) ou como corpo
+        cru (`text/csv` ou XLSX); o CSV cru é lido direto do corpo da requisição.
+        `room_id` opcional permite entrar na sala antes do envio.
+        """
+        # recusa antes de ler a planilha
+        rejected = self.admission.check(PRIORITY_BULK)
+        if rejected is not None:
+            return admission_rejected(rejected)
+
+        room_id = request.values.get("room_id") or str(uuid.uuid4())
+        encoding = request.values.get("encoding", "utf-8-sig")
+        upload = request.files.get("file")
+
+        try:
+            if upload is not None:
+                rows = read_upload_rows(upload.stream, upload_format(upload.filename, upload.mimetype), encoding)
+            else:
+                rows = read_upload_rows(request.stream, upload_format(None, request.mimetype), encoding)
+            report = self.service.start_upload_classification(rows, room_id)
+        except UploadFileError as e:
+            return {"errors": [{"message": str(e)}]}, 400
+
+        if report.task_id is None:
+            return {
+                "message": "Nenhuma linha válida encontrada na planilha.",
+                **report.model_dump(exclude={"task_id"}),
+            }, 400
+
+        logger.info(f"Planilha recebida: {report.total} linha(s) enfileirada(s) no lote {report.task_id}.")
+        return {
+            "message": "Seu pedido de classificação em lote foi aceito...",
+            **report.model_dump(),
+        }, 202
@@ -0,0 +1,35 @@
+from flask import Response, request
+from flask_restful import Resource
+from pydantic import ValidationError
+
+from app.config import settings
+from app.extensions import db
+from app.schemas.classification_schemas import ClassificationExportQuery
+from app.services.classification_export import MEDIA_TYPES, build_export_query, encode_export, iter_export_rows
+
+
+class ClassificationExportResource(Resource):
+    def get(self):
+        """
+        Exporta classificações em CSV ou NDJSON como resposta chunked. Filtros:
+        `created_from`, `created_to`, `status` (repetível), `manufacturer`,
+        `ncm_prefix` e `task_id`.
+        """
+        args = request.args.to_dict()
+        args["status"] = request.args.getlist("status")
+        try:
+            filters = ClassificationExportQuery(**args)
+        except ValidationError as e:
+            return {"errors": e.errors(include_url=False, include_context=False)}, 400
+
+        # a resposta é gerada depois que a view retorna: o gerador usa o engine, não a sessão da requisição
+        rows = iter_export_rows(db.engine, build_export_query(filters), settings.EXPORT_YIELD_PER)
+        return Response(
+            encode_export(rows, filters.format, settings.EXPORT_CHUNK_BYTES),
+            content_type=MEDIA_TYPES[filters.format],
+            headers={
+                "Content-Disposition": f"attachment; filename=classifications.{filters.format}",
+                # proxies não devem acumular a resposta inteira antes de repassá-la
+                "X-Accel-Buffering": "no",
+            },
+        )
@@ -0,0 +1,27 @@
+from flask import Response
+from flask_restful import Resource
+
+from app.core.logger_config import logger
+from app.core.metrics import ACTIVE_ROOMS, INFLIGHT_JOBS, render_metrics
+from app.extensions import socketio
+from app.tasks.progress_routes import count_active_routes
+
+
+def count_active_rooms() -> int:
+    """Salas do namespace padrão com clientes, sem contar a sala individual de cada sid."""
+    rooms = socketio.server.manager.rooms.get("/", {}) if socketio.server else {}
+    return sum(1 for room, members in rooms.items() if room is not None and members and room not in members)
+
+
+class MetricsResource(Resource):
+    def get(self):
+        """Métricas do processo web no formato texto do Prometheus."""
+        ACTIVE_ROOMS.set(count_active_rooms())
+        try:
+            INFLIGHT_JOBS.set(count_active_routes())
+        except Exception as e:
+            # sem Redis o scrape continua útil; o gauge mantém o último valor lido
+            logger.warning(f"Não foi possível contar os jobs em andamento: {e}")
+
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
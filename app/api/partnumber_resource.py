@@ -0,0 +1,90 @@
+from flask import request
+from flask_restful import Resource
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.extensions import db
+from app.models import Classification, Partnumber
+
+
+def serialize_classification(classification: Classification | None) -> dict | None:
+    if classification is None:
+        return None
+
+    tipi = classification.tipi
+    manufacturer = classification.manufacturer
+    return {
+        "id": classification.id,
+        "task_id": classification.task_id,
+        "status": classification.status.value if classification.status else None,
+        "confidence_rate": float(classification.confidence_rate) if classification.confidence_rate is not None else None,
+        "short_description": classification.short_description,
+        "long_description": classification.long_description,
+        "created_at": classification.created_at.isoformat() if classification.created_at else None,
+        "tipi": {
+            "id": tipi.id,
+            "ncm": tipi.ncm,
+            "ex": tipi.ex,
+            "description": tipi.description,
+            "tax": float(tipi.tax) if tipi.tax is not None else None,
+        } if tipi else None,
+        "manufacturer": {
+            "id": manufacturer.id,
+            "name": manufacturer.name,
+            "country": manufacturer.country,
+            "address": manufacturer.address,
+        } if manufacturer else None,
+    }
+
+
+class PartnumberResource(Resource):
+    def get(self, code: str):
+        # leitura única pelo índice de `code`, com a melhor classificação e suas relações no mesmo SELECT
+        partnumber = db.session.execute(
+            select(Partnumber)
+            .where(Partnumber.code == code)
+            .options(
+                joinedload(Partnumber.best_classification).joinedload(Classification.tipi),
+                joinedload(Partnumber.best_classification).joinedload(Classification.manufacturer),
+            )
+        ).scalar_one_or_none()
+        if partnumber is None:
+            return {"error": f"Partnumber {code} não encontrado."}, 404
+
+        return {
+            "id": partnumber.id,
+            "code": partnumber.code,
+            "best_classification": serialize_classification(partnumber.best_classification),
+        }, 200
+
+
+class PartnumberClassificationsResource(Resource):
+    def get(self, code: str):
+        """Histórico de classificações, da mais recente para a mais antiga, paginado por `before` (id)."""
+        limit = request.args.get("limit", settings.PARTNUMBER_HISTORY_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, settings.PARTNUMBER_HISTORY_MAX_PAGE_SIZE))
+        before = request.args.get("before", type=int)
+
+        stmt = (
+            select(Classification)
+            .join(Partnumber, Classification.partnumber_id == Partnumber.id)
+            .where(Partnumber.code == code)
+            .options(joinedload(Classification.tipi), joinedload(Classification.manufacturer))
+            .order_by(Classification.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(Classification.id < before)
+
+        classifications = db.session.execute(stmt).scalars().all()
+        if not classifications and before is None:
+            if db.session.execute(select(Partnumber.id).where(Partnumber.code == code)).first() is None:
+                return {"error": f"Partnumber {code} não encontrado."}, 404
+
+        page = classifications[:limit]
+        return {
+            "code": code,
+            "items": [serialize_classification(c) for c in page],
+            "next_cursor": page[-1].id if len(classifications) > limit else None,
+        }, 200
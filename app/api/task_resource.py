@@ -0,0 +1,175 @@
+import json
+import time
+from typing import Dict, List, Optional
+from flask import Response, request
+from flask_restful import Resource
+from dependency_injector.wiring import inject, Provide
+
+from app.config import settings
+from app.containers import Container
+from app.extensions import db
+from app.models import Task
+from app.services.task_events import EVENT_FIELDS, STREAM_START, TERMINAL_EVENTS, TaskEventHub, parse_event_id
+from app.services.task_state import TaskStateStore
+
+
+# intervalo de reconexão sugerido ao EventSource quando o stream cai
+SSE_RETRY_MS = 3000
+
+
+class TaskStatusResource(Resource):
+    @inject
+    def __init__(
+        self,
+        store: TaskStateStore = Provide[Container.task_state_store],
+    ):
+        self.store = store
+        super().__init__()
+
+
+    def get(self, task_id: str):
+        state = load_task_state(self.store, task_id)
+        if state is None:
+            return {"error": f"Task {task_id} não encontrada."}, 404
+        return state, 200
+
+
+def load_task_state(store: TaskStateStore, task_id: str) -> Optional[Dict]:
+    state = store.get(task_id)
+    if state is not None:
+        return {"task_id": task_id, "source": "live", **state}
+
+    # estado expirou no Redis: recorre à última gravação agregada no banco
+    task = db.session.get(Task, task_id)
+    if task is None:
+        return None
+
+    return {
+        "task_id": task.id,
+        "source": "database",
+        "status": task.status.value,
+        "current": task.current,
+        "total": task.total,
+        "message": task.message,
+        "room_id": task.room_id,
+        "job_id": task.job_id,
+    }
+
+
+def _initial_events(hub: TaskEventHub, store: TaskStateStore, task_id: str, after: str) -> Optional[List]:
+    """
+    Eventos a entregar na abertura da conexão. Sem histórico no stream (task
+    anterior ao stream ou já expirada dele), um cliente que chega sem
+    `Last-Event-ID` recebe o estado atual como evento sem id. None se a task não existe.
+    """
+    events = hub.read(task_id, after)
+    if events:
+        return events
+
+    state = load_task_state(store, task_id)
+    if state is None:
+        return None
+    if after != STREAM_START and state["status"] not in TERMINAL_EVENTS:
+        return []
+    return [(None, state["status"], {field: state[field] for field in EVENT_FIELDS if state.get(field) is not None})]
+
+
+def _format_sse(event_id: Optional[str], event: str, data: Dict) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class TaskEventsResource(Resource):
+    @inject
+    def __init__(
+        self,
+        store: TaskStateStore = Provide[Container.task_state_store],
+        hub: TaskEventHub = Provide[Container.task_event_hub],
+    ):
+        self.store = store
+        self.hub = hub
+        super().__init__()
+
+
+    def get(self, task_id: str):
+        """
+        Stream SSE do progresso da task: `started`, `processing`, `done` e `failed`,
+        com os mesmos dados emitidos às salas do Socket.IO. Aceita `Last-Event-ID`
+        (cabeçalho ou parâmetro `last_event_id`) para retomar de onde parou e
+        encerra após o evento final.
+        """
+        after = parse_event_id(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
+        events = _initial_events(self.hub, self.store, task_id, after)
+        if events is None:
+            return {"error": f"Task {task_id} não encontrada."}, 404
+
+        # a resposta é gerada depois que a view retorna: o gerador só usa o Redis
+        return Response(
+            self._stream(task_id, after, events),
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def _stream(self, task_id: str, after: str, events: List):
+        heartbeat = settings.TASK_EVENTS_HEARTBEAT_SECONDS
+        deadline = time.monotonic() + settings.TASK_EVENTS_MAX_STREAM_SECONDS
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        with self.hub.subscribe(task_id) as waiter:
+            while True:
+                for event_id, event, data in events:
+                    yield _format_sse(event_id, event, data)
+                    after = event_id or after
+                    if event in TERMINAL_EVENTS:
+                        return
+                if time.monotonic() >= deadline:
+                    return
+
+                # limpa antes de ler: um evento gravado depois da leitura ainda acorda a espera
+                waiter.clear()
+                events = self.hub.read(task_id, after)
+                if not events and not waiter.wait(heartbeat):
+                    yield ": keep-alive\n\n"
+
+
+class TaskEventsPollResource(Resource):
+    @inject
+    def __init__(
+        self,
+        store: TaskStateStore = Provide[Container.task_state_store],
+        hub: TaskEventHub = Provide[Container.task_event_hub],
+    ):
+        self.store = store
+        self.hub = hub
+        super().__init__()
+
+
+    def get(self, task_id: str):
+        """
+        Variante long-poll de `/tasks/<task_id>/events` para clientes sem SSE: devolve
+        os eventos posteriores a `after` assim que houver algum, ou uma lista vazia
+        depois de `timeout` segundos. O `last_event_id` da resposta vai no próximo `after`.
+        """
+        after = parse_event_id(request.args.get("after"))
+        try:
+            timeout = min(max(float(request.args.get("timeout", settings.TASK_EVENTS_POLL_MAX_WAIT)), 0.0), settings.TASK_EVENTS_POLL_MAX_WAIT)
+        except ValueError:
+            return {"error": "O parâmetro 'timeout' deve ser um número de segundos."}, 400
+
+        with self.hub.subscribe(task_id) as waiter:
+            events = _initial_events(self.hub, self.store, task_id, after)
+            if events is None:
+                return {"error": f"Task {task_id} não encontrada."}, 404
+            # não segura uma conexão do banco enquanto espera
+            db.session.close()
+            if not events and waiter.wait(timeout):
+                events = self.hub.read(task_id, after)
+
+        last_event_id = next((event_id for event_id, _, _ in reversed(events) if event_id), after)
+        return {
+            "task_id": task_id,
+            "events": [{"id": event_id, "event": event, "data": data} for event_id, event, data in events],
+            "last_event_id": last_event_id,
+            "finished": any(event in TERMINAL_EVENTS for _, event, _ in events),
+        }, 200
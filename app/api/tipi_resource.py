@@ -0,0 +1,48 @@
+from flask import request
+from flask_restful import Resource
+from dependency_injector.wiring import inject, Provide
+
+from app.config import settings
+from app.containers import Container
+from app.extensions import db
+from app.services.tipi_index import TipiIndex
+
+
+class TipiLookupResource(Resource):
+    @inject
+    def __init__(
+        self,
+        index: TipiIndex = Provide[Container.tipi_index],
+    ):
+        self.index = index
+        super().__init__()
+
+
+    def get(self, ncm: str):
+        self.index.ensure_fresh(db.session)
+        found = self.index.lookup(ncm)
+        if found is None:
+            return {"error": f"NCM {ncm} não encontrada na TIPI."}, 404
+        return found, 200
+
+
+class TipiSearchResource(Resource):
+    @inject
+    def __init__(
+        self,
+        index: TipiIndex = Provide[Container.tipi_index],
+    ):
+        self.index = index
+        super().__init__()
+
+
+    def get(self):
+        query = request.args.get("q", "")
+        prefix = request.args.get("prefix", "")
+        limit = request.args.get("limit", 20, type=int)
+        if not query and not prefix:
+            return {"error": "Informe ao menos um dos parâmetros 'q' ou 'prefix'."}, 400
+
+        self.index.ensure_fresh(db.session)
+        results = self.index.search(query, prefix, limit=max(1, min(limit, settings.TIPI_SEARCH_MAX_LIMIT)))
+        return {"results": results, "count": len(results)}, 200
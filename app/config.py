@@ -1,4 +1,5 @@
-from pydantic import ConfigDict
+from typing import Dict
+from pydantic import ConfigDict, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -39,6 +40,131 @@ class Settings(BaseSettings):
     )
 
     NEXA_AI_SERVER: str = "http://127.0.0.1:5001"
+    PAYLOAD_CONTENT_TYPE: str = "application/msgpack"
+    AI_SERVER_CONNECT_TIMEOUT: float = 3.0
+    AI_SERVER_READ_TIMEOUT: float = 10.0
+    AI_SERVER_MAX_RETRIES: int = 3
+    AI_SERVER_BACKOFF_BASE: float = 0.2
+    AI_SERVER_BACKOFF_MAX: float = 5.0
+    AI_SERVER_POOL_SIZE: int = 10
+
+    # filas do Celery: classificações únicas, lotes e tarefas de manutenção
+    CELERY_QUEUE_INTERACTIVE: str = "interactive"
+    CELERY_QUEUE_BULK: str = "bulk"
+    CELERY_QUEUE_HOUSEKEEPING: str = "housekeeping"
+    CELERY_PREFETCH_MULTIPLIER: int = 1
+
+    # limitador compartilhado dos inícios de job no servidor de IA; 0 desativa o respectivo limite
+    AI_LIMITER_ENABLED: bool = True
+    AI_MAX_STARTS_PER_SECOND: float = 20.0
+    AI_START_BURST: int = 20
+    AI_MAX_CONCURRENT_STARTS: int = 10
+    AI_INTERACTIVE_RESERVE: int = 2
+    AI_LIMITER_LEASE_SECONDS: float = 60.0
+    AI_LIMITER_INTERACTIVE_WAIT_TIMEOUT: float = 15.0
+    AI_LIMITER_BULK_WAIT_TIMEOUT: float = 600.0
+
+    # controle de admissão da API por classe de prioridade (`interactive`: /classify-partnumber;
+    # `bulk`: lotes e uploads); acima dos limites a API responde 429 ou 503 com Retry-After
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_QUEUE_DEPTH: Dict[str, int] = {"interactive": 1000, "bulk": 200}
+    ADMISSION_MAX_INFLIGHT_JOBS: Dict[str, int] = {"interactive": 5000, "bulk": 2000}
+    ADMISSION_DRAIN_WINDOW_SECONDS: int = 60
+    ADMISSION_MAX_RETRY_AFTER: int = 300
+    ADMISSION_SNAPSHOT_TTL: float = 1.0
+
+    BATCH_MAX_ITEMS: int = 5000
+    BATCH_CHUNK_SIZE: int = 50
+    BATCH_STATE_TTL: int = 24 * 60 * 60
+
+    UPLOAD_MAX_ROWS: int = 200000
+    UPLOAD_MAX_REPORTED_ERRORS: int = 100
+
+    CLASSIFICATION_CACHE_ENABLED: bool = True
+    CLASSIFICATION_CACHE_MAX_ENTRIES: int = 10000
+    CLASSIFICATION_CACHE_TTL: int = 24 * 60 * 60
+
+    INFLIGHT_DEDUP_ENABLED: bool = True
+    # precisa cobrir o job mais longo (AI_JOB_TIMEOUT) mais a espera na fila; o prazo
+    # também é renovado a cada mensagem de progresso do job
+    INFLIGHT_TTL: int = 20 * 60
+
+    PROGRESS_ROUTE_TTL: int = 60 * 60
+    # prazos dos jobs remotos: sem nenhuma mensagem por AI_JOB_STALL_TIMEOUT segundos o job
+    # é considerado travado; acima de AI_JOB_TIMEOUT no total, expirado. Nos dois casos vira falha.
+    AI_JOB_STALL_TIMEOUT: float = 120.0
+    AI_JOB_TIMEOUT: float = 15 * 60
+    PROGRESS_WATCHDOG_INTERVAL: float = 5.0
+    PROGRESS_WATCHDOG_BATCH_SIZE: int = 500
+    # tasks ainda não terminais no banco depois desse tempo são encerradas pelo result_writer
+    TASK_ORPHAN_MAX_AGE: int = 12 * 60 * 60
+    TASK_REAPER_INTERVAL: float = 5 * 60
+    PROGRESS_MAX_UPDATES_PER_SECOND: float = 4.0
+
+    RESULT_WRITER_BATCH_SIZE: int = 500
+    RESULT_WRITER_FLUSH_INTERVAL: float = 2.0
+    RESULT_WRITER_POLL_INTERVAL: float = 0.2
+
+    TASK_STATE_TTL: int = 24 * 60 * 60
+    TASK_STATE_FLUSH_INTERVAL: float = 5.0
+    TASK_STATE_FLUSH_BATCH_SIZE: int = 500
+
+    # histórico por task servido em /tasks/<task_id>/events (SSE e long-poll)
+    TASK_EVENTS_MAXLEN: int = 200
+    TASK_EVENTS_TTL: int = 60 * 60
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    # o stream SSE é encerrado depois desse tempo; o cliente reconecta com Last-Event-ID
+    TASK_EVENTS_MAX_STREAM_SECONDS: float = 30 * 60
+    TASK_EVENTS_POLL_MAX_WAIT: float = 30.0
+
+    # histórico por sala do Socket.IO reenviado no `join` a quem entra depois dos eventos
+    ROOM_EVENTS_REPLAY_ENABLED: bool = True
+    ROOM_EVENTS_MAXLEN: int = 500
+    ROOM_EVENTS_TTL: int = 10 * 60
+
+    TIPI_INDEX_CHECK_INTERVAL: float = 30.0
+    TIPI_SEARCH_MAX_LIMIT: int = 100
+
+    PARTNUMBER_HISTORY_PAGE_SIZE: int = 20
+    PARTNUMBER_HISTORY_MAX_PAGE_SIZE: int = 100
+
+    EXPORT_YIELD_PER: int = 2000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    PARTNUMBER_MATCH_ENABLED: bool = True
+    PARTNUMBER_MATCH_THRESHOLD: float = 0.9
+    PARTNUMBER_HINT_THRESHOLD: float = 0.7
+    PARTNUMBER_INDEX_REFRESH_INTERVAL: float = 10.0
+    # recuo da leitura incremental por `updated_at`, para transações que confirmam atrasadas
+    PARTNUMBER_INDEX_REFRESH_OVERLAP: float = 60.0
+    PARTNUMBER_INDEX_LOAD_BATCH_SIZE: int = 50000
+    PARTNUMBER_INDEX_MAX_CANDIDATES: int = 5000
+
+    # 0 desativa o exportador do processo
+    WORKER_METRICS_PORT: int = 9101
+    PROGRESS_ROUTER_METRICS_PORT: int = 9102
+
+    LOG_LEVEL: str = "INFO"
+    # fração mantida dos registros abaixo de WARNING por logger filho (`logger.get_logger("relay")`)
+    LOG_SAMPLE_RATES: Dict[str, float] = {"relay": 0.1}
+    # prefixo dos arquivos de log deste processo; vazio usa o nome do executável (gunicorn, celery...)
+    LOG_SINK_NAME: str = ""
+
+    RESULT_STREAM_MAXLEN: int = 10000
+    RESULT_STREAM_BLOCK_MS: int = 5000
+    RESULT_STREAM_BATCH_SIZE: int = 50
+    RESULT_STREAM_CLAIM_IDLE_MS: int = 30000
+    RESULT_STREAM_MAX_DELIVERIES: int = 5
+
+    @model_validator(mode="after")
+    def check_inflight_ttl(self):
+        # um registro que expira antes do job faz as salas anexadas perderem o resultado
+        # e deixa uma requisição idêntica iniciar um segundo job remoto
+        if self.INFLIGHT_DEDUP_ENABLED and self.INFLIGHT_TTL <= self.AI_JOB_TIMEOUT:
+            raise ValueError(
+                f"INFLIGHT_TTL ({self.INFLIGHT_TTL}s) deve ser maior que AI_JOB_TIMEOUT ({self.AI_JOB_TIMEOUT}s)."
+            )
+        return self
 
 
 settings = Settings()
\ No newline at end of file
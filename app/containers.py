@@ -1,8 +1,18 @@
 from dependency_injector import containers, providers
+import redis
 
+from app.config import settings
+from app.services.admission import AdmissionController
+from app.services.ai_rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE
+from app.services.classification_cache import ClassificationCache
 from app.services.classification_service import ClassificationService
+from app.services.partnumber_index import PartnumberIndex
+from app.services.task_events import TaskEventHub
+from app.services.task_state import TaskStateStore
+from app.services.tipi_index import TipiIndex
 from app.tasks.ai_classification_task import CeleryTaskClientAI
 from app.tasks.classification_task import CeleryTaskClient
+from app.tasks.progress_routes import count_active_routes, drain_rate
 
 
 class Container(containers.DeclarativeContainer):
@@ -10,9 +20,68 @@ class Container(containers.DeclarativeContainer):
         packages=["app.api"]
     )
 
+    redis_client = providers.Singleton(redis.from_url, settings.REDIS_URL)
+
     celery_client = providers.Singleton(CeleryTaskClientAI)
 
+    classification_cache = providers.Singleton(
+        ClassificationCache,
+        redis_client=redis_client,
+        max_entries=settings.CLASSIFICATION_CACHE_MAX_ENTRIES,
+        ttl=settings.CLASSIFICATION_CACHE_TTL,
+        enabled=settings.CLASSIFICATION_CACHE_ENABLED,
+    )
+
+    task_state_store = providers.Singleton(
+        TaskStateStore,
+        redis_client=redis_client,
+        ttl=settings.TASK_STATE_TTL,
+        events_maxlen=settings.TASK_EVENTS_MAXLEN,
+        events_ttl=settings.TASK_EVENTS_TTL,
+    )
+
+    task_event_hub = providers.Singleton(
+        TaskEventHub,
+        redis_client=redis_client,
+    )
+
+    tipi_index = providers.Singleton(
+        TipiIndex,
+        check_interval=settings.TIPI_INDEX_CHECK_INTERVAL,
+    )
+
+    partnumber_index = providers.Singleton(
+        PartnumberIndex,
+        max_candidates=settings.PARTNUMBER_INDEX_MAX_CANDIDATES,
+        load_batch_size=settings.PARTNUMBER_INDEX_LOAD_BATCH_SIZE,
+        refresh_overlap=settings.PARTNUMBER_INDEX_REFRESH_OVERLAP,
+        enabled=settings.PARTNUMBER_MATCH_ENABLED,
+    )
+
     classification_service = providers.Singleton(
         ClassificationService,
         task_client=celery_client,
+        cache=classification_cache,
+        partnumber_index=partnumber_index,
+        match_threshold=settings.PARTNUMBER_MATCH_THRESHOLD,
+        hint_threshold=settings.PARTNUMBER_HINT_THRESHOLD,
+        chunk_size=settings.BATCH_CHUNK_SIZE,
+        upload_max_rows=settings.UPLOAD_MAX_ROWS,
+        upload_max_reported_errors=settings.UPLOAD_MAX_REPORTED_ERRORS,
+    )
+
+    admission_controller = providers.Singleton(
+        AdmissionController,
+        redis_client=redis_client,
+        queues={
+            PRIORITY_INTERACTIVE: settings.CELERY_QUEUE_INTERACTIVE,
+            PRIORITY_BULK: settings.CELERY_QUEUE_BULK,
+        },
+        max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+        max_inflight=settings.ADMISSION_MAX_INFLIGHT_JOBS,
+        count_inflight=providers.Object(count_active_routes),
+        drain_rate=providers.Object(lambda: drain_rate(settings.ADMISSION_DRAIN_WINDOW_SECONDS)),
+        max_retry_after=settings.ADMISSION_MAX_RETRY_AFTER,
+        snapshot_ttl=settings.ADMISSION_SNAPSHOT_TTL,
+        enabled=settings.ADMISSION_ENABLED,
     )
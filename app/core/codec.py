@@ -0,0 +1,91 @@
+import json
+from typing import Any, Dict, Optional, Type, TypeVar
+import msgpack
+from pydantic import BaseModel
+from app.config import settings
+
+
+T = TypeVar('T', bound=BaseModel)
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+JSON_CONTENT_TYPE = "application/json"
+
+
+class CodecError(ValueError):
+    """Payload que não pôde ser decodificado pelo codec informado ou detectado."""
+
+
+class JsonCodec:
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, raw: bytes) -> Any:
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError, TypeError) as e:
+            raise CodecError(f"JSON inválido: {e}") from e
+
+    def decode_model(self, raw: bytes, model: Type[T]) -> T:
+        # o pydantic valida direto dos bytes, sem passar por um dict intermediário
+        return model.model_validate_json(raw)
+
+
+class MsgpackCodec:
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, raw: bytes) -> Any:
+        try:
+            return msgpack.unpackb(raw, raw=False)
+        except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError, TypeError) as e:
+            raise CodecError(f"msgpack inválido: {e}") from e
+
+    def decode_model(self, raw: bytes, model: Type[T]) -> T:
+        return model.model_validate(self.decode(raw))
+
+
+CODECS: Dict[str, JsonCodec | MsgpackCodec] = {
+    JSON_CONTENT_TYPE: JsonCodec(),
+    MSGPACK_CONTENT_TYPE: MsgpackCodec(),
+}
+
+
+def get_codec(content_type: Optional[str | bytes] = None) -> JsonCodec | MsgpackCodec:
+    """Retorna o codec do content type informado; sem content type, o padrão configurado."""
+    if content_type is None:
+        content_type = settings.PAYLOAD_CONTENT_TYPE
+    if isinstance(content_type, bytes):
+        content_type = content_type.decode("utf-8")
+    try:
+        return CODECS[content_type]
+    except KeyError:
+        raise CodecError(f"Content type não suportado: {content_type}")
+
+
+def detect_codec(raw: bytes | str) -> JsonCodec | MsgpackCodec:
+    """
+    Detecta o codec pelo primeiro byte: documentos JSON começam com `{` ou `[`,
+    o que nunca é o caso de um mapa ou array msgpack. Mantém compatibilidade
+    com versões do servidor de IA que ainda publicam JSON.
+    """
+    if isinstance(raw, str) or raw[:1] in (b"{", b"["):
+        return CODECS[JSON_CONTENT_TYPE]
+    return CODECS[MSGPACK_CONTENT_TYPE]
+
+
+def encode(data: Any, content_type: Optional[str] = None) -> bytes:
+    return get_codec(content_type).encode(data)
+
+
+def decode(raw: bytes | str, content_type: Optional[str | bytes] = None) -> Any:
+    codec = get_codec(content_type) if content_type else detect_codec(raw)
+    return codec.decode(raw)
+
+
+def decode_model(raw: bytes | str, model: Type[T], content_type: Optional[str | bytes] = None) -> T:
+    codec = get_codec(content_type) if content_type else detect_codec(raw)
+    return codec.decode_model(raw, model)
@@ -1,9 +1,18 @@
 import logging
 import os
 import json
+import random
+import sys
+import time
 from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from contextvars import ContextVar
 from queue import Queue
-from datetime import datetime, timezone
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from colorama import Fore, Style, init
@@ -21,10 +30,47 @@ except ImportError:
         RESET_ALL = "\033[0m"
 
 
+# trace da requisição/task em andamento; definido por `app.core.tracing.use_trace`
+trace_id_var: ContextVar = ContextVar("trace_id", default=None)
+
+
+def _dumps(data: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TraceIdFilter(logging.Filter):
+    """Copia o trace atual para o registro na thread que loga, antes de ele entrar na fila."""
+
+    def filter(self, record):
+        if not hasattr(record, "trace_id"):
+            record.trace_id = trace_id_var.get()
+        return True
+
+
 class JsonFormatter(logging.Formatter):
+    """
+    Uma linha JSON por registro. O horário vem de `record.created` (com o prefixo
+    até os segundos em cache) e os campos estruturados passados ao logger entram
+    no nível de cima, sem sobrescrever os campos fixos.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._cached_second = None
+        self._cached_prefix = ""
+
+    def timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._cached_prefix}.{int((created - second) * 1_000_000):06d}+00:00"
+
     def format(self, record):
         log_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self.timestamp(record.created),
             "message": record.getMessage(),
             "level": record.levelname,
             "logger": record.name,
@@ -33,10 +79,19 @@ class JsonFormatter(logging.Formatter):
             "line": record.lineno,
         }
 
+        if getattr(record, "trace_id", None):
+            log_record["trace_id"] = record.trace_id
+        if getattr(record, "span", None):
+            log_record["span"] = record.span
+        if getattr(record, "sample_rate", 1.0) < 1.0:
+            log_record["sample_rate"] = record.sample_rate
+        for key, value in getattr(record, "fields", {}).items():
+            log_record.setdefault(key, value)
+
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_record, ensure_ascii=False)
+        return _dumps(log_record)
 
 
 class ConsoleFormatter(logging.Formatter):
@@ -52,73 +107,151 @@ class ConsoleFormatter(logging.Formatter):
         color = self.COLORS.get(record.levelno, "")
         reset = Style.RESET_ALL
 
+        fields = getattr(record, "fields", None)
+        suffix = " " + " ".join(f"{key}={value}" for key, value in fields.items()) if fields else ""
         return (
             f"{color}[{record.levelname}] {record.module}.{record.funcName}:{record.lineno} "
-            f"- {record.getMessage()}{reset}"
+            f"- {record.getMessage()}{suffix}{reset}"
         )
 
 
-class AsyncLogger:
+class LazyQueueHandler(QueueHandler):
+    """
+    O `QueueHandler` padrão formata a mensagem na thread que loga. Aqui o registro
+    vai para a fila como está, com `msg` e `args` separados, e só é formatado pelos
+    handlers na thread do listener. Como a fila é do próprio processo, os argumentos
+    não são copiados: não altere depois de logar um objeto passado como argumento.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class StructuredLogger:
+    """
+    Logger com formatação adiada e campos estruturados:
+
+        logger.info("Job iniciado", job_id=job_id, rooms=len(room_ids))
+        logger.info("Lote %s selado com %d itens", batch_id, total)
+
+    O nível é checado antes de montar qualquer coisa, e com `sample_rate` < 1 só essa
+    fração dos registros abaixo de WARNING é mantida (os demais custam um `random()`).
+    """
+
+    RESERVED_KWARGS = ("exc_info", "stack_info", "extra")
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = 1.0):
+        self.logger = logger
+        self.sample_rate = sample_rate
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, message: str, *args, **fields):
+        self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message: str, *args, **fields):
+        self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message: str, *args, **fields):
+        self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message: str, *args, **fields):
+        self._log(logging.ERROR, message, args, fields)
+
+    def _log(self, level: int, message: str, args: tuple, fields: dict):
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        kwargs = {key: fields.pop(key) for key in self.RESERVED_KWARGS if key in fields}
+        extra = kwargs.pop("extra", None) or {}
+        if fields:
+            extra["fields"] = fields
+        if self.sample_rate < 1.0:
+            extra["sample_rate"] = self.sample_rate
+        self.logger.log(level, message, *args, extra=extra, stacklevel=3, **kwargs)
+
+
+class AsyncLogger(StructuredLogger):
+    """
+    Logger `app`: os registros entram numa fila e um listener em thread separada
+    escreve no console e nos arquivos JSON. Cada processo tem os próprios arquivos
+    (`logs/<nome>.<pid>.json` e `logs/<nome>.<pid>.error.json`), então dois
+    processos nunca rotacionam o mesmo arquivo; depois de um fork (pool `prefork`
+    do Celery) o filho abre os seus e sobe o próprio listener.
+    """
+
+    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    BACKUP_COUNT = 5
+
     def __init__(self):
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
+        super().__init__(logging.getLogger("app"))
+        self.logger.setLevel(settings.LOG_LEVEL)
 
-        json_formatter = JsonFormatter()
-        console_formatter = ConsoleFormatter()
+        self.queue_handler = LazyQueueHandler(Queue(-1))
+        self.queue_handler.addFilter(TraceIdFilter())
+        self.logger.addHandler(self.queue_handler)
+
+        self._children = {}
+        self._start_listener()
+        if hasattr(os, "register_at_fork"):
+            # a thread do listener não sobrevive ao fork; sem isso a fila do filho só cresceria
+            os.register_at_fork(after_in_child=self._start_listener)
 
-        max_file_size = 10 * 1024 * 1024  # 10MB
-        backup_count = 5
+    def get_logger(self, name: str) -> StructuredLogger:
+        """Logger filho `app.<name>`, com a taxa de amostragem de `LOG_SAMPLE_RATES`."""
+        if name not in self._children:
+            self._children[name] = StructuredLogger(
+                logging.getLogger(f"app.{name}"),
+                settings.LOG_SAMPLE_RATES.get(name, 1.0),
+            )
+        return self._children[name]
+
+    def _start_listener(self):
+        os.makedirs("logs", exist_ok=True)
+        sink = os.path.join("logs", f"{sink_name()}.{os.getpid()}")
+
+        json_formatter = JsonFormatter()
 
         # Handlers de arquivo (JSON)
         file_handler = RotatingFileHandler(
-            "logs/app.json", maxBytes=max_file_size, backupCount=backup_count, encoding="utf-8"
+            f"{sink}.json", maxBytes=self.MAX_FILE_SIZE, backupCount=self.BACKUP_COUNT, encoding="utf-8", delay=True
         )
         file_handler.setFormatter(json_formatter)
         file_handler.setLevel(logging.INFO)
 
         error_handler = RotatingFileHandler(
-            "logs/error.json", maxBytes=max_file_size, backupCount=backup_count, encoding="utf-8"
+            f"{sink}.error.json", maxBytes=self.MAX_FILE_SIZE, backupCount=self.BACKUP_COUNT, encoding="utf-8", delay=True
         )
         error_handler.setFormatter(json_formatter)
         error_handler.setLevel(logging.ERROR)
 
         # Console (human-readable + colorido)
         stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(console_formatter)
+        stream_handler.setFormatter(ConsoleFormatter())
         stream_handler.setLevel(logging.DEBUG)
 
-        # Fila centralizada
-        self.log_queue = Queue(-1)
-        queue_handler = QueueHandler(self.log_queue)
-
-        # Logger principal
-        self.logger = logging.getLogger("app")
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(queue_handler)
-
-        # Listener roda em thread separada
+        # Fila centralizada; o listener roda em thread separada
+        self.queue_handler.queue = Queue(-1)
         self.listener = QueueListener(
-            self.log_queue,
+            self.queue_handler.queue,
             file_handler,
             error_handler,
             stream_handler,
+            respect_handler_level=True,
         )
         self.listener.start()
 
-    def debug(self, message: str, *args, **kwargs):
-        self.logger.debug(message, stacklevel=2, *args, **kwargs)
-
-    def info(self, message: str, *args, **kwargs):
-        self.logger.info(message, stacklevel=2, *args, **kwargs)
-
-    def warning(self, message: str, *args, **kwargs):
-        self.logger.warning(message, stacklevel=2, *args, **kwargs)
-
-    def error(self, message: str, *args, **kwargs):
-        self.logger.error(message, stacklevel=2, *args, **kwargs)
-
     def stop(self):
         self.listener.stop()
 
 
+def sink_name() -> str:
+    if settings.LOG_SINK_NAME:
+        return settings.LOG_SINK_NAME
+    name = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv else ""))[0]
+    return name if name and name != "__main__" and not name.startswith("-") else "app"
+
+
 logger = AsyncLogger()
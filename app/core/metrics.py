@@ -0,0 +1,147 @@
+import os
+import time
+from celery import signals
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, start_http_server
+from app.core.logger_config import logger
+
+
+# etapas rápidas (validação, enfileiramento, relays): de 1ms a 5s
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# etapas que dependem do servidor de IA: de 100ms a 10min
+JOB_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+REQUEST_VALIDATION_SECONDS = Histogram(
+    "nexa_request_validation_seconds",
+    "Tempo para ler e validar o corpo da requisição.",
+    ["endpoint"],
+    buckets=FAST_BUCKETS,
+)
+
+ENQUEUE_SECONDS = Histogram(
+    "nexa_enqueue_seconds",
+    "Tempo para enfileirar o job no Celery a partir da API.",
+    ["kind"],
+    buckets=FAST_BUCKETS,
+)
+
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "nexa_celery_queue_wait_seconds",
+    "Tempo entre a publicação da task e o início da execução no worker.",
+    ["task"],
+    buckets=JOB_BUCKETS,
+)
+
+AI_INITIATION_SECONDS = Histogram(
+    "nexa_ai_initiation_seconds",
+    "Duração do POST que inicia o job no servidor de IA, incluindo retentativas.",
+    ["outcome"],
+    buckets=FAST_BUCKETS,
+)
+
+AI_LIMITER_WAIT_SECONDS = Histogram(
+    "nexa_ai_limiter_wait_seconds",
+    "Espera por uma vaga no limitador de inícios de job no servidor de IA.",
+    ["priority"],
+    buckets=JOB_BUCKETS,
+)
+
+TIME_TO_FIRST_PROGRESS_SECONDS = Histogram(
+    "nexa_time_to_first_progress_seconds",
+    "Tempo entre o registro da rota de progresso e a primeira mensagem do servidor de IA.",
+    ["kind"],
+    buckets=JOB_BUCKETS,
+)
+
+AI_JOB_DURATION_SECONDS = Histogram(
+    "nexa_ai_job_duration_seconds",
+    "Duração total do job de IA, do registro da rota à mensagem final.",
+    ["kind", "status"],
+    buckets=JOB_BUCKETS,
+)
+
+RESULT_RELAY_SECONDS = Histogram(
+    "nexa_result_relay_seconds",
+    "Tempo entre a publicação do resultado final no stream e a emissão para as salas.",
+    buckets=FAST_BUCKETS,
+)
+
+AI_JOBS_REAPED_TOTAL = Counter(
+    "nexa_ai_jobs_reaped",
+    "Jobs de IA encerrados como falha pelo vigia do roteador de progresso.",
+    ["kind", "reason"],
+)
+
+ADMISSION_REJECTED_TOTAL = Counter(
+    "nexa_admission_rejected",
+    "Pedidos recusados pelo controle de admissão da API.",
+    ["priority", "status"],
+)
+
+ACTIVE_ROOMS = Gauge(
+    "nexa_active_rooms",
+    "Salas Socket.IO com ao menos um cliente neste processo web.",
+)
+
+INFLIGHT_JOBS = Gauge(
+    "nexa_inflight_jobs",
+    "Jobs de IA iniciados e ainda sem mensagem final (rotas de progresso ativas).",
+)
+
+
+def registry() -> CollectorRegistry:
+    """
+    Com `PROMETHEUS_MULTIPROC_DIR` (worker Celery em prefork), agrega as métricas
+    gravadas por todos os processos filhos; caso contrário, as do próprio processo.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collector_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector_registry)
+    return collector_registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int, name: str):
+    """Exportador HTTP para processos sem Flask (worker e roteador de progresso); porta 0 desativa."""
+    if not port:
+        return
+    start_http_server(port, registry=registry())
+    logger.info(f"Métricas do {name} expostas em :{port}/metrics.")
+
+
+def elapsed_since(timestamp) -> float | None:
+    """Segundos desde um `time.time()` gravado por outro processo, ou None se ausente/inválido."""
+    try:
+        return max(0.0, time.time() - float(timestamp))
+    except (TypeError, ValueError):
+        return None
+
+
+def register_celery_metrics(worker_metrics_port: int):
+    """
+    Conecta os sinais do Celery: o publicador grava o instante da publicação no
+    cabeçalho da mensagem e o worker mede a espera na fila ao iniciar a task.
+    """
+    @signals.before_task_publish.connect(weak=False)
+    def stamp_enqueued_at(headers=None, **kwargs):
+        if headers is not None:
+            headers["enqueued_at"] = time.time()
+
+    @signals.task_prerun.connect(weak=False)
+    def observe_queue_wait(task=None, **kwargs):
+        waited = elapsed_since(getattr(task.request, "enqueued_at", None))
+        if waited is not None:
+            CELERY_QUEUE_WAIT_SECONDS.labels(task.name).observe(waited)
+
+    @signals.worker_init.connect(weak=False)
+    def start_worker_exporter(**kwargs):
+        start_metrics_server(worker_metrics_port, "worker")
+
+    @signals.worker_process_shutdown.connect(weak=False)
+    def mark_process_dead(pid=None, **kwargs):
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            multiprocess.mark_process_dead(pid or os.getpid())
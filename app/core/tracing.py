@@ -0,0 +1,116 @@
+import functools
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+from celery import signals
+from flask import request
+from app.core.logger_config import logger, trace_id_var as _current_trace_id
+
+
+TRACE_HEADER = "X-Trace-Id"
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> Optional[str]:
+    return _current_trace_id.get()
+
+
+@contextmanager
+def use_trace(trace_id: Optional[str]):
+    """Define o trace do contexto atual (requisição, task ou mensagem) durante o bloco."""
+    token = _current_trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _current_trace_id.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Mede o bloco como um span do trace atual. A duração vem do relógio monotônico;
+    `start` é o horário de parede do início, usado só para alinhar spans de
+    processos diferentes na cascata.
+    """
+    start = time.time()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        if error:
+            attributes["error"] = error
+        record_span(name, start, time.perf_counter() - started, **attributes)
+
+
+def record_span(name: str, start: float, duration: float, **attributes):
+    """Grava um span já medido (ex.: espera na fila, a partir de um instante gravado por outro processo)."""
+    trace_id = current_trace_id()
+    if trace_id is None or not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "span %s %.1fms", name, duration * 1000,
+        extra={"span": {
+            "name": name,
+            "span_id": uuid.uuid4().hex[:16],
+            "start": round(start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            **{key: value for key, value in attributes.items() if value is not None},
+        }},
+    )
+
+
+def register_celery_tracing():
+    """
+    O trace viaja no cabeçalho da mensagem do Celery: o publicador grava o trace
+    atual e o worker o restaura enquanto a task executa, medindo a execução.
+    """
+    started_at = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def stamp_trace_id(headers=None, **kwargs):
+        trace_id = current_trace_id()
+        if headers is not None and trace_id is not None:
+            headers["trace_id"] = trace_id
+
+    @signals.task_prerun.connect(weak=False)
+    def restore_trace(task_id=None, task=None, **kwargs):
+        _current_trace_id.set(getattr(task.request, "trace_id", None))
+        enqueued_at = getattr(task.request, "enqueued_at", None)
+        if enqueued_at is not None:
+            record_span("celery.queue_wait", float(enqueued_at), max(0.0, time.time() - float(enqueued_at)), task=task.name, task_id=task_id)
+        started_at[task_id] = (time.time(), time.perf_counter())
+
+    @signals.task_postrun.connect(weak=False)
+    def finish_trace(task_id=None, task=None, state=None, **kwargs):
+        start, started = started_at.pop(task_id, (None, None))
+        if start is not None:
+            record_span("celery.task", start, time.perf_counter() - started, task=task.name, task_id=task_id, state=state)
+        _current_trace_id.set(None)
+
+
+def traced(name: str):
+    """
+    Decorator para métodos de `Resource`: abre o trace da requisição (ou continua
+    o recebido em `X-Trace-Id`), mede o handler como span e devolve o id no cabeçalho.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with use_trace(request.headers.get(TRACE_HEADER) or new_trace_id()) as trace_id:
+                with span(name) as attributes:
+                    body, status, *headers = func(*args, **kwargs)
+                    attributes["status"] = status
+                    if isinstance(body, dict):
+                        attributes["task_id"] = body.get("task_id")
+            return body, status, {**(headers[0] if headers else {}), TRACE_HEADER: trace_id}
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+-- =======================================================================================
+-- Atualização de bancos existentes (criados pelo script.sql ou pelo db.create_all()
+-- de versões anteriores) para o esquema atual. O script.sql recria o banco do zero;
+-- este arquivo preserva os dados e pode ser executado mais de uma vez.
+--
+--   psql "postgresql://<usuario>:<senha>@<host>:<porta>/<banco>" -f app/database/migration_001.sql
+--
+-- Requer PostgreSQL 15+ (UNIQUE NULLS NOT DISTINCT).
+-- =======================================================================================
+
+
+-- =============================================
+-- Status REVIEW das classificações (load_tipi.py --flag-classifications)
+-- O tipo se chama classification_status no script.sql e classificationstatus no
+-- db.create_all(). ADD VALUE fica fora da transação abaixo: o valor novo não pode
+-- ser usado na mesma transação em que é criado.
+-- =============================================
+DO $$
+DECLARE
+    type_name TEXT;
+BEGIN
+    FOR type_name IN
+        SELECT typname FROM pg_type WHERE typname IN ('classification_status', 'classificationstatus')
+    LOOP
+        EXECUTE format('ALTER TYPE %I ADD VALUE IF NOT EXISTS %L', type_name, 'REVIEW');
+    END LOOP;
+END $$;
+
+
+BEGIN;
+
+-- =============================================
+-- Exclusão lógica de NCMs da TIPI
+-- =============================================
+ALTER TABLE tipi ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITHOUT TIME ZONE;
+
+
+-- =============================================
+-- Unicidade com NULL: (ncm, NULL) e (nome, NULL) passam a ser únicos.
+-- A constraint antiga aceitava repetições com ex/country nulo; antes de trocá-la,
+-- as classificações são apontadas para a linha mais antiga e as cópias removidas.
+-- =============================================
+CREATE TEMPORARY TABLE tipi_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (SELECT id, min(id) OVER (PARTITION BY ncm, ex) AS keep_id FROM tipi) t
+WHERE id <> keep_id;
+
+UPDATE classifications c SET tipi_id = d.keep_id FROM tipi_duplicates d WHERE c.tipi_id = d.id;
+DELETE FROM tipi t USING tipi_duplicates d WHERE t.id = d.id;
+
+ALTER TABLE tipi DROP CONSTRAINT IF EXISTS uq_tipi_ncm_ex;
+ALTER TABLE tipi ADD CONSTRAINT uq_tipi_ncm_ex UNIQUE NULLS NOT DISTINCT (ncm, ex);
+
+
+CREATE TEMPORARY TABLE manufacturer_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (SELECT id, min(id) OVER (PARTITION BY "name", country) AS keep_id FROM manufacturers) m
+WHERE id <> keep_id;
+
+UPDATE classifications c SET manufacturer_id = d.keep_id FROM manufacturer_duplicates d WHERE c.manufacturer_id = d.id;
+DELETE FROM manufacturers m USING manufacturer_duplicates d WHERE m.id = d.id;
+
+ALTER TABLE manufacturers DROP CONSTRAINT IF EXISTS uq_manufacturer_name_country;
+ALTER TABLE manufacturers ADD CONSTRAINT uq_manufacturer_name_country UNIQUE NULLS NOT DISTINCT ("name", country);
+
+
+-- =============================================
+-- Histórico de classificações por partnumber (paginação por id)
+-- =============================================
+CREATE INDEX IF NOT EXISTS ix_classifications_partnumber_id_id ON classifications (partnumber_id, id);
+
+
+-- =============================================
+-- Ponteiro para a melhor classificação do partnumber. Bancos do db.create_all()
+-- anteriores não têm a coluna; em todos, o valor é recalculado com a mesma regra
+-- de refresh_best_classifications (app/services/best_classification.py).
+-- =============================================
+ALTER TABLE partnumbers ADD COLUMN IF NOT EXISTS best_classification_id INTEGER;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_partnumber_best_classification') THEN
+        ALTER TABLE partnumbers
+        ADD CONSTRAINT fk_partnumber_best_classification
+        FOREIGN KEY (best_classification_id)
+        REFERENCES classifications (id)
+        ON DELETE SET NULL;
+    END IF;
+END $$;
+
+UPDATE partnumbers p
+SET best_classification_id = (
+    SELECT c.id
+    FROM classifications c
+    WHERE c.partnumber_id = p.id
+      AND c.status NOT IN ('REPLACED', 'REJECTED')
+    ORDER BY c.confidence_rate DESC NULLS LAST, c.id DESC
+    LIMIT 1
+);
+
+
+-- =============================================
+-- Leitura incremental do índice de partnumbers (PartnumberIndex.refresh)
+-- =============================================
+CREATE INDEX IF NOT EXISTS ix_partnumbers_updated_at_id ON partnumbers (updated_at, id);
+
+COMMIT;
@@ -15,7 +15,7 @@ DROP TYPE IF EXISTS task_status CASCADE;
 -- Criação dos tipos ENUM customizados
 -- =============================================
 CREATE TYPE user_role AS ENUM ('ADMIN', 'USER', 'GUEST');
-CREATE TYPE classification_status AS ENUM ('ACTIVE', 'REPLACED', 'REJECTED');
+CREATE TYPE classification_status AS ENUM ('ACTIVE', 'REPLACED', 'REJECTED', 'REVIEW');
 CREATE TYPE task_status AS ENUM ('STARTED', 'PROCESSING', 'FAILED', 'DONE');
 
 
@@ -87,7 +87,7 @@ CREATE TABLE manufacturers (
     country VARCHAR(100),
     created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT uq_manufacturer_name_country UNIQUE ("name", country)
+    CONSTRAINT uq_manufacturer_name_country UNIQUE NULLS NOT DISTINCT ("name", country)
 );
 
 CREATE TRIGGER update_manufacturers_updated_at
@@ -105,9 +105,10 @@ CREATE TABLE tipi (
     ex VARCHAR(4),
     description TEXT,
     tax NUMERIC(6, 2),
+    deleted_at TIMESTAMP WITHOUT TIME ZONE,
     created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT uq_tipi_ncm_ex UNIQUE (ncm, ex)
+    CONSTRAINT uq_tipi_ncm_ex UNIQUE NULLS NOT DISTINCT (ncm, ex)
 );
 
 CREATE TRIGGER update_tipi_updated_at
@@ -128,6 +129,8 @@ CREATE TABLE partnumbers (
     -- A chave estrangeira para `best_classification_id` será adicionada após a criação da tabela `classifications`
 );
 
+CREATE INDEX ix_partnumbers_updated_at_id ON partnumbers (updated_at, id);
+
 CREATE TRIGGER update_partnumbers_updated_at
 BEFORE UPDATE ON partnumbers
 FOR EACH ROW
@@ -155,6 +158,8 @@ CREATE TABLE classifications (
     CONSTRAINT fk_classification_manufacturer FOREIGN KEY (manufacturer_id) REFERENCES manufacturers (id) ON DELETE SET NULL
 );
 
+CREATE INDEX ix_classifications_partnumber_id_id ON classifications (partnumber_id, id);
+
 CREATE TRIGGER update_classifications_updated_at
 BEFORE UPDATE ON classifications
 FOR EACH ROW
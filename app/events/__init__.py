@@ -1,12 +1,14 @@
-import json
 import time
 from flask import request
 from flask_socketio import disconnect, emit, join_room, send
 import redis
-from app.events.classification_events import single_classification_finished_event
+from app.events.classification_events import room_event_log, single_classification_finished_event
 from app.extensions import socketio as sio
-from app.schemas.classification_schemas import SingleClassificationResponse, validate_and_get_model
+from app.schemas.classification_schemas import TaskResultMessage
+from app.services.classification_cache import ClassificationCache
+from app.services.result_stream import ResultStreamConsumer, default_consumer_name
 from app.core.logger_config import logger
+from app.core.tracing import span
 from app.config import settings
 
 
@@ -65,32 +67,64 @@ def handle_join(data):
     """
     room = data.get('room_id')
     if room:
-        join_room(room)
+        replay_missed_events(room)
         print(f"Cliente {request.sid} entrou na sala: {room}")
 
 
-def redis_listener():
-    print("📢 Ouvinte Redis iniciado, esperando por resultados de tarefas...")
-    r = redis.from_url(settings.REDIS_URL)
-    pubsub = r.pubsub(ignore_subscribe_messages=True)
-    pubsub.subscribe('task_results')
+def replay_missed_events(room: str):
+    """
+    Coloca o cliente na sala e reenvia a ele, em ordem, o que já foi emitido a
+    ela (progresso e resultado final que chegaram antes do `join`). O histórico
+    é lido antes da entrada e reenviado sem I/O no meio, então os eventos ao vivo
+    chegam depois dele; uma segunda leitura cobre o que foi gravado durante a
+    primeira e pode repetir algum evento já entregue ao vivo, mas nenhum se perde.
+    """
+    try:
+        missed = room_event_log.read(room)
+    except redis.RedisError as e:
+        logger.warning(f"Histórico da sala {room} indisponível; entrando sem reenvio: {e}")
+        join_room(room)
+        return
 
-    for message in pubsub.listen():
-        logger.info(f"mensagem ouvida do canal redis: {message}")
-        try:
-            channel = message['channel'].decode('utf-8')
-            data = json.loads(message['data'])
+    join_room(room)
+    for _, event, payload in missed:
+        emit(event, payload)
 
-            if channel == 'task_results':
-                room_id = data.pop('room_id')
+    try:
+        late = room_event_log.read(room, after=missed[-1][0] if missed else None)
+    except redis.RedisError:
+        late = []
+    for _, event, payload in late:
+        emit(event, payload)
 
-                logger.info(f"[INTERCEPTADO]: Resultado para a sala {room_id}. Resultado: {data.get('result')}")
+    if missed or late:
+        logger.info("Eventos reenviados na entrada da sala", room_id=room, events=len(missed) + len(late))
 
-                payload = validate_and_get_model(data, SingleClassificationResponse)
-                single_classification_finished_event(payload, room_id)
 
-                sio.close_room(room_id)
-        except Exception as e:
-            logger.error(f"ERRO no ouvinte Redis: {e}")
+def handle_task_result(payload: TaskResultMessage, cache: ClassificationCache):
+    room_ids = payload.room_ids or [payload.room_id]
 
+    logger.info("Resultado interceptado", partnumber=payload.partnumber, status=payload.status, rooms=len(room_ids))
 
+    with span("socketio.emit_finished", rooms=len(room_ids), partnumber=payload.partnumber):
+        single_classification_finished_event(payload, room_ids)
+
+    if payload.cache_key and payload.status == 'done':
+        cache.set(payload.cache_key, payload.partnumber, payload.result.model_dump())
+
+    for room_id in room_ids:
+        sio.close_room(room_id)
+
+
+def redis_listener(cache: ClassificationCache):
+    print("📢 Ouvinte Redis iniciado, esperando por resultados de tarefas...")
+    consumer = ResultStreamConsumer(
+        redis.from_url(settings.REDIS_URL),
+        model=TaskResultMessage,
+        consumer_name=default_consumer_name(),
+        block_ms=settings.RESULT_STREAM_BLOCK_MS,
+        batch_size=settings.RESULT_STREAM_BATCH_SIZE,
+        claim_idle_ms=settings.RESULT_STREAM_CLAIM_IDLE_MS,
+        max_deliveries=settings.RESULT_STREAM_MAX_DELIVERIES,
+    )
+    consumer.run(lambda data: handle_task_result(data, cache))
@@ -1,10 +1,23 @@
+import redis
+from app.config import settings
 from app.events.events_enum import EventName
 from app.extensions import socketio as sio
 from app.schemas.classification_schemas import SingleClassificationResponse, UpdateStatusResponse
+from app.services.room_events import RecordingEmitter, RoomEventLog
 
 
-def single_classification_finished_event(dto: SingleClassificationResponse, room_id: str):
-    sio.emit(
+room_event_log = RoomEventLog(
+    redis.from_url(settings.REDIS_URL),
+    maxlen=settings.ROOM_EVENTS_MAXLEN,
+    ttl=settings.ROOM_EVENTS_TTL,
+    enabled=settings.ROOM_EVENTS_REPLAY_ENABLED,
+)
+
+room_emitter = RecordingEmitter(sio, room_event_log)
+
+
+def single_classification_finished_event(dto: SingleClassificationResponse, room_id: str | list[str]):
+    room_emitter.emit(
         EventName.CLASSIFICATION_FINISHED.value, 
         dto.model_dump(), 
         to=room_id
@@ -12,7 +25,7 @@ def single_classification_finished_event(dto: SingleClassificationResponse, room
 
 
 def update_status_event(dto: UpdateStatusResponse, room_id):
-    sio.emit(
+    room_emitter.emit(
         EventName.CLASSIFICATION_UPDATE_STATUS.value,
         dto,
         to=room_id
@@ -4,4 +4,7 @@ from enum import Enum
 class EventName(str, Enum):
     CLASSIFICATION_FINISHED = "classification_finished"
     CLASSIFICATION_UPDATE_STATUS = "classification_update_status"
+    BATCH_ITEM_FINISHED = "batch_item_finished"
+    BATCH_UPDATE_STATUS = "batch_update_status"
+    BATCH_FINISHED = "batch_finished"
     
\ No newline at end of file
@@ -1,11 +1,14 @@
 import json
 from typing import Dict
 from celery import Celery
+from kombu import Queue
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
 import redis
 from app.config import settings
 from app.core.logger_config import logger
+from app.core.metrics import register_celery_metrics
+from app.core.tracing import register_celery_tracing
 
 
 db = SQLAlchemy()
@@ -21,6 +24,28 @@ celery = Celery(
     broker=settings.REDIS_URL
 )
 
+# Classificações únicas, lotes e manutenção em filas separadas: cada grupo de workers
+# consome só as suas (`-Q`), e um lote grande não fica na frente de quem espera na tela.
+celery.conf.update(
+    task_queues=[
+        Queue(settings.CELERY_QUEUE_INTERACTIVE),
+        Queue(settings.CELERY_QUEUE_BULK),
+        Queue(settings.CELERY_QUEUE_HOUSEKEEPING),
+    ],
+    task_default_queue=settings.CELERY_QUEUE_HOUSEKEEPING,
+    task_routes={
+        "app.tasks.ai_classification_task.*": {"queue": settings.CELERY_QUEUE_INTERACTIVE},
+        "app.tasks.classification_task.*": {"queue": settings.CELERY_QUEUE_INTERACTIVE},
+        "app.tasks.ai_batch_classification_task.*": {"queue": settings.CELERY_QUEUE_BULK},
+    },
+    # as tasks só iniciam jobs remotos e retornam: com pool de greenlets a concorrência
+    # já é alta, e reservar mensagens além disso só as prende num worker ocupado
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
+)
+
+register_celery_metrics(settings.WORKER_METRICS_PORT)
+register_celery_tracing()
+
 
 def init_celery(app):
     logger.info("Inicializando celery...")
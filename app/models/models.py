@@ -1,6 +1,6 @@
 from decimal import Decimal
 import enum
-from sqlalchemy import Column, ForeignKey, ForeignKeyConstraint, Integer, Numeric, Text, String, DateTime, UniqueConstraint, func, Enum
+from sqlalchemy import Column, ForeignKey, ForeignKeyConstraint, Index, Integer, Numeric, Text, String, DateTime, UniqueConstraint, func, Enum
 from sqlalchemy.orm import relationship
 from app.extensions import db
 
@@ -19,6 +19,7 @@ class ClassificationStatus(enum.Enum):
     ACTIVE = "active"
     REPLACED = "replaced"
     REJECTED = "rejected"
+    REVIEW = "review"
 
 
 class TaskStatus(enum.Enum):
@@ -79,7 +80,7 @@ class Manufacturer(db.Model, TimeStampMixin):
     classifications = relationship("Classification", back_populates="manufacturer")
 
     __table_args__ = (
-        UniqueConstraint("name", "country", name="uq_manufacturer_name_country"),
+        UniqueConstraint("name", "country", name="uq_manufacturer_name_country", postgresql_nulls_not_distinct=True),
     )
 
 
@@ -89,14 +90,18 @@ class Partnumber(db.Model, TimeStampMixin):
     id = Column(Integer, primary_key=True)
     code = Column(String(255), nullable=False, unique=True)
 
-    # best_classification_id = Column(Integer, ForeignKey("classifications.id"))
-    classifications = relationship("Classification", back_populates="partnumber")
+    # mantido por `refresh_best_classifications` (app/services/best_classification.py)
+    best_classification_id = Column(
+        Integer,
+        ForeignKey("classifications.id", use_alter=True, name="fk_partnumber_best_classification", ondelete="SET NULL"),
+    )
+    classifications = relationship("Classification", back_populates="partnumber", foreign_keys="Classification.partnumber_id")
+    best_classification = relationship("Classification", foreign_keys=[best_classification_id], post_update=True)
 
-    @property
-    def best_classification(self):
-        if not self.classifications:
-            return None
-        return max(self.classifications, key=lambda c: c.confidence_rate or 0)
+    __table_args__ = (
+        # leitura incremental do índice de partnumbers (`PartnumberIndex.refresh`)
+        Index("ix_partnumbers_updated_at_id", "updated_at", "id"),
+    )
 
 
 class Tipi(db.Model, TimeStampMixin):
@@ -107,11 +112,13 @@ class Tipi(db.Model, TimeStampMixin):
     ex = Column(String(4))
     description = Column(Text)
     tax = Column(Numeric(6,2))
+    # exclusão lógica: NCMs removidas da TIPI oficial continuam referenciadas por classificações antigas
+    deleted_at = Column(DateTime)
 
     classifications = relationship("Classification", back_populates="tipi")
 
     __table_args__ = (
-        UniqueConstraint("ncm", "ex", name="uq_tipi_ncm_ex"),
+        UniqueConstraint("ncm", "ex", name="uq_tipi_ncm_ex", postgresql_nulls_not_distinct=True),
     )
 
 
@@ -128,7 +135,12 @@ class Classification(db.Model, TimeStampMixin):
     status = Column(Enum(ClassificationStatus), default=ClassificationStatus.ACTIVE)
     confidence_rate = Column(Numeric(4,3))  # exemplo: 0.999
 
-    partnumber = relationship("Partnumber", back_populates="classifications")
+    partnumber = relationship("Partnumber", back_populates="classifications", foreign_keys=[partnumber_id])
     task = relationship("Task", back_populates="classifications")
     tipi = relationship("Tipi", back_populates="classifications")
     manufacturer = relationship("Manufacturer", back_populates="classifications")
+
+    __table_args__ = (
+        # histórico por partnumber com paginação por chave (id decrescente)
+        Index("ix_classifications_partnumber_id_id", "partnumber_id", "id"),
+    )
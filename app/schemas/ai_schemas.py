@@ -1,5 +1,15 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.config import settings
+from app.core.tracing import current_trace_id
+
+
+class ClassificationHint(BaseModel):
+    """Partnumber já classificado parecido com o pedido, enviado ao servidor de IA como pista."""
+    partnumber: str
+    similarity: float
+    ncm: Optional[str] = None
+    description: Optional[str] = None
 
 
 class AISingleClassificationRequest(BaseModel):
@@ -7,4 +17,9 @@ class AISingleClassificationRequest(BaseModel):
     partnumber: str
     description: Optional[str] = None
     manufacturer: Optional[str] = None
-    supplier: Optional[str] = None
\ No newline at end of file
+    supplier: Optional[str] = None
+    hint: Optional[ClassificationHint] = None
+    # codec preferido para as mensagens de progresso; versões antigas do servidor ignoram e publicam JSON
+    content_type: str = settings.PAYLOAD_CONTENT_TYPE
+    # o servidor de IA repete o trace nas mensagens de progresso e nos próprios logs
+    trace_id: Optional[str] = Field(default_factory=current_trace_id)
\ No newline at end of file
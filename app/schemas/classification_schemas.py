@@ -1,5 +1,9 @@
-from typing import Dict, Optional, Type, TypeVar
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Type, TypeVar
 from pydantic import BaseModel, Field, ValidationError
+from app.config import settings
+from app.models import ClassificationStatus
+from app.schemas.ai_schemas import ClassificationHint
 from app.core.logger_config import logger
 
 
@@ -15,6 +19,44 @@ class SingleClassificationRequest(BaseModel):
 
 class StartSingleClassificationSchema(SingleClassificationRequest):
     room_id: str = Field(..., description="O ID da sala do Socket.IO para retorno da notificação.")
+    hint: Optional[ClassificationHint] = None
+
+
+class BatchClassificationRequest(BaseModel):
+    items: List[SingleClassificationRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_ITEMS,
+        description="Lista de partnumbers a serem classificados em um único job."
+    )
+
+
+class StartBatchClassificationSchema(BatchClassificationRequest):
+    room_id: str = Field(..., description="O ID da sala do Socket.IO para retorno das notificações do lote.")
+
+
+class UploadRowError(BaseModel):
+    line: int = Field(..., description="Linha da planilha, contando o cabeçalho como linha 1.")
+    field: Optional[str] = None
+    message: str
+
+
+class UploadClassificationReport(BaseModel):
+    task_id: Optional[str] = None
+    room_id: str
+    total: int = 0
+    rejected: int = 0
+    errors: List[UploadRowError] = Field(default_factory=list)
+
+
+class ClassificationExportQuery(BaseModel):
+    format: Literal["csv", "ndjson"] = "csv"
+    created_from: Optional[datetime] = Field(default=None, description="Início do período (inclusivo).")
+    created_to: Optional[datetime] = Field(default=None, description="Fim do período (exclusivo).")
+    status: List[ClassificationStatus] = Field(default_factory=list)
+    manufacturer: Optional[str] = None
+    ncm_prefix: Optional[str] = None
+    task_id: Optional[str] = None
 
 
 class SingleClassification(BaseModel):
@@ -36,6 +78,14 @@ class SingleClassificationResponse(BaseModel):
     result: SingleClassification
 
 
+class TaskResultMessage(SingleClassificationResponse):
+    """Resultado final no stream `task_results`; os campos de roteamento não vão para o frontend."""
+    room_ids: List[str] = Field(default_factory=list, exclude=True)
+    room_id: Optional[str] = Field(default=None, exclude=True)
+    cache_key: Optional[str] = Field(default=None, exclude=True)
+    trace_id: Optional[str] = Field(default=None, exclude=True)
+
+
 class UpdateStatusResponse(BaseModel):
     status: str
     current: Optional[int]
@@ -48,6 +98,21 @@ class FailedStatusResponse(BaseModel):
     message: Optional[str] = None
 
 
+class BatchItemResponse(BaseModel):
+    index: int
+    partnumber: str
+    status: str
+    message: Optional[str] = None
+    result: Optional[SingleClassification] = None
+
+
+class BatchProgressResponse(BaseModel):
+    status: str
+    done: int
+    failed: int
+    total: int
+
+
 def validate_and_get_model(data_to_validate: Dict[str, any], model:Type[T]) -> Optional[T]:
     """
     Valida um dicionário contra um modelo Pydantic.
@@ -0,0 +1,100 @@
+import math
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import redis
+from app.core.logger_config import logger
+from app.core.metrics import ADMISSION_REJECTED_TOTAL
+
+
+class AdmissionDecision(NamedTuple):
+    """Recusa de um pedido: status HTTP (429 ou 503), segundos do `Retry-After` e motivo."""
+    status: int
+    retry_after: int
+    reason: str
+
+
+class AdmissionController:
+    """
+    Decide se um novo pedido entra no pipeline a partir do estado atual: a fila do
+    Celery da classe de prioridade e os jobs de IA ainda em andamento. Acima dos
+    limites da classe o pedido é recusado na hora, com `Retry-After` estimado
+    pelo excesso dividido pela vazão de saída observada (jobs encerrados/s):
+
+    - 429 quando o pipeline está drenando e vale tentar de novo em breve;
+    - 503 quando nada saiu na janela de medição (servidor de IA parado, workers fora).
+
+    A leitura do Redis é guardada por `snapshot_ttl` segundos por processo. Se o
+    Redis não responder, o pedido é aceito: o enfileiramento vai falhar ou não por
+    conta própria, e o controle de admissão não vira um ponto de falha a mais.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        queues: Dict[str, str],
+        max_queue_depth: Dict[str, int],
+        max_inflight: Dict[str, int],
+        count_inflight: Callable[[], int],
+        drain_rate: Callable[[], float],
+        max_retry_after: int,
+        snapshot_ttl: float,
+        enabled: bool = True,
+    ):
+        self.redis_client = redis_client
+        self.queues = queues
+        self.max_queue_depth = max_queue_depth
+        self.max_inflight = max_inflight
+        self.count_inflight = count_inflight
+        self.drain_rate = drain_rate
+        self.max_retry_after = max_retry_after
+        self.snapshot_ttl = snapshot_ttl
+        self.enabled = enabled
+        self._snapshots: Dict[str, Tuple[float, Tuple[int, int, float]]] = {}
+
+    def check(self, priority: str) -> Optional[AdmissionDecision]:
+        """Retorna None se o pedido pode entrar, ou a recusa a devolver ao cliente."""
+        if not self.enabled:
+            return None
+        try:
+            depth, inflight, rate = self._snapshot(priority)
+        except redis.RedisError as e:
+            logger.warning("Controle de admissão sem leitura do Redis; pedido aceito: %s", e)
+            return None
+
+        excess = 0
+        reason = None
+        max_depth = self.max_queue_depth.get(priority)
+        if max_depth is not None and depth >= max_depth:
+            excess = depth - max_depth + 1
+            reason = f"Fila de processamento cheia ({depth} pedido(s) aguardando)."
+        max_inflight = self.max_inflight.get(priority)
+        if max_inflight is not None and inflight >= max_inflight and inflight - max_inflight + 1 > excess:
+            excess = inflight - max_inflight + 1
+            reason = f"Muitas classificações em andamento ({inflight})."
+        if reason is None:
+            return None
+
+        if rate <= 0:
+            decision = AdmissionDecision(503, self.max_retry_after, f"{reason} O processamento está parado no momento.")
+        else:
+            retry_after = min(self.max_retry_after, max(1, math.ceil(excess / rate)))
+            decision = AdmissionDecision(429, retry_after, reason)
+
+        ADMISSION_REJECTED_TOTAL.labels(priority, str(decision.status)).inc()
+        logger.warning(decision.reason, priority=priority, queue_depth=depth, inflight=inflight, drain_rate=rate, retry_after=decision.retry_after)
+        return decision
+
+    def _snapshot(self, priority: str) -> Tuple[int, int, float]:
+        now = time.monotonic()
+        cached = self._snapshots.get(priority)
+        if cached is not None and now - cached[0] < self.snapshot_ttl:
+            return cached[1]
+
+        queue = self.queues.get(priority)
+        snapshot = (
+            self.redis_client.llen(queue) if queue else 0,
+            self.count_inflight(),
+            self.drain_rate(),
+        )
+        self._snapshots[priority] = (now, snapshot)
+        return snapshot
@@ -0,0 +1,134 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+import redis
+
+
+AI_LIMITER_KEY_PREFIX = "ai-limiter"
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+
+# Tenta pegar uma vaga de início de job. Retorna 0 se conseguiu, -1 se todas as vagas
+# simultâneas estão ocupadas, ou os milissegundos até o balde ter a ficha necessária.
+# O horário vem do próprio Redis, então workers em máquinas diferentes usam o mesmo relógio.
+_ACQUIRE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_concurrent = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local lease_ms = tonumber(ARGV[6])
+
+if max_concurrent > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+    if redis.call('ZCARD', KEYS[2]) >= max_concurrent - reserve then
+        return -1
+    end
+end
+
+if rate > 0 then
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = burst
+    if bucket[1] then
+        tokens = math.min(burst, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate / 1000)
+    end
+    if tokens < 1 + reserve then
+        return math.max(1, math.ceil((1 + reserve - tokens) * 1000 / rate))
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+end
+
+if max_concurrent > 0 then
+    redis.call('ZADD', KEYS[2], now + lease_ms, ARGV[5])
+    redis.call('PEXPIRE', KEYS[2], lease_ms)
+end
+return 0
+"""
+
+
+class AIRateLimitTimeout(Exception):
+    """Não houve vaga para iniciar o job no servidor de IA dentro do prazo de espera."""
+
+
+class AIRateLimiter:
+    """
+    Limitador distribuído dos inícios de job no servidor de IA, compartilhado por
+    todos os workers via Redis: um balde de fichas limita os inícios por segundo
+    (com rajada de até `burst`) e um conjunto de vagas com prazo limita quantas
+    chamadas de início estão em andamento ao mesmo tempo. Uma vaga de um worker
+    que morreu expira sozinha depois de `lease_seconds`.
+
+    Pedidos `bulk` deixam `interactive_reserve` fichas e vagas para os interativos,
+    então um lote grande consome a capacidade ociosa sem atrasar quem espera na tela.
+    Com `max_per_second` <= 0 ou `max_concurrent` <= 0 o respectivo limite é desligado.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        max_per_second: float,
+        burst: int,
+        max_concurrent: int,
+        interactive_reserve: int,
+        lease_seconds: float,
+        wait_timeouts: dict,
+        poll_interval: float = 0.05,
+        enabled: bool = True,
+    ):
+        self.redis_client = redis_client
+        self.max_per_second = max_per_second
+        self.burst = max(burst, 1)
+        self.max_concurrent = max_concurrent
+        self.interactive_reserve = interactive_reserve
+        self.lease_ms = int(lease_seconds * 1000)
+        self.wait_timeouts = wait_timeouts
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+        self._acquire = redis_client.register_script(_ACQUIRE_SCRIPT)
+
+    @contextmanager
+    def slot(self, priority: str = PRIORITY_INTERACTIVE):
+        """Segura uma vaga durante o bloco (a chamada que inicia o job remoto)."""
+        lease_id = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def acquire(self, priority: str = PRIORITY_INTERACTIVE) -> str | None:
+        """
+        Espera uma ficha e uma vaga e retorna o id da vaga, a ser devolvido com
+        `release`. Levanta `AIRateLimitTimeout` se o prazo da prioridade acabar.
+        """
+        if not self.enabled:
+            return None
+
+        lease_id = uuid.uuid4().hex
+        reserve = self.interactive_reserve if priority == PRIORITY_BULK else 0
+        deadline = time.monotonic() + self.wait_timeouts.get(priority, 0.0)
+        while True:
+            wait_ms = self._acquire(
+                keys=self._keys(),
+                args=[self.max_per_second, self.burst, self.max_concurrent, reserve, lease_id, self.lease_ms],
+            )
+            if wait_ms == 0:
+                return lease_id
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AIRateLimitTimeout(f"Sem vaga para iniciar job no servidor de IA (prioridade {priority}).")
+            delay = wait_ms / 1000 if wait_ms > 0 else self.poll_interval
+            # jitter para os workers que esperam não voltarem todos no mesmo instante
+            time.sleep(min(delay * random.uniform(1.0, 1.5), remaining))
+
+    def release(self, lease_id: str | None):
+        if lease_id is not None and self.max_concurrent > 0:
+            self.redis_client.zrem(self._keys()[1], lease_id)
+
+    @staticmethod
+    def _keys():
+        return [f"{AI_LIMITER_KEY_PREFIX}:tokens", f"{AI_LIMITER_KEY_PREFIX}:leases"]
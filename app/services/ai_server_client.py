@@ -0,0 +1,132 @@
+import os
+import random
+import threading
+import time
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import settings
+from app.core.logger_config import logger
+from app.core.tracing import TRACE_HEADER, current_trace_id
+from app.schemas.ai_schemas import AISingleClassificationRequest
+
+
+class AIServerError(Exception):
+    """Falha definitiva ao iniciar um job no servidor de IA (após as retentativas)."""
+
+
+class AIServerClient:
+    """
+    Cliente HTTP compartilhado para o servidor de IA: uma `requests.Session` com
+    pool de conexões keep-alive por processo, timeouts de conexão e leitura,
+    retentativas limitadas com backoff exponencial e jitter, e métricas de latência.
+    """
+
+    RETRY_STATUS_MIN = 500
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float,
+        read_timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        pool_size: int,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+
+        self._session: requests.Session | None = None
+        self._session_pid: int | None = None
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+    def start_single_classification(self, request_data: AISingleClassificationRequest) -> str:
+        """Inicia o job remoto e retorna o `job_id`. Levanta `AIServerError` em caso de falha."""
+        response = self._post("/process/single_partnumber", request_data.model_dump())
+        try:
+            return response.json()["job_id"]
+        except (ValueError, KeyError) as e:
+            raise AIServerError(f"Resposta inválida do servidor de IA: {e}") from e
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _post(self, path: str, payload: dict) -> requests.Response:
+        url = f"{self.base_url}{path}"
+        trace_id = current_trace_id()
+        headers = {TRACE_HEADER: trace_id} if trace_id else None
+        started = time.perf_counter()
+        attempt = 0
+
+        try:
+            while True:
+                try:
+                    response = self._get_session().post(url, json=payload, headers=headers, timeout=self.timeout)
+                    if response.status_code < self.RETRY_STATUS_MIN:
+                        response.raise_for_status()
+                        return response
+                    error = requests.HTTPError(f"{response.status_code} Server Error para {url}", response=response)
+                except requests.ConnectionError as e:
+                    # inclui ConnectTimeout: a requisição não chegou ao servidor, então é seguro repetir
+                    error = e
+                except requests.RequestException as e:
+                    # ReadTimeout e erros 4xx não são repetidos: o job pode já ter sido criado
+                    raise AIServerError(str(e)) from e
+
+                if attempt >= self.max_retries:
+                    raise AIServerError(f"{error} (após {attempt + 1} tentativa(s))") from error
+
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning(f"Falha ao chamar {url}: {error}. Nova tentativa em {delay:.2f}s.")
+                attempt += 1
+                self._incr("retries")
+                time.sleep(delay)
+        except AIServerError:
+            self._incr("errors")
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record_latency(elapsed)
+            logger.info(f"POST {url} concluído em {elapsed * 1000:.1f}ms ({attempt + 1} tentativa(s)).")
+
+    def _get_session(self) -> requests.Session:
+        # Sessões não sobrevivem ao fork dos workers prefork: cada processo cria o seu pool.
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def _record_latency(self, elapsed: float):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["total_seconds"] += elapsed
+            self._stats["max_seconds"] = max(self._stats["max_seconds"], elapsed)
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+ai_server_client = AIServerClient(
+    base_url=settings.NEXA_AI_SERVER,
+    connect_timeout=settings.AI_SERVER_CONNECT_TIMEOUT,
+    read_timeout=settings.AI_SERVER_READ_TIMEOUT,
+    max_retries=settings.AI_SERVER_MAX_RETRIES,
+    backoff_base=settings.AI_SERVER_BACKOFF_BASE,
+    backoff_max=settings.AI_SERVER_BACKOFF_MAX,
+    pool_size=settings.AI_SERVER_POOL_SIZE,
+)
@@ -0,0 +1,73 @@
+from typing import Iterable, Optional
+from sqlalchemy import Connection, event, inspect, select, update
+from sqlalchemy.orm import Session, joinedload
+from app.models import Classification, ClassificationStatus, Partnumber
+
+
+# classificações substituídas ou rejeitadas nunca são a resposta atual do partnumber
+INELIGIBLE_STATUSES = (ClassificationStatus.REPLACED, ClassificationStatus.REJECTED)
+
+
+def refresh_best_classifications(connection: Connection | Session, partnumber_ids: Iterable[int]):
+    """
+    Recalcula `partnumbers.best_classification_id` com um único UPDATE: a
+    classificação elegível de maior confiança, desempatada pela mais recente.
+    """
+    partnumber_ids = list(set(partnumber_ids))
+    if not partnumber_ids:
+        return
+
+    best = (
+        select(Classification.id)
+        .where(
+            Classification.partnumber_id == Partnumber.id,
+            Classification.status.not_in(INELIGIBLE_STATUSES),
+        )
+        .order_by(Classification.confidence_rate.desc().nulls_last(), Classification.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    connection.execute(
+        update(Partnumber)
+        .where(Partnumber.id.in_(partnumber_ids))
+        .values(best_classification_id=best)
+    )
+
+
+def load_best_classification(session: Session, partnumber_id: int) -> Optional[Classification]:
+    """Classificação atual do partnumber com suas relações, numa única consulta."""
+    return session.execute(
+        select(Classification)
+        .join(Partnumber, Partnumber.best_classification_id == Classification.id)
+        .where(Partnumber.id == partnumber_id)
+        .options(
+            joinedload(Classification.partnumber),
+            joinedload(Classification.tipi),
+            joinedload(Classification.manufacturer),
+        )
+    ).scalar_one_or_none()
+
+
+def register_best_classification_listener():
+    """Registra (uma única vez) a manutenção do ponteiro nas alterações feitas pelo ORM."""
+    if not event.contains(Session, "after_flush", _refresh_after_orm_changes):
+        event.listen(Session, "after_flush", _refresh_after_orm_changes)
+
+
+def _refresh_after_orm_changes(session: Session, flush_context):
+    """
+    Mantém o ponteiro quando classificações são criadas, removidas ou mudam de
+    status/confiança pelo ORM. Na remoção da melhor, o banco só anula o ponteiro
+    (ON DELETE SET NULL); aqui ele passa para a próxima elegível.
+    """
+    partnumber_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Classification) or obj.partnumber_id is None:
+            continue
+        if obj in session.new or obj in session.deleted or _changed(obj, "status") or _changed(obj, "confidence_rate"):
+            partnumber_ids.add(obj.partnumber_id)
+    refresh_best_classifications(session.connection(), partnumber_ids)
+
+
+def _changed(obj: Classification, attribute: str) -> bool:
+    return inspect(obj).attrs[attribute].history.has_changes()
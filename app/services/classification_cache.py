@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import redis
+from app.core.logger_config import logger
+
+
+CACHE_KEY_PREFIX = "classification-cache"
+
+
+def _normalize(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(value.split()).casefold()
+
+
+def classification_cache_key(
+    partnumber: str,
+    description: Optional[str] = None,
+    manufacturer: Optional[str] = None,
+    supplier: Optional[str] = None,
+    **_,
+) -> str:
+    """
+    Gera a chave do cache a partir dos campos normalizados da requisição.
+    Campos extras (ex: room_id) são ignorados.
+    """
+    raw = "\x1f".join(_normalize(v) for v in (partnumber, description, manufacturer, supplier))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Cache de resultados em dois níveis: LRU em memória do processo na frente de
+    um hash Redis por chave com TTL, compartilhado entre processos.
+    """
+
+    def __init__(self, redis_client: redis.Redis, max_entries: int, ttl: int, enabled: bool = True):
+        self.redis_client = redis_client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self._local: OrderedDict[str, tuple[float, Dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+
+        entry = self._get_local(key)
+        if entry is not None:
+            self._incr("local_hits")
+            return entry
+
+        try:
+            stored = self.redis_client.hgetall(self._redis_key(key))
+        except redis.RedisError as e:
+            logger.warning(f"Falha ao consultar o cache Redis: {e}")
+            stored = None
+
+        if not stored:
+            self._incr("misses")
+            return None
+
+        entry = {
+            "partnumber": stored[b"partnumber"].decode("utf-8"),
+            "result": json.loads(stored[b"result"]),
+        }
+        self._set_local(key, entry)
+        self._incr("redis_hits")
+        return entry
+
+    def set(self, key: str, partnumber: str, result: Dict):
+        if not self.enabled:
+            return
+
+        entry = {"partnumber": partnumber, "result": result}
+        self._set_local(key, entry)
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hset(self._redis_key(key), mapping={
+                "partnumber": partnumber,
+                "result": json.dumps(result),
+                "cached_at": int(time.time()),
+            })
+            pipe.expire(self._redis_key(key), self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Falha ao gravar no cache Redis: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "size": len(self._local),
+                "max_entries": self.max_entries,
+            }
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, entry: Dict):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _incr(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:{key}"
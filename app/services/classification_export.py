@@ -0,0 +1,116 @@
+import csv
+import enum
+import io
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Mapping
+from sqlalchemy import Engine, Select, func, select
+from app.core.logger_config import logger
+from app.models import Classification, Manufacturer, Partnumber, Tipi
+from app.schemas.classification_schemas import ClassificationExportQuery
+from app.services.tipi_index import normalize_ncm
+
+
+EXPORT_COLUMNS = (
+    Classification.id.label("classification_id"),
+    Partnumber.code.label("partnumber"),
+    Tipi.ncm.label("ncm"),
+    Tipi.ex.label("ex"),
+    Classification.short_description.label("short_description"),
+    Classification.long_description.label("long_description"),
+    Classification.confidence_rate.label("confidence_rate"),
+    Classification.status.label("status"),
+    Manufacturer.name.label("manufacturer"),
+    Manufacturer.country.label("manufacturer_country"),
+    Manufacturer.address.label("manufacturer_address"),
+    Classification.task_id.label("task_id"),
+    Classification.created_at.label("created_at"),
+)
+
+FIELDNAMES = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def build_export_query(filters: ClassificationExportQuery) -> Select:
+    """Colunas planas com os joins no próprio SELECT: nenhum objeto ORM nem carregamento preguiçoso por linha."""
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .outerjoin(Partnumber, Classification.partnumber_id == Partnumber.id)
+        .outerjoin(Tipi, Classification.tipi_id == Tipi.id)
+        .outerjoin(Manufacturer, Classification.manufacturer_id == Manufacturer.id)
+        .order_by(Classification.id)
+    )
+    if filters.created_from is not None:
+        stmt = stmt.where(Classification.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        stmt = stmt.where(Classification.created_at < filters.created_to)
+    if filters.status:
+        stmt = stmt.where(Classification.status.in_(filters.status))
+    if filters.manufacturer:
+        stmt = stmt.where(func.lower(Manufacturer.name) == filters.manufacturer.strip().lower())
+    if filters.ncm_prefix:
+        stmt = stmt.where(Tipi.ncm.startswith(normalize_ncm(filters.ncm_prefix)))
+    if filters.task_id:
+        stmt = stmt.where(Classification.task_id == filters.task_id)
+    return stmt
+
+
+def iter_export_rows(engine: Engine, stmt: Select, yield_per: int) -> Iterator[Mapping]:
+    """
+    Percorre o resultado por um cursor do lado do servidor (`yield_per` ativa
+    `stream_results`): só `yield_per` linhas ficam em memória por vez. Usa uma
+    conexão própria, que continua aberta enquanto a resposta é transmitida.
+    """
+    started = time.perf_counter()
+    exported = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=yield_per).execute(stmt)
+        for row in result.mappings():
+            exported += 1
+            yield row
+    logger.info(f"Exportação concluída: {exported} classificação(ões) em {time.perf_counter() - started:.1f}s.")
+
+
+def encode_export(rows: Iterable[Mapping], export_format: str, chunk_bytes: int) -> Iterator[bytes]:
+    """Serializa as linhas em CSV ou NDJSON, agrupadas em blocos de ~`chunk_bytes` para a resposta chunked."""
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES, lineterminator="\n")
+        writer.writeheader()
+        # o cabeçalho sai antes da consulta, então a resposta começa imediatamente
+        yield _drain(buffer)
+        write = lambda row: writer.writerow({key: _csv_value(value) for key, value in row.items()})
+    else:
+        write = lambda row: buffer.write(json.dumps({key: _json_value(value) for key, value in row.items()}, ensure_ascii=False) + "\n")
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= chunk_bytes:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _csv_value(value):
+    value = _json_value(value)
+    return "" if value is None else value
@@ -1,15 +1,161 @@
+import itertools
+from typing import Dict, Iterable, Iterator, List, Tuple
 from celery.result import AsyncResult
+from pydantic import ValidationError
+from app.core.logger_config import logger
+from app.extensions import db
+from app.models import Classification
+from app.services.best_classification import load_best_classification
+from app.services.classification_cache import ClassificationCache, classification_cache_key
+from app.services.partnumber_index import PartnumberIndex, PartnumberMatch
 from app.services.protocols import IClassificationService
-from app.schemas.classification_schemas import StartSingleClassificationSchema
+from app.schemas.ai_schemas import ClassificationHint
+from app.schemas.classification_schemas import SingleClassificationRequest, SingleClassificationResponse, StartBatchClassificationSchema, StartSingleClassificationSchema, UploadClassificationReport, UploadRowError
 from app.services.protocols import IAsyncTaskClient
 
 
 class ClassificationService(IClassificationService):
-    def __init__(self, task_client:IAsyncTaskClient):
+    def __init__(
+        self,
+        task_client:IAsyncTaskClient,
+        cache:ClassificationCache,
+        partnumber_index:PartnumberIndex | None = None,
+        match_threshold:float = 1.0,
+        hint_threshold:float = 1.0,
+        chunk_size:int = 50,
+        upload_max_rows:int = 200000,
+        upload_max_reported_errors:int = 100,
+    ):
         self.task_client = task_client
+        self.cache = cache
+        self.partnumber_index = partnumber_index
+        self.match_threshold = match_threshold
+        self.hint_threshold = hint_threshold
+        self.chunk_size = chunk_size
+        self.upload_max_rows = upload_max_rows
+        self.upload_max_reported_errors = upload_max_reported_errors
+
+    def get_cached_classification(self, schema:SingleClassificationRequest) -> SingleClassificationResponse | None:
+        cache_key = classification_cache_key(**schema.model_dump())
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return SingleClassificationResponse(
+                status="done",
+                message="Classificação recuperada do cache.",
+                partnumber=cached["partnumber"],
+                result=cached["result"],
+            )
+
+        # variantes do mesmo partnumber (ex: `ABC-123/X` e `abc123x`) reaproveitam a classificação existente
+        match = self._find_similar(schema.partnumber, self.match_threshold)
+        if match is None:
+            return None
+
+        classification = load_best_classification(db.session, match.partnumber_id)
+        if classification is None:
+            return None
+
+        result = _to_result(classification, schema.partnumber)
+        self.cache.set(cache_key, schema.partnumber, result)
+        logger.info(f"Partnumber {schema.partnumber} respondido pelo equivalente {match.code} (similaridade {match.similarity}).")
+        return SingleClassificationResponse(
+            status="done",
+            message=f"Classificação recuperada do partnumber equivalente {classification.partnumber.code}.",
+            partnumber=schema.partnumber,
+            result=result,
+        )
 
     def start_single_classification(self, schema:StartSingleClassificationSchema) -> str:
+        if schema.hint is None:
+            schema.hint = self._classification_hint(schema.partnumber)
 
         task_id = self.task_client.run_single_classification_task(schema)
 
-        return task_id
\ No newline at end of file
+        return task_id
+
+    def start_batch_classification(self, schema:StartBatchClassificationSchema) -> str:
+
+        task_id = self.task_client.run_batch_classification_task(schema)
+
+        return task_id
+
+    def start_upload_classification(self, rows:Iterable[Tuple[int, Dict]], room_id:str) -> UploadClassificationReport:
+        """
+        Valida as linhas da planilha à medida que são lidas e enfileira as válidas
+        em chunks de um único lote; o primeiro chunk começa a ser classificado
+        antes do fim da leitura. Sem nenhuma linha válida, nenhum lote é criado.
+        """
+        report = UploadClassificationReport(room_id=room_id)
+        chunks = self._valid_upload_chunks(rows, report)
+        first = next(chunks, None)
+        if first is None:
+            return report
+
+        report.task_id = self.task_client.run_streamed_batch_classification_task(room_id, itertools.chain([first], chunks))
+        logger.info(f"Upload do lote {report.task_id}: {report.total} linha(s) enfileirada(s), {report.rejected} rejeitada(s).")
+        return report
+
+    def _valid_upload_chunks(self, rows:Iterable[Tuple[int, Dict]], report:UploadClassificationReport) -> Iterator[List[Dict]]:
+        chunk = []
+        for line, item in rows:
+            if report.total + report.rejected >= self.upload_max_rows:
+                report.rejected += 1
+                self._report_error(report, UploadRowError(line=line, message=f"Limite de {self.upload_max_rows} linhas atingido; o restante da planilha foi ignorado."))
+                break
+            try:
+                request = SingleClassificationRequest(**item)
+            except ValidationError as e:
+                report.rejected += 1
+                for error in e.errors():
+                    self._report_error(report, UploadRowError(line=line, field=".".join(map(str, error["loc"])) or None, message=error["msg"]))
+                continue
+
+            chunk.append(request.model_dump(exclude_none=True))
+            report.total += 1
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _report_error(self, report:UploadClassificationReport, error:UploadRowError):
+        # o relatório fica limitado; `rejected` continua contando todas as linhas
+        if len(report.errors) < self.upload_max_reported_errors:
+            report.errors.append(error)
+
+    def _find_similar(self, partnumber: str, threshold: float) -> PartnumberMatch | None:
+        if self.partnumber_index is None:
+            return None
+        matches = self.partnumber_index.search(partnumber, min_similarity=threshold)
+        return matches[0] if matches else None
+
+    def _classification_hint(self, partnumber: str) -> ClassificationHint | None:
+        match = self._find_similar(partnumber, self.hint_threshold)
+        if match is None:
+            return None
+
+        classification = load_best_classification(db.session, match.partnumber_id)
+        if classification is None:
+            return None
+
+        return ClassificationHint(
+            partnumber=classification.partnumber.code,
+            similarity=match.similarity,
+            ncm=classification.tipi.ncm if classification.tipi else None,
+            description=classification.short_description,
+        )
+
+
+def _to_result(classification: Classification, partnumber: str) -> dict:
+    tipi = classification.tipi
+    manufacturer = classification.manufacturer
+    return {
+        "partnumber": partnumber,
+        "ncm": tipi.ncm if tipi else None,
+        "exception": tipi.ex if tipi else None,
+        "description": classification.long_description,
+        "fabricante": manufacturer.name if manufacturer else None,
+        "endereco": manufacturer.address if manufacturer else None,
+        "pais": manufacturer.country if manufacturer else None,
+        "confidence_score": float(classification.confidence_rate) if classification.confidence_rate is not None else None,
+    }
@@ -0,0 +1,81 @@
+from typing import List
+import redis
+
+
+INFLIGHT_KEY_PREFIX = "inflight"
+
+# Registra a sala e tenta assumir o job; retorna o id da task dona do job.
+_ACQUIRE_SCRIPT = """
+local acquired = redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[3])
+if acquired then
+    -- salas de um registro anterior que expirou não pertencem ao novo job
+    redis.call('DEL', KEYS[2])
+    redis.call('SADD', KEYS[2], ARGV[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+    return ARGV[1]
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+redis.call('PEXPIRE', KEYS[2], redis.call('PTTL', KEYS[1]))
+return redis.call('GET', KEYS[1])
+"""
+
+# Remove o registro se a task ainda for a dona e retorna as salas anexadas.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local rooms = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+return rooms
+"""
+
+# Renova o prazo do registro, se ainda existir, e retorna as salas anexadas.
+_ROOMS_SCRIPT = """
+if redis.call('EXPIRE', KEYS[1], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+return redis.call('SMEMBERS', KEYS[2])
+"""
+
+
+class InflightRegistry:
+    """
+    Registro de jobs de IA em andamento, compartilhado entre processos via Redis.
+    A primeira requisição para uma chave vira dona do job; as seguintes apenas
+    anexam suas salas, que recebem os mesmos eventos de progresso e resultado.
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: int, enabled: bool = True):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.enabled = enabled
+        self._acquire = redis_client.register_script(_ACQUIRE_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+        self._rooms = redis_client.register_script(_ROOMS_SCRIPT)
+
+    def acquire(self, key: str, task_id: str, room_id: str) -> str:
+        """Retorna `task_id` se a requisição assumiu o job, ou o id da task dona."""
+        if not self.enabled:
+            return task_id
+        owner = self._acquire(keys=self._keys(key), args=[task_id, room_id, self.ttl])
+        return owner.decode("utf-8") if isinstance(owner, bytes) else owner
+
+    def rooms(self, key: str) -> List[str]:
+        """
+        Retorna as salas que acompanham o job e renova o prazo do registro: chamado
+        a cada mensagem de progresso, mantém vivo o registro de um job que ainda
+        manda notícias, mesmo além de `ttl`.
+        """
+        if not self.enabled:
+            return []
+        return [room.decode("utf-8") for room in self._rooms(keys=self._keys(key), args=[self.ttl])]
+
+    def release(self, key: str, task_id: str) -> List[str]:
+        """Encerra o registro do job e retorna todas as salas que o acompanhavam."""
+        if not self.enabled:
+            return []
+        return [room.decode("utf-8") for room in self._release(keys=self._keys(key), args=[task_id])]
+
+    @staticmethod
+    def _keys(key: str) -> List[str]:
+        return [f"{INFLIGHT_KEY_PREFIX}:{key}", f"{INFLIGHT_KEY_PREFIX}-rooms:{key}"]
@@ -0,0 +1,201 @@
+import math
+import threading
+import time
+from array import array
+import heapq
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session, scoped_session
+from app.core.logger_config import logger
+from app.models import Partnumber
+
+
+EMPTY_POSTINGS = array("I")
+
+
+def normalize_partnumber(code: Optional[str]) -> str:
+    """`ABC-123/X`, `abc123x` e `ABC 123 X` viram `ABC123X`: só letras e dígitos, em maiúsculas."""
+    if not code:
+        return ""
+    return "".join(ch for ch in code.upper() if ch.isalnum())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PartnumberMatch(NamedTuple):
+    partnumber_id: int
+    code: str
+    similarity: float
+
+
+class PartnumberIndex:
+    """
+    Índice em memória de trigramas sobre os códigos normalizados dos partnumbers
+    já classificados. A similaridade é o coeficiente de Dice entre os conjuntos
+    de trigramas; a busca só percorre as listas dos trigramas mais raros da
+    consulta (filtro de prefixo), o que basta para garantir o limiar pedido.
+    Atualizado incrementalmente por `refresh`, que lê apenas os partnumbers
+    alterados desde a última leitura (`updated_at`).
+    """
+
+    def __init__(self, max_candidates: int, load_batch_size: int, enabled: bool = True, refresh_overlap: float = 60.0):
+        self.enabled = enabled
+        self.max_candidates = max_candidates
+        self.load_batch_size = load_batch_size
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+
+        self._codes: List[str] = []
+        self._partnumber_ids = array("q")
+        self._sizes = array("H")
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def add(self, partnumber_id: int, code: str) -> bool:
+        """Indexa o código; retorna False se ele (ou uma variante) já estava no índice."""
+        normalized = normalize_partnumber(code)
+        if not normalized or normalized in self._exact:
+            # variantes do mesmo código normalizado compartilham uma única entrada
+            return False
+        with self._lock:
+            doc = len(self._codes)
+            self._codes.append(normalized)
+            self._partnumber_ids.append(partnumber_id)
+            grams = trigrams(normalized)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("I")
+                postings.append(doc)
+            self._exact[normalized] = doc
+        return True
+
+    def search(self, code: str, min_similarity: float, limit: int = 1) -> List[PartnumberMatch]:
+        normalized = normalize_partnumber(code)
+        if not self.enabled or not normalized:
+            return []
+
+        doc = self._exact.get(normalized)
+        if doc is not None:
+            return [PartnumberMatch(self._partnumber_ids[doc], self._codes[doc], 1.0)]
+
+        query = trigrams(normalized)
+        size = len(query)
+        # Dice >= t exige ao menos ceil(t·|A| / (2 - t)) trigramas em comum, logo todo
+        # candidato aparece em uma das |A| - mínimo + 1 listas mais curtas
+        min_common = max(1, math.ceil(min_similarity * size / (2 - min_similarity)))
+        postings = sorted((self._postings.get(gram, EMPTY_POSTINGS) for gram in query), key=len)
+        prefix = size - min_common + 1
+
+        hits = Counter()
+        for doc_ids in postings[:prefix]:
+            hits.update(doc_ids)
+
+        # o candidato precisa de `partial` suficiente mesmo se todos os trigramas fora do prefixo coincidirem
+        remaining = size - prefix
+        min_partial = max(1, math.ceil(min_similarity * (size + min_common) / 2) - remaining)
+        candidates = [(partial, doc) for doc, partial in hits.items() if partial >= min_partial]
+        if len(candidates) > self.max_candidates:
+            candidates = heapq.nlargest(self.max_candidates, candidates)
+
+        matches = []
+        for partial, doc in candidates:
+            other_size = self._sizes[doc]
+            # limite superior: nem todos os trigramas fora do prefixo podem coincidir
+            if 2 * (partial + min(remaining, other_size)) < min_similarity * (size + other_size):
+                continue
+            common = len(query & trigrams(self._codes[doc]))
+            similarity = 2 * common / (size + other_size)
+            if similarity >= min_similarity:
+                matches.append(PartnumberMatch(self._partnumber_ids[doc], self._codes[doc], round(similarity, 3)))
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        return matches[:limit]
+
+    def refresh(self, session: Session) -> int:
+        """
+        Carrega os partnumbers classificados. A primeira chamada lê todos; as
+        seguintes, os com `updated_at` posterior à marca da leitura anterior. O
+        partnumber é inserido antes de ter classificação e só ganha a
+        `best_classification_id` depois, num UPDATE que também atualiza `updated_at`,
+        então um id antigo pode entrar no índice a qualquer momento.
+        """
+        if not self.enabled:
+            return 0
+        started = time.perf_counter()
+        if self._watermark is None:
+            loaded = self._load_all(session)
+        else:
+            loaded = self._load_changed(session)
+
+        if loaded:
+            logger.info(
+                f"Índice de partnumbers: {loaded} código(s) novo(s) em "
+                f"{(time.perf_counter() - started) * 1000:.1f}ms ({len(self)} no total)."
+            )
+        return loaded
+
+    def _load_all(self, session: Session) -> int:
+        # a marca vem antes da varredura: o que mudar durante ela é relido na próxima chamada
+        watermark = session.execute(select(func.max(Partnumber.updated_at))).scalar() or datetime.min
+        loaded = 0
+        last_id = 0
+        while True:
+            rows = session.execute(
+                select(Partnumber.id, Partnumber.code)
+                .where(Partnumber.id > last_id, Partnumber.best_classification_id.is_not(None))
+                .order_by(Partnumber.id)
+                .limit(self.load_batch_size)
+            ).all()
+            loaded += sum(self.add(partnumber_id, code) for partnumber_id, code in rows)
+            if len(rows) < self.load_batch_size:
+                break
+            last_id = rows[-1][0]
+        self._watermark = watermark
+        return loaded
+
+    def _load_changed(self, session: Session) -> int:
+        # `updated_at` é o início da transação que gravou: uma transação longa pode
+        # confirmar depois da última leitura com um valor anterior à marca, então a
+        # leitura recua `refresh_overlap`; reler um código já indexado não custa nada
+        since = max(self._watermark, datetime.min + self.refresh_overlap) - self.refresh_overlap
+        loaded = 0
+        cursor = (since, 0)
+        while True:
+            rows = session.execute(
+                select(Partnumber.id, Partnumber.code, Partnumber.updated_at)
+                .where(
+                    tuple_(Partnumber.updated_at, Partnumber.id) > tuple_(*cursor),
+                    Partnumber.best_classification_id.is_not(None),
+                )
+                .order_by(Partnumber.updated_at, Partnumber.id)
+                .limit(self.load_batch_size)
+            ).all()
+            loaded += sum(self.add(partnumber_id, code) for partnumber_id, code, _ in rows)
+            if rows:
+                cursor = (rows[-1][2], rows[-1][0])
+                self._watermark = max(self._watermark, cursor[0])
+            if len(rows) < self.load_batch_size:
+                return loaded
+
+    def run_refresher(self, session: scoped_session, interval: float):
+        logger.info("Atualizador do índice de partnumbers iniciado.")
+        while True:
+            try:
+                self.refresh(session)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"ERRO ao atualizar o índice de partnumbers: {e}")
+            finally:
+                # devolve a conexão ao pool entre as leituras
+                session.remove()
+            time.sleep(interval)
@@ -0,0 +1,59 @@
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ProgressThrottle:
+    """
+    Limita as atualizações de progresso emitidas por sala a `max_per_second`.
+    Dentro do intervalo guarda apenas a atualização mais recente de cada chave,
+    entregue por `flush_due`; eventos finais devem chamar `discard` antes de
+    serem emitidos, para que nenhum progresso antigo chegue depois deles.
+    Com `max_per_second` <= 0 toda atualização é emitida imediatamente.
+    """
+
+    def __init__(self, emit: Callable, max_per_second: float):
+        self.emit = emit
+        self.interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._last_emit: Dict[str, float] = {}
+        self._pending: Dict[str, Tuple[str, dict, object]] = {}
+        self._last_prune = time.monotonic()
+
+    def update(self, key: str, event: str, payload: dict, to):
+        now = time.monotonic()
+        if now - self._last_emit.get(key, float("-inf")) >= self.interval:
+            self._pending.pop(key, None)
+            self._send(key, event, payload, to, now)
+        else:
+            self._pending[key] = (event, payload, to)
+
+    def discard(self, key: str):
+        """Descarta o progresso pendente da chave e esquece seu histórico."""
+        self._pending.pop(key, None)
+        self._last_emit.pop(key, None)
+
+    def flush_due(self):
+        now = time.monotonic()
+        for key in [k for k in self._pending if now - self._last_emit.get(k, float("-inf")) >= self.interval]:
+            self._send(key, *self._pending.pop(key), now)
+
+        if now - self._last_prune >= 60:
+            # chaves sem evento final (ex.: rota expirada) não podem crescer indefinidamente
+            self._last_emit = {k: t for k, t in self._last_emit.items() if now - t < self.interval or k in self._pending}
+            self._last_prune = now
+
+    def flush_all(self):
+        now = time.monotonic()
+        for key in list(self._pending):
+            self._send(key, *self._pending.pop(key), now)
+
+    def next_due_in(self) -> Optional[float]:
+        """Segundos até a próxima atualização pendente vencer, ou None se não houver."""
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        oldest = min(self._last_emit.get(k, float("-inf")) for k in self._pending)
+        return max(0.0, oldest + self.interval - now)
+
+    def _send(self, key: str, event: str, payload: dict, to, now: float):
+        self._last_emit[key] = now
+        self.emit(event, payload, to=to)
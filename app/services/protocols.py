@@ -1,12 +1,21 @@
-from typing import Any, Dict, Protocol
+from typing import Any, Dict, Iterable, List, Protocol
 
-from app.schemas.classification_schemas import StartSingleClassificationSchema
+from app.schemas.classification_schemas import StartBatchClassificationSchema, StartSingleClassificationSchema
 
 
 class IClassificationService(Protocol):
+    def get_cached_classification(self, schema):
+        ...
+
     def start_single_classification(self, schema):
         ...
 
+    def start_batch_classification(self, schema):
+        ...
+
+    def start_upload_classification(self, rows, room_id):
+        ...
+
 
 class IAsyncTaskClient(Protocol):
     def run_single_classification_task(self, schema: StartSingleClassificationSchema) -> str:
@@ -15,4 +24,15 @@ class IAsyncTaskClient(Protocol):
         """
         ...
 
+    def run_batch_classification_task(self, schema: StartBatchClassificationSchema) -> str:
+        """
+        Inicia o job pai de um lote de classificações e retorna o id da task
+        """
+        ...
 
+    def run_streamed_batch_classification_task(self, room_id: str, chunks: Iterable[List[Dict]]) -> str:
+        """
+        Abre um lote, enfileira cada chunk assim que ele é produzido e fixa o
+        total ao final; retorna o id da task do lote
+        """
+        ...
\ No newline at end of file
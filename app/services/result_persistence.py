@@ -0,0 +1,205 @@
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+import redis
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.codec import decode, encode
+from app.core.logger_config import logger
+from app.services.best_classification import refresh_best_classifications
+from app.services.tipi_index import normalize_ncm
+from app.models import Classification, ClassificationStatus, Manufacturer, Partnumber, Task, TaskStatus, Tipi
+
+
+RESULTS_QUEUE_KEY = "classification-results"
+DEAD_LETTER_KEY = "classification-results-dead"
+
+
+def enqueue_result(redis_client: redis.Redis, task_id: str, partnumber: str, result: Dict):
+    """Enfileira um resultado final para gravação em lote pelo `result_writer`."""
+    redis_client.rpush(RESULTS_QUEUE_KEY, encode({
+        "task_id": task_id,
+        "partnumber": partnumber,
+        "result": result,
+    }))
+
+
+def bulk_upsert_results(session: Session, results: List[Dict]):
+    """
+    Grava um lote de resultados com um upsert por tabela (ON CONFLICT) e um
+    único INSERT de classificações, em vez de ida e volta ao banco por linha.
+    """
+    task_ids = {r["task_id"] for r in results if r.get("task_id")}
+    if task_ids:
+        # só garante a linha referenciada pelas classificações: o status é do `TaskStateFlusher`,
+        # e o task_id de um item de lote é o do lote, que segue em andamento
+        session.execute(
+            insert(Task)
+            .values([{"id": task_id, "status": TaskStatus.PROCESSING} for task_id in task_ids])
+            .on_conflict_do_nothing(index_elements=[Task.id])
+        )
+
+    partnumber_ids = _upsert_partnumbers(session, {r["partnumber"] for r in results})
+    manufacturer_ids = _upsert_manufacturers(session, results)
+    tipi_ids = _upsert_tipi(session, results)
+
+    classifications = []
+    for r in results:
+        result = r.get("result") or {}
+        description = result.get("description")
+        tipi_id, tipi_deleted = tipi_ids.get(_tipi_key(result), (None, False))
+        classifications.append({
+            "partnumber_id": partnumber_ids[r["partnumber"]],
+            "task_id": r.get("task_id"),
+            "tipi_id": tipi_id,
+            # NCM já excluída da TIPI oficial: a classificação nasce para revisão, como no load_tipi.py
+            "status": ClassificationStatus.REVIEW if tipi_deleted else ClassificationStatus.ACTIVE,
+            "manufacturer_id": manufacturer_ids.get(_manufacturer_key(result)),
+            "short_description": description[:256] if description else None,
+            "long_description": description,
+            "confidence_rate": _confidence_rate(result.get("confidence_score")),
+        })
+    session.execute(insert(Classification), classifications)
+    refresh_best_classifications(session, partnumber_ids.values())
+
+
+def _upsert_partnumbers(session: Session, codes: set) -> Dict[str, int]:
+    stmt = insert(Partnumber).values([{"code": code} for code in codes])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Partnumber.code],
+        set_={"updated_at": func.now()},
+    ).returning(Partnumber.id, Partnumber.code)
+    return {code: id_ for id_, code in session.execute(stmt)}
+
+
+def _upsert_manufacturers(session: Session, results: List[Dict]) -> Dict[tuple, int]:
+    rows = {}
+    for r in results:
+        result = r.get("result") or {}
+        key = _manufacturer_key(result)
+        if key is not None:
+            rows[key] = {"name": key[0], "country": key[1], "address": result.get("endereco")}
+    if not rows:
+        return {}
+
+    stmt = insert(Manufacturer).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_manufacturer_name_country",
+        set_={"address": func.coalesce(stmt.excluded.address, Manufacturer.address)},
+    ).returning(Manufacturer.id, Manufacturer.name, Manufacturer.country)
+    return {(name, country): id_ for id_, name, country in session.execute(stmt)}
+
+
+def _upsert_tipi(session: Session, results: List[Dict]) -> Dict[tuple, Tuple[int, bool]]:
+    """Ids das entradas da TIPI por (ncm, ex), com a indicação de exclusão lógica (`deleted_at`)."""
+    rows = {}
+    for r in results:
+        key = _tipi_key(r.get("result") or {})
+        if key is not None:
+            rows[key] = {"ncm": key[0], "ex": key[1]}
+    if not rows:
+        return {}
+
+    stmt = insert(Tipi).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_tipi_ncm_ex",
+        set_={"ncm": stmt.excluded.ncm},
+    ).returning(Tipi.id, Tipi.ncm, Tipi.ex, Tipi.deleted_at)
+    return {(ncm, ex): (id_, deleted_at is not None) for id_, ncm, ex, deleted_at in session.execute(stmt)}
+
+
+def _manufacturer_key(result: Dict) -> Optional[tuple]:
+    name = result.get("fabricante")
+    if not name:
+        return None
+    return (name[:255], (result.get("pais") or None))
+
+
+def _tipi_key(result: Dict) -> Optional[tuple]:
+    """Mesma chave (ncm, ex) do `tipi_loader`: `8542.31.90` → `85423190`, ex `1` → `01`."""
+    ncm = normalize_ncm(str(result.get("ncm") or ""))
+    if not ncm:
+        return None
+    ex = str(result.get("exception") or "").strip() or None
+    ex = ex.zfill(2) if ex and ex.isdigit() else ex
+    return (ncm[:10], ex[:4] if ex else None)
+
+
+def _confidence_rate(score) -> Optional[Decimal]:
+    if score is None:
+        return None
+    return Decimal(str(min(max(float(score), 0.0), 1.0))).quantize(Decimal("0.001"))
+
+
+class ResultWriter:
+    """
+    Consumidor write-behind da fila de resultados finais. Acumula resultados e
+    grava em lote quando atinge `batch_size` ou quando o mais antigo espera
+    `flush_interval` segundos. Os itens só saem da fila após o commit, então uma
+    queda do processo não perde resultados (deve haver uma única instância).
+    """
+
+    def __init__(self, redis_client: redis.Redis, session: Session, batch_size: int, flush_interval: float, poll_interval: float):
+        self.redis_client = redis_client
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+
+    def run(self):
+        logger.info("Gravador de resultados iniciado, aguardando resultados finais...")
+        first_seen = None
+
+        while True:
+            try:
+                pending = self.redis_client.llen(RESULTS_QUEUE_KEY)
+                if not pending:
+                    first_seen = None
+                    time.sleep(self.poll_interval)
+                    continue
+
+                first_seen = first_seen or time.monotonic()
+                waited = time.monotonic() - first_seen
+                if pending < self.batch_size and waited < self.flush_interval:
+                    time.sleep(min(self.poll_interval, self.flush_interval - waited))
+                    continue
+
+                flushed = self.flush()
+                first_seen = time.monotonic() if pending > flushed else None
+            except redis.ConnectionError as e:
+                logger.error(f"Conexão com o Redis perdida no gravador de resultados: {e}")
+                time.sleep(self.flush_interval)
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"ERRO ao gravar lote de resultados: {e}")
+                time.sleep(self.flush_interval)
+
+    def flush(self) -> int:
+        raw_items = self.redis_client.lrange(RESULTS_QUEUE_KEY, 0, self.batch_size - 1)
+        if not raw_items:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            self._write(raw_items)
+        except (IntegrityError, DataError, ValueError, KeyError) as e:
+            # um resultado inválido não pode travar a fila: grava um a um e separa os que falharem
+            self.session.rollback()
+            logger.warning(f"Falha ao gravar lote de {len(raw_items)} resultado(s): {e}. Gravando individualmente.")
+            for item in raw_items:
+                try:
+                    self._write([item])
+                except (IntegrityError, DataError, ValueError, KeyError) as item_error:
+                    self.session.rollback()
+                    self.redis_client.rpush(DEAD_LETTER_KEY, item)
+                    logger.error(f"Resultado descartado para {DEAD_LETTER_KEY}: {item_error}")
+        self.redis_client.ltrim(RESULTS_QUEUE_KEY, len(raw_items), -1)
+
+        logger.info(f"{len(raw_items)} resultado(s) gravado(s) em {(time.perf_counter() - started) * 1000:.1f}ms.")
+        return len(raw_items)
+
+    def _write(self, raw_items: List[bytes]):
+        bulk_upsert_results(self.session, [decode(item) for item in raw_items])
+        self.session.commit()
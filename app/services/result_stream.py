@@ -0,0 +1,160 @@
+import os
+import socket
+import time
+from typing import Callable, Dict, List, Tuple, Type
+import redis
+from pydantic import BaseModel
+from app.core.codec import decode_model, get_codec
+from app.core.logger_config import logger
+from app.core.metrics import RESULT_RELAY_SECONDS
+from app.core.tracing import record_span, use_trace
+
+
+RESULTS_STREAM_KEY = "task_results"
+RESULTS_CONSUMER_GROUP = "web"
+
+
+def publish_result(redis_client: redis.Redis, payload: Dict, maxlen: int):
+    """Adiciona um resultado final ao stream `task_results`, aparado pelo tamanho."""
+    codec = get_codec()
+    redis_client.xadd(
+        RESULTS_STREAM_KEY,
+        {"ct": codec.content_type, "data": codec.encode(payload)},
+        maxlen=maxlen,
+        approximate=True,
+    )
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ResultStreamConsumer:
+    """
+    Consumidor do stream `task_results` dentro de um grupo compartilhado por
+    todos os processos web: cada resultado é entregue a um único consumidor,
+    confirmado (XACK) somente após o handler emitir para as salas, e entradas
+    pendentes de consumidores mortos são reivindicadas após `claim_idle_ms`.
+    Entradas que não decodificam são confirmadas e descartadas na hora.
+    Cada entrada é decodificada direto em `model` antes de chegar ao handler.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        model: Type[BaseModel],
+        consumer_name: str,
+        block_ms: int,
+        batch_size: int,
+        claim_idle_ms: int,
+        max_deliveries: int,
+    ):
+        self.redis_client = redis_client
+        self.model = model
+        self.consumer_name = consumer_name
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+
+    def run(self, handler: Callable[[BaseModel], None]):
+        retry_delay = 1
+
+        while True:
+            try:
+                self.ensure_group()
+                logger.info(f"Consumidor '{self.consumer_name}' lendo o stream '{RESULTS_STREAM_KEY}'.")
+                retry_delay = 1
+                last_claim = 0.0
+
+                while True:
+                    if time.monotonic() - last_claim >= self.claim_idle_ms / 1000:
+                        self.reclaim(handler)
+                        last_claim = time.monotonic()
+
+                    response = self.redis_client.xreadgroup(
+                        RESULTS_CONSUMER_GROUP,
+                        self.consumer_name,
+                        {RESULTS_STREAM_KEY: ">"},
+                        count=self.batch_size,
+                        block=self.block_ms,
+                    )
+                    for _, entries in response or []:
+                        self.process(handler, entries)
+            except redis.ConnectionError as e:
+                logger.error(f"Conexão com o Redis perdida no consumidor de resultados: {e}. Reconectando em {retry_delay}s.")
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+
+    def ensure_group(self):
+        try:
+            self.redis_client.xgroup_create(RESULTS_STREAM_KEY, RESULTS_CONSUMER_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def process(self, handler: Callable[[BaseModel], None], entries: List[Tuple[bytes, Dict]]):
+        for entry_id, fields in entries:
+            try:
+                message = decode_model(fields[b"data"], self.model, fields.get(b"ct"))
+            except Exception as e:
+                # payload que não decodifica falharia em toda nova entrega: confirma e descarta já
+                self.redis_client.xack(RESULTS_STREAM_KEY, RESULTS_CONSUMER_GROUP, entry_id)
+                logger.error(f"Resultado {entry_id} descartado: payload inválido ({e}).")
+                continue
+
+            with use_trace(getattr(message, "trace_id", None)):
+                try:
+                    handler(message)
+                except Exception as e:
+                    # sem XACK: a entrada continua pendente e será reivindicada depois
+                    logger.error(f"ERRO ao processar resultado {entry_id}: {e}")
+                    continue
+                self.redis_client.xack(RESULTS_STREAM_KEY, RESULTS_CONSUMER_GROUP, entry_id)
+                age = _entry_age(entry_id)
+                RESULT_RELAY_SECONDS.observe(age)
+                record_span("result.relay", time.time() - age, age, entry_id=entry_id.decode("utf-8") if isinstance(entry_id, bytes) else entry_id)
+
+    def reclaim(self, handler: Callable[[BaseModel], None]):
+        """Reivindica entradas pendentes há mais de `claim_idle_ms` (inclusive as próprias)."""
+        pending = self.redis_client.xpending_range(
+            RESULTS_STREAM_KEY,
+            RESULTS_CONSUMER_GROUP,
+            min="-",
+            max="+",
+            count=self.batch_size,
+            idle=self.claim_idle_ms,
+        )
+        if not pending:
+            return
+
+        to_claim = []
+        for entry in pending:
+            if entry["times_delivered"] >= self.max_deliveries:
+                self.redis_client.xack(RESULTS_STREAM_KEY, RESULTS_CONSUMER_GROUP, entry["message_id"])
+                logger.error(
+                    f"Resultado {entry['message_id']} descartado após {entry['times_delivered']} entrega(s) sem sucesso."
+                )
+            else:
+                to_claim.append(entry["message_id"])
+        if not to_claim:
+            return
+
+        claimed = self.redis_client.xclaim(
+            RESULTS_STREAM_KEY,
+            RESULTS_CONSUMER_GROUP,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            message_ids=to_claim,
+        )
+        # entradas já removidas pelo XTRIM voltam como (id, None)
+        entries = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        logger.info(f"{len(entries)} resultado(s) pendente(s) reivindicado(s) por '{self.consumer_name}'.")
+        self.process(handler, entries)
+
+
+def _entry_age(entry_id) -> float:
+    """O id da entrada (`<ms>-<seq>`) é o instante do XADD no relógio do Redis."""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode("utf-8")
+    return max(0.0, time.time() - int(entry_id.split("-")[0]) / 1000)
@@ -0,0 +1,63 @@
+import json
+from typing import Iterable, List, Tuple
+import redis
+
+
+ROOM_EVENTS_KEY_PREFIX = "room-events"
+
+
+class RoomEventLog:
+    """
+    Histórico curto dos eventos emitidos a cada sala do Socket.IO, em um stream
+    Redis por sala limitado a `maxlen` eventos e apagado `ttl` segundos após o
+    último. O cliente só entra na sala depois de receber o `room_id` na resposta
+    do POST; com o histórico, o que foi emitido antes do `join` (inclusive o
+    resultado final, seguido de `close_room`) é reenviado a ele na entrada.
+    """
+
+    def __init__(self, redis_client: redis.Redis, maxlen: int, ttl: int, enabled: bool = True):
+        self.redis_client = redis_client
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def record(self, event: str, payload, rooms):
+        if not self.enabled:
+            return
+        entry = {"event": event, "data": json.dumps(payload, default=str)}
+        pipe = self.redis_client.pipeline(transaction=False)
+        for room in [rooms] if isinstance(rooms, str) else rooms:
+            key = self._key(room)
+            pipe.xadd(key, entry, maxlen=self.maxlen, approximate=True)
+            pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def read(self, room: str, after: str | None = None) -> List[Tuple[str, str, object]]:
+        """Eventos da sala em ordem de emissão, como (id, evento, dados); com `after`, só os posteriores."""
+        if not self.enabled:
+            return []
+        entries = self.redis_client.xrange(self._key(room), min=f"({after}" if after else "-")
+        return [
+            (entry_id.decode("utf-8"), fields[b"event"].decode("utf-8"), json.loads(fields[b"data"]))
+            for entry_id, fields in entries
+        ]
+
+    @staticmethod
+    def _key(room: str) -> str:
+        return f"{ROOM_EVENTS_KEY_PREFIX}:{room}"
+
+
+class RecordingEmitter:
+    """
+    Emissor com a mesma interface `emit(event, data, to=...)` do `SocketIO`, que
+    grava o evento no histórico das salas antes de emiti-lo. Gravar antes garante
+    que um evento ausente do histórico lido no `join` ainda será entregue ao vivo.
+    """
+
+    def __init__(self, socketio, log: RoomEventLog):
+        self.socketio = socketio
+        self.log = log
+
+    def emit(self, event: str, data, to: str | Iterable[str]):
+        self.log.record(event, data, to)
+        self.socketio.emit(event, data, to=to)
@@ -0,0 +1,40 @@
+import csv
+import itertools
+import unicodedata
+from typing import IO, Iterator, List
+
+
+CSV_DELIMITERS = ";,\t"
+
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[List[str]]:
+    """
+    Lê um CSV linha a linha. O delimitador é detectado pelo cabeçalho, então o
+    arquivo não precisa ser seekable (funciona direto sobre o corpo da requisição).
+    """
+    header = stream.readline()
+    if not header:
+        return
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        # cabeçalho de uma única coluna não tem delimitador para detectar
+        dialect = csv.excel
+    yield from csv.reader(itertools.chain([header], stream), dialect)
+
+
+def iter_xlsx_rows(file) -> Iterator[List]:
+    """Lê a primeira planilha em modo `read_only`, que percorre o XML sob demanda em vez de carregar a pasta inteira."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def normalize_header(name) -> str:
+    """`Descrição ` → `descricao`: minúsculo, sem acentos e sem espaços nas pontas."""
+    return unicodedata.normalize("NFKD", str(name or "").strip().lower()).encode("ascii", "ignore").decode("ascii")
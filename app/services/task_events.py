@@ -0,0 +1,131 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+import redis
+from app.core.logger_config import logger
+from app.models import TaskStatus
+
+
+TASK_EVENTS_KEY_PREFIX = "task-events"
+TASK_EVENTS_CHANNEL = "task-events"
+
+# início do stream: um cliente sem Last-Event-ID recebe o histórico guardado inteiro
+STREAM_START = "0-0"
+TERMINAL_EVENTS = (TaskStatus.DONE.value, TaskStatus.FAILED.value)
+EVENT_FIELDS = ("status", "current", "total", "message", "result", "error")
+
+_EVENT_ID = re.compile(r"^\d+-\d+$")
+
+
+def task_events_key(task_id: str) -> str:
+    return f"{TASK_EVENTS_KEY_PREFIX}:{task_id}"
+
+
+def append_task_event(pipe, task_id: str, fields: Dict, maxlen: int, ttl: int):
+    """
+    Acrescenta ao pipeline a gravação de uma mudança de status da task no stream
+    dela e o aviso aos processos web que têm clientes esperando por essa task.
+    O id da entrada no stream é o id do evento SSE, usado para retomar com `Last-Event-ID`.
+    """
+    data = {field: fields[field] for field in EVENT_FIELDS if fields.get(field) is not None}
+    key = task_events_key(task_id)
+    pipe.xadd(key, {"event": data["status"], "data": json.dumps(data)}, maxlen=maxlen, approximate=True)
+    pipe.expire(key, ttl)
+    pipe.publish(TASK_EVENTS_CHANNEL, task_id)
+
+
+def parse_event_id(value: Optional[str]) -> str:
+    """Valida um `Last-Event-ID` recebido; ids inválidos recomeçam do início do stream."""
+    if value and _EVENT_ID.match(value.strip()):
+        return value.strip()
+    return STREAM_START
+
+
+class TaskEventHub:
+    """
+    Entrega os eventos de progresso das tasks aos clientes SSE e long-poll de um
+    processo web. Uma única assinatura do canal `task-events` por processo acorda
+    só as conexões que esperam pela task avisada; cada conexão ociosa custa um
+    greenlet parado em um `Event`, sem conexão própria com o Redis. Os eventos em
+    si são lidos do stream da task, então um aviso perdido (reconexão do pubsub)
+    atrasa a entrega até o próximo heartbeat, mas não perde o evento.
+    """
+
+    def __init__(self, redis_client: redis.Redis, read_count: int = 100, reconnect_delay: float = 1.0):
+        self.redis_client = redis_client
+        self.read_count = read_count
+        self.reconnect_delay = reconnect_delay
+        self._waiters: Dict[str, Set[threading.Event]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def read(self, task_id: str, after: str = STREAM_START) -> List[Tuple[str, str, Dict]]:
+        """Eventos da task posteriores a `after`, como (id, evento, dados)."""
+        response = self.redis_client.xread({task_events_key(task_id): after}, count=self.read_count)
+        if not response:
+            return []
+        return [
+            (entry_id.decode("utf-8"), fields[b"event"].decode("utf-8"), json.loads(fields[b"data"]))
+            for entry_id, fields in response[0][1]
+        ]
+
+    @contextmanager
+    def subscribe(self, task_id: str):
+        """
+        Registra a conexão como interessada na task durante o bloco. O `Event`
+        devolvido é marcado a cada novo evento; limpe-o antes de ler o stream
+        para não perder um aviso que chegue entre a leitura e a espera.
+        """
+        self._ensure_listener()
+        waiter = threading.Event()
+        with self._lock:
+            self._waiters[task_id].add(waiter)
+        try:
+            yield waiter
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(task_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[task_id]
+
+    def _notify(self, task_id: Optional[str] = None):
+        with self._lock:
+            if task_id is None:
+                waiters = [waiter for group in self._waiters.values() for waiter in group]
+            else:
+                waiters = list(self._waiters.get(task_id, ()))
+        for waiter in waiters:
+            waiter.set()
+
+    def _ensure_listener(self):
+        # a thread não sobrevive a um fork: cada processo web inicia a sua
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen, name="task-event-hub", daemon=True).start()
+
+    def _listen(self):
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(TASK_EVENTS_CHANNEL)
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._notify(message["data"].decode("utf-8"))
+            except redis.RedisError as e:
+                logger.warning(f"Assinatura de eventos das tasks perdida, reconectando: {e}")
+                # avisos perdidos durante a queda: todos releem o stream
+                self._notify()
+                time.sleep(self.reconnect_delay)
+            finally:
+                pubsub.close()
@@ -0,0 +1,214 @@
+import json
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+import redis
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.logger_config import logger
+from app.models import Task, TaskStatus
+from app.services.task_events import append_task_event
+
+
+TASK_STATE_KEY_PREFIX = "task-state"
+DIRTY_SET_KEY = "task-state-dirty"
+TERMINAL_SET_KEY = "task-state-terminal"
+
+TERMINAL_STATUSES = (TaskStatus.DONE.value, TaskStatus.FAILED.value)
+PERSISTED_FIELDS = ("job_id", "room_id", "progress_channel", "status", "current", "total", "message")
+
+
+class TaskStateStore:
+    """
+    Estado "quente" das tasks em um hash Redis por task, atualizado a cada
+    mensagem de progresso. Cada atualização marca a task como suja para que o
+    `TaskStateFlusher` grave apenas o último valor no banco. Com `events_maxlen`
+    > 0, cada mudança de status também entra no stream de eventos da task, lido
+    pelos clientes SSE e long-poll de `/tasks/<task_id>/events`.
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: int, events_maxlen: int = 0, events_ttl: int = 0):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.events_maxlen = events_maxlen
+        self.events_ttl = events_ttl or ttl
+
+    def update(self, task_id: str, **fields):
+        mapping = {}
+        for field, value in fields.items():
+            if value is None:
+                continue
+            mapping[field] = json.dumps(value) if isinstance(value, (dict, list)) else value
+        mapping["updated_at"] = time.time()
+
+        key = self._key(task_id)
+        terminal = fields.get("status") in TERMINAL_STATUSES
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.ttl)
+        if terminal:
+            pipe.srem(DIRTY_SET_KEY, task_id)
+            pipe.sadd(TERMINAL_SET_KEY, task_id)
+        else:
+            pipe.sadd(DIRTY_SET_KEY, task_id)
+        if self.events_maxlen > 0 and "status" in mapping:
+            append_task_event(pipe, task_id, fields, self.events_maxlen, self.events_ttl)
+        pipe.execute()
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        stored = self.redis_client.hgetall(self._key(task_id))
+        if not stored:
+            return None
+
+        state = {k.decode("utf-8"): v.decode("utf-8") for k, v in stored.items()}
+        for field in ("current", "total"):
+            if field in state:
+                state[field] = int(state[field])
+        if "result" in state:
+            state["result"] = json.loads(state["result"])
+        state["updated_at"] = float(state["updated_at"])
+        return state
+
+    def pop_dirty(self, terminal: bool, count: int) -> List[str]:
+        popped = self.redis_client.spop(TERMINAL_SET_KEY if terminal else DIRTY_SET_KEY, count) or []
+        return [task_id.decode("utf-8") for task_id in popped]
+
+    def mark_dirty(self, task_ids: List[str], terminal: bool):
+        self.redis_client.sadd(TERMINAL_SET_KEY if terminal else DIRTY_SET_KEY, *task_ids)
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Dict]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hgetall(self._key(task_id))
+        states = {}
+        for task_id, stored in zip(task_ids, pipe.execute()):
+            if stored:
+                states[task_id] = {k.decode("utf-8"): v.decode("utf-8") for k, v in stored.items()}
+        return states
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"{TASK_STATE_KEY_PREFIX}:{task_id}"
+
+
+class TaskStateFlusher:
+    """
+    Grava o estado das tasks na tabela `tasks` de forma agregada: estados
+    terminais a cada `poll_interval`, demais estados a cada `flush_interval`,
+    sempre com o valor mais recente de cada task em um único upsert.
+    """
+
+    def __init__(self, store: TaskStateStore, session: Session, batch_size: int, flush_interval: float, poll_interval: float):
+        self.store = store
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+
+    def run(self):
+        logger.info("Gravador de estado das tasks iniciado.")
+        last_flush = time.monotonic()
+
+        while True:
+            try:
+                self.flush(terminal=True)
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self.flush(terminal=False)
+                    last_flush = time.monotonic()
+            except redis.ConnectionError as e:
+                logger.error(f"Conexão com o Redis perdida no gravador de estado das tasks: {e}")
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"ERRO ao gravar estado das tasks: {e}")
+            time.sleep(self.poll_interval)
+
+    def flush(self, terminal: bool) -> int:
+        flushed = 0
+        while True:
+            task_ids = self.store.pop_dirty(terminal, self.batch_size)
+            if not task_ids:
+                return flushed
+
+            try:
+                rows = [self._to_row(task_id, state) for task_id, state in self.store.get_many(task_ids).items()]
+                if rows:
+                    stmt = insert(Task).values(rows)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[Task.id],
+                        set_={field: stmt.excluded[field] for field in PERSISTED_FIELDS},
+                    )
+                    self.session.execute(stmt)
+                    self.session.commit()
+            except Exception:
+                # devolve as tasks ao conjunto para a próxima tentativa
+                self.store.mark_dirty(task_ids, terminal)
+                raise
+            flushed += len(rows)
+
+            if len(task_ids) < self.batch_size:
+                return flushed
+
+    @staticmethod
+    def _to_row(task_id: str, state: Dict[str, str]) -> Dict:
+        row = {field: state.get(field) for field in PERSISTED_FIELDS}
+        row["id"] = task_id
+        row["status"] = TaskStatus(state.get("status", TaskStatus.STARTED.value))
+        row["message"] = row["message"][:256] if row["message"] else None
+        for field in ("current", "total"):
+            row[field] = int(row[field]) if row[field] is not None else None
+        return row
+
+
+class OrphanTaskReaper:
+    """
+    Varredura periódica das tasks que ficaram presas: sem mensagem final do servidor
+    de IA e sem rota para o vigia do roteador encerrar (worker morto antes de registrar
+    a rota, chunk de lote perdido). Tasks ainda não terminais no banco depois de
+    `max_age` segundos viram falha no banco e, se ainda existir, no estado do Redis.
+    """
+
+    MESSAGE = "Processamento abandonado: a task não terminou dentro do prazo."
+
+    def __init__(self, store: TaskStateStore, session: Session, max_age: int, interval: float, batch_size: int):
+        self.store = store
+        self.session = session
+        self.max_age = max_age
+        self.interval = interval
+        self.batch_size = batch_size
+
+    def run(self):
+        logger.info("Varredura de tasks abandonadas iniciada.")
+        while True:
+            try:
+                while self.reap() == self.batch_size:
+                    pass
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"ERRO na varredura de tasks abandonadas: {e}")
+            time.sleep(self.interval)
+
+    def reap(self) -> int:
+        stuck = (
+            select(Task.id)
+            .where(
+                Task.status.in_([TaskStatus.STARTED, TaskStatus.PROCESSING]),
+                Task.created_at < func.now() - timedelta(seconds=self.max_age),
+            )
+            .limit(self.batch_size)
+        )
+        task_ids = self.session.scalars(
+            update(Task)
+            .where(Task.id.in_(stuck.scalar_subquery()))
+            .values(status=TaskStatus.FAILED, message=self.MESSAGE)
+            .returning(Task.id)
+        ).all()
+        self.session.commit()
+
+        for task_id in task_ids:
+            if self.store.get(task_id) is not None:
+                self.store.update(task_id, status=TaskStatus.FAILED.value, message=self.MESSAGE)
+        if task_ids:
+            logger.warning(f"{len(task_ids)} task(s) abandonada(s) encerrada(s) como falha.")
+        return len(task_ids)
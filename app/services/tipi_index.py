@@ -0,0 +1,183 @@
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.logger_config import logger
+from app.models import Tipi
+
+
+# níveis da NCM pelo número de dígitos: capítulo, posição, subposições, item e subitem
+NCM_LEVELS = {2: "capitulo", 4: "posicao", 5: "subposicao_1", 6: "subposicao_2", 7: "item", 8: "subitem"}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_ncm(value: str) -> str:
+    """Remove pontos e demais separadores: `8471.30.12` → `84713012`."""
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return TOKEN_PATTERN.findall(text)
+
+
+class _TrieNode:
+    __slots__ = ("children", "start", "end", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # intervalo [start, end) das entradas da subárvore na lista ordenada por NCM
+        self.start = 0
+        self.end = 0
+        # entradas cuja NCM termina exatamente neste nó (uma por `ex`)
+        self.entries: List[int] = []
+
+
+class _Snapshot:
+    """Estrutura imutável do índice; uma reconstrução troca o snapshot inteiro de uma vez."""
+
+    def __init__(self, rows: List[Tuple]):
+        entries = []
+        for id_, ncm, ex, description, tax in rows:
+            digits = normalize_ncm(ncm)
+            if digits:
+                entries.append({
+                    "id": id_,
+                    "ncm": digits,
+                    "ex": ex,
+                    "description": description,
+                    "tax": float(tax) if tax is not None else None,
+                })
+        entries.sort(key=lambda e: (e["ncm"], e["ex"] or ""))
+        self.entries = entries
+
+        self.root = _TrieNode()
+        self.root.end = len(entries)
+        for position, entry in enumerate(entries):
+            node = self.root
+            for digit in entry["ncm"]:
+                child = node.children.get(digit)
+                if child is None:
+                    child = node.children[digit] = _TrieNode()
+                    child.start = position
+                child.end = position + 1
+                node = child
+            node.entries.append(position)
+
+        tokens: Dict[str, set] = {}
+        for position, entry in enumerate(entries):
+            for token in tokenize(entry["description"]):
+                tokens.setdefault(token, set()).add(position)
+        self.tokens = {token: frozenset(positions) for token, positions in tokens.items()}
+        self.sorted_tokens = sorted(self.tokens)
+
+    def node(self, digits: str) -> Optional[_TrieNode]:
+        node = self.root
+        for digit in digits:
+            node = node.children.get(digit)
+            if node is None:
+                return None
+        return node
+
+    def matching_token(self, token: str, as_prefix: bool) -> frozenset:
+        if not as_prefix:
+            return self.tokens.get(token, frozenset())
+        positions = set()
+        i = bisect_left(self.sorted_tokens, token)
+        while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(token):
+            positions.update(self.tokens[self.sorted_tokens[i]])
+            i += 1
+        return frozenset(positions)
+
+
+class TipiIndex:
+    """
+    Índice em memória da tabela `tipi`: uma trie sobre os dígitos da NCM, com os
+    níveis de capítulo/posição/subposição, e um índice invertido de tokens das
+    descrições. Reconstruído quando a assinatura da tabela (quantidade, maior id
+    e última atualização) muda, verificada no máximo a cada `check_interval`.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._signature = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self, session: Session):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            signature = tuple(session.execute(
+                select(func.count(Tipi.id), func.max(Tipi.id), func.max(func.coalesce(Tipi.updated_at, Tipi.created_at)))
+            ).one())
+            if signature != self._signature or self._snapshot is None:
+                self._rebuild(session)
+                self._signature = signature
+            self._checked_at = time.monotonic()
+
+    def lookup(self, ncm: str) -> Optional[Dict]:
+        """Entradas da NCM exata (uma por `ex`) e a hierarquia de níveis acima dela."""
+        snapshot = self._snapshot
+        digits = normalize_ncm(ncm)
+        node = snapshot.node(digits) if digits else None
+        if node is None or not node.entries:
+            return None
+
+        hierarchy = []
+        for length, level in NCM_LEVELS.items():
+            if length >= len(digits):
+                break
+            parent = snapshot.node(digits[:length])
+            for position in parent.entries:
+                entry = snapshot.entries[position]
+                if entry["ex"] is None:
+                    hierarchy.append({"level": level, **entry})
+
+        return {
+            "ncm": digits,
+            "level": NCM_LEVELS.get(len(digits)),
+            "entries": [snapshot.entries[position] for position in node.entries],
+            "hierarchy": hierarchy,
+        }
+
+    def search(self, query: str = "", prefix: str = "", limit: int = 20) -> List[Dict]:
+        """
+        Busca por descrição (todos os termos, o último como prefixo para
+        autocomplete) restrita opcionalmente a um prefixo de NCM.
+        """
+        snapshot = self._snapshot
+        digits = normalize_ncm(prefix)
+        node = snapshot.node(digits)
+        if node is None:
+            return []
+
+        tokens = tokenize(query)
+        if not tokens:
+            return snapshot.entries[node.start:min(node.end, node.start + limit)]
+
+        sets = [snapshot.matching_token(token, as_prefix=i == len(tokens) - 1) for i, token in enumerate(tokens)]
+        matches = frozenset.intersection(*sorted(sets, key=len))
+        positions = sorted(p for p in matches if node.start <= p < node.end)
+        return [snapshot.entries[p] for p in positions[:limit]]
+
+    def _rebuild(self, session: Session):
+        started = time.perf_counter()
+        rows = session.execute(
+            select(Tipi.id, Tipi.ncm, Tipi.ex, Tipi.description, Tipi.tax).where(Tipi.deleted_at.is_(None))
+        ).all()
+        self._snapshot = _Snapshot(rows)
+        logger.info(
+            f"Índice TIPI reconstruído com {len(self._snapshot.entries)} NCM(s) "
+            f"em {(time.perf_counter() - started) * 1000:.1f}ms."
+        )
@@ -0,0 +1,225 @@
+import csv
+import io
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.logger_config import logger
+from app.models import ClassificationStatus
+from app.services.spreadsheet import iter_csv_rows, iter_xlsx_rows, normalize_header
+
+
+# nomes de coluna aceitos no arquivo oficial (sem acento, minúsculos) → campo da tabela `tipi`
+COLUMN_ALIASES = {
+    "ncm": "ncm",
+    "codigo": "ncm",
+    "ex": "ex",
+    "descricao": "description",
+    "description": "description",
+    "aliquota": "tax",
+    "aliquota (%)": "tax",
+    "tax": "tax",
+}
+
+STAGE_TABLE = "tipi_stage"
+
+
+class TipiFileError(ValueError):
+    """Arquivo da TIPI em formato inesperado (colunas ausentes ou extensão não suportada)."""
+
+
+def read_tipi_file(path: str, encoding: str = "utf-8-sig") -> Iterator[Tuple[str, Optional[str], Optional[str], Optional[Decimal]]]:
+    """Lê o arquivo oficial (CSV ou XLSX) linha a linha, já normalizado para `(ncm, ex, description, tax)`."""
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        rows = _read_csv(path, encoding)
+    elif lower.endswith(".xlsx"):
+        rows = iter_xlsx_rows(path)
+    else:
+        raise TipiFileError(f"Formato não suportado: {path}. Use CSV ou XLSX.")
+    return normalize_rows(rows)
+
+
+def normalize_rows(rows: Iterable[List]) -> Iterator[Tuple[str, Optional[str], Optional[str], Optional[Decimal]]]:
+    rows = iter(rows)
+    columns = _map_header(next(rows, None))
+    seen = set()
+    skipped = 0
+
+    for row in rows:
+        values = {field: row[i] if i < len(row) else None for field, i in columns.items()}
+        ncm = "".join(ch for ch in str(values.get("ncm") or "") if ch.isdigit())
+        if not ncm:
+            # linhas de título e notas do arquivo oficial não têm NCM
+            skipped += 1
+            continue
+
+        ex = _clean(values.get("ex"))
+        ex = ex.zfill(2) if ex and ex.isdigit() else ex
+        key = (ncm[:10], ex[:4] if ex else None)
+        if key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+
+        yield key[0], key[1], _clean(values.get("description")), _parse_tax(values.get("tax"))
+
+    if skipped:
+        logger.info(f"{skipped} linha(s) sem NCM ou duplicada(s) ignorada(s) no arquivo da TIPI.")
+
+
+def apply_tipi_diff(session: Session, rows: Iterable[Tuple], flag_classifications: bool = False) -> Dict:
+    """
+    Carrega as linhas numa tabela temporária via `COPY` e aplica na `tipi`, numa
+    única transação, apenas o que mudou pela chave `uq_tipi_ncm_ex`: inserções,
+    atualizações e exclusões lógicas (`deleted_at`). Opcionalmente marca para
+    revisão as classificações que apontam para NCMs alteradas ou excluídas.
+    """
+    started = time.perf_counter()
+    try:
+        session.execute(text(
+            f"CREATE TEMP TABLE {STAGE_TABLE} "
+            "(ncm VARCHAR(10) NOT NULL, ex VARCHAR(4), description TEXT, tax NUMERIC(6, 2)) ON COMMIT DROP"
+        ))
+        cursor = session.connection().connection.cursor()
+        cursor.copy_expert(f"COPY {STAGE_TABLE} (ncm, ex, description, tax) FROM STDIN WITH (FORMAT csv)", _CsvStream(rows))
+        staged = cursor.rowcount
+        session.execute(text(f"CREATE INDEX ON {STAGE_TABLE} (ncm)"))
+        session.execute(text(f"ANALYZE {STAGE_TABLE}"))
+
+        updated = session.execute(text(f"""
+            UPDATE tipi t
+               SET description = s.description, tax = s.tax, deleted_at = NULL, updated_at = now()
+              FROM {STAGE_TABLE} s
+             WHERE t.ncm = s.ncm AND t.ex IS NOT DISTINCT FROM s.ex
+               AND (t.description IS DISTINCT FROM s.description
+                    OR t.tax IS DISTINCT FROM s.tax
+                    OR t.deleted_at IS NOT NULL)
+         RETURNING t.id, t.ncm, t.ex
+        """)).all()
+
+        inserted = session.execute(text(f"""
+            INSERT INTO tipi (ncm, ex, description, tax)
+            SELECT s.ncm, s.ex, s.description, s.tax
+              FROM {STAGE_TABLE} s
+             WHERE NOT EXISTS (SELECT 1 FROM tipi t WHERE t.ncm = s.ncm AND t.ex IS NOT DISTINCT FROM s.ex)
+         RETURNING id, ncm, ex
+        """)).all()
+
+        deleted = session.execute(text(f"""
+            UPDATE tipi t
+               SET deleted_at = now(), updated_at = now()
+             WHERE t.deleted_at IS NULL
+               AND NOT EXISTS (SELECT 1 FROM {STAGE_TABLE} s WHERE s.ncm = t.ncm AND s.ex IS NOT DISTINCT FROM t.ex)
+         RETURNING t.id, t.ncm, t.ex
+        """)).all()
+
+        flagged = 0
+        changed_ids = [row.id for row in updated] + [row.id for row in deleted]
+        if flag_classifications and changed_ids:
+            flagged = session.execute(
+                text("""
+                    UPDATE classifications SET status = :review, updated_at = now()
+                     WHERE tipi_id = ANY(:ids) AND status = :active
+                """),
+                {
+                    "review": ClassificationStatus.REVIEW.name,
+                    "active": ClassificationStatus.ACTIVE.name,
+                    "ids": changed_ids,
+                },
+            ).rowcount
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    report = {
+        "staged": staged,
+        "inserted": _ncm_list(inserted),
+        "updated": _ncm_list(updated),
+        "deleted": _ncm_list(deleted),
+        "flagged_classifications": flagged,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(
+        f"TIPI atualizada em {report['elapsed_seconds']}s: {staged} linha(s) no arquivo, "
+        f"{len(inserted)} inserida(s), {len(updated)} atualizada(s), {len(deleted)} excluída(s), "
+        f"{flagged} classificação(ões) marcada(s) para revisão."
+    )
+    return report
+
+
+class _CsvStream(io.RawIOBase):
+    """Arquivo somente leitura que gera o CSV do `COPY` sob demanda, sem materializar o arquivo inteiro."""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._pending) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._pending += chunk
+        if size < 0:
+            data, self._pending = self._pending, b""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def _next_chunk(self, rows_per_chunk: int = 1000) -> bytes:
+        for _, row in zip(range(rows_per_chunk), self._rows):
+            # campos None viram vazio sem aspas, que o COPY em formato csv interpreta como NULL
+            self._writer.writerow(["" if value is None else value for value in row])
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+def _read_csv(path: str, encoding: str) -> Iterator[List]:
+    with open(path, newline="", encoding=encoding) as f:
+        yield from iter_csv_rows(f)
+
+
+def _map_header(header: Optional[List]) -> Dict[str, int]:
+    if header is None:
+        raise TipiFileError("Arquivo da TIPI vazio.")
+    columns = {}
+    for i, name in enumerate(header):
+        field = COLUMN_ALIASES.get(normalize_header(name))
+        if field and field not in columns:
+            columns[field] = i
+    if "ncm" not in columns:
+        raise TipiFileError(f"Coluna NCM não encontrada no cabeçalho: {header}")
+    return columns
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _parse_tax(value) -> Optional[Decimal]:
+    """Alíquota em percentual; `NT` (não tributado) e vazios viram NULL."""
+    value = _clean(value)
+    if value is None:
+        return None
+    try:
+        return Decimal(value.replace("%", "").replace(",", ".").strip()).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def _ncm_list(rows) -> List[Dict]:
+    return [{"ncm": row.ncm, "ex": row.ex} for row in rows]
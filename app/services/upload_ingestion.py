@@ -0,0 +1,114 @@
+import codecs
+import io
+import shutil
+import tempfile
+from typing import IO, Dict, Iterator, Optional, Tuple
+from app.services.spreadsheet import iter_csv_rows, iter_xlsx_rows, normalize_header
+
+
+# nomes de coluna aceitos na planilha (sem acento, minúsculos) → campo de `SingleClassificationRequest`
+UPLOAD_COLUMN_ALIASES = {
+    "partnumber": "partnumber",
+    "part number": "partnumber",
+    "part_number": "partnumber",
+    "pn": "partnumber",
+    "descricao": "description",
+    "description": "description",
+    "fabricante": "manufacturer",
+    "manufacturer": "manufacturer",
+    "fornecedor": "supplier",
+    "supplier": "supplier",
+}
+
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+
+# XLSX é um zip com o índice no final: precisa de arquivo seekable, em disco acima deste tamanho
+XLSX_SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+class UploadFileError(ValueError):
+    """Planilha enviada em formato inesperado (extensão, codificação ou cabeçalho)."""
+
+
+def upload_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Formato da planilha pela extensão do arquivo ou, sem nome, pelo Content-Type."""
+    lower = (filename or "").lower()
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith(".xlsx"):
+        return "xlsx"
+    file_format = CONTENT_TYPE_FORMATS.get((content_type or "").lower())
+    if file_format is None:
+        raise UploadFileError(f"Formato não suportado: {filename or content_type}. Use CSV ou XLSX.")
+    return file_format
+
+
+def read_upload_rows(stream: IO[bytes], file_format: str, encoding: str = "utf-8-sig") -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lê a planilha sob demanda e gera `(linha, campos)` para cada linha não vazia,
+    com a linha contada a partir do cabeçalho (linha 1). O cabeçalho é validado
+    antes do retorno, então erros de formato aparecem antes de qualquer item.
+    """
+    if file_format == "csv":
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise UploadFileError(f"Codificação desconhecida: {encoding}")
+        text = io.TextIOWrapper(_readable(stream), encoding=encoding, errors="replace", newline="")
+        rows = iter_csv_rows(text)
+    elif file_format == "xlsx":
+        rows = iter_xlsx_rows(_seekable(stream))
+    else:
+        raise UploadFileError(f"Formato não suportado: {file_format}. Use CSV ou XLSX.")
+
+    try:
+        columns = _map_header(next(rows, None))
+    except Exception:
+        rows.close()
+        raise
+    return _iter_items(rows, columns)
+
+
+def _iter_items(rows: Iterator, columns: Dict[str, int]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    for line, row in enumerate(rows, start=2):
+        item = {}
+        for field, i in columns.items():
+            value = row[i] if i < len(row) else None
+            value = str(value).strip() if value is not None else ""
+            if value:
+                item[field] = value
+        if item:
+            yield line, item
+
+
+def _map_header(header) -> Dict[str, int]:
+    if header is None:
+        raise UploadFileError("Planilha vazia.")
+    columns = {}
+    for i, name in enumerate(header):
+        field = UPLOAD_COLUMN_ALIASES.get(normalize_header(name))
+        if field and field not in columns:
+            columns[field] = i
+    if "partnumber" not in columns:
+        raise UploadFileError(f"Coluna partnumber não encontrada no cabeçalho: {list(header)}")
+    return columns
+
+
+def _readable(stream: IO[bytes]) -> IO[bytes]:
+    # o corpo cru da requisição é um stream sem `readable()`/`read1()`; o TextIOWrapper precisa de um buffer
+    if isinstance(stream, io.BufferedIOBase) or hasattr(stream, "read1"):
+        return stream
+    return io.BufferedReader(stream)
+
+
+def _seekable(stream: IO[bytes]) -> IO[bytes]:
+    if stream.seekable():
+        return stream
+    spooled = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(stream, spooled)
+    spooled.seek(0)
+    return spooled
@@ -1,16 +1,75 @@
 from flask_socketio import SocketIO
 from celery.utils.log import get_task_logger
 from pydantic import BaseModel
+import time
 import redis
 from app.config import settings
+from app.core.logger_config import logger
+from app.core.metrics import AI_INITIATION_SECONDS, AI_LIMITER_WAIT_SECONDS
+from app.core.tracing import span
 from app.events.events_enum import EventName
+from app.schemas.ai_schemas import AISingleClassificationRequest
+from app.services.ai_rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE, AIRateLimiter, AIRateLimitTimeout
+from app.services.ai_server_client import AIServerError, ai_server_client
+from app.services.classification_cache import ClassificationCache
+from app.services.inflight_registry import InflightRegistry
+from app.services.progress_throttle import ProgressThrottle
+from app.services.room_events import RecordingEmitter, RoomEventLog
+from app.services.task_state import TaskStateStore
 
 celery_logger = get_task_logger(__name__)
 
-external_socketio = SocketIO(message_queue=settings.REDIS_URL)
+# mensagens por passo de progresso: amostradas conforme `LOG_SAMPLE_RATES["relay"]`
+relay_logger = logger.get_logger("relay")
 
 redis_client = redis.from_url(settings.REDIS_URL)
 
+room_event_log = RoomEventLog(
+    redis_client,
+    maxlen=settings.ROOM_EVENTS_MAXLEN,
+    ttl=settings.ROOM_EVENTS_TTL,
+    enabled=settings.ROOM_EVENTS_REPLAY_ENABLED,
+)
+
+# toda emissão dos workers vai para salas: fica no histórico reenviado a quem entra depois
+external_socketio = RecordingEmitter(SocketIO(message_queue=settings.REDIS_URL), room_event_log)
+
+progress_throttle = ProgressThrottle(external_socketio.emit, settings.PROGRESS_MAX_UPDATES_PER_SECOND)
+
+classification_cache = ClassificationCache(
+    redis_client,
+    max_entries=settings.CLASSIFICATION_CACHE_MAX_ENTRIES,
+    ttl=settings.CLASSIFICATION_CACHE_TTL,
+    enabled=settings.CLASSIFICATION_CACHE_ENABLED,
+)
+
+inflight_registry = InflightRegistry(
+    redis_client,
+    ttl=settings.INFLIGHT_TTL,
+    enabled=settings.INFLIGHT_DEDUP_ENABLED,
+)
+
+task_state_store = TaskStateStore(
+    redis_client,
+    ttl=settings.TASK_STATE_TTL,
+    events_maxlen=settings.TASK_EVENTS_MAXLEN,
+    events_ttl=settings.TASK_EVENTS_TTL,
+)
+
+ai_rate_limiter = AIRateLimiter(
+    redis_client,
+    max_per_second=settings.AI_MAX_STARTS_PER_SECOND,
+    burst=settings.AI_START_BURST,
+    max_concurrent=settings.AI_MAX_CONCURRENT_STARTS,
+    interactive_reserve=settings.AI_INTERACTIVE_RESERVE,
+    lease_seconds=settings.AI_LIMITER_LEASE_SECONDS,
+    wait_timeouts={
+        PRIORITY_INTERACTIVE: settings.AI_LIMITER_INTERACTIVE_WAIT_TIMEOUT,
+        PRIORITY_BULK: settings.AI_LIMITER_BULK_WAIT_TIMEOUT,
+    },
+    enabled=settings.AI_LIMITER_ENABLED,
+)
+
 
 class ClassificationFinishedDTO(BaseModel):
     partnumber: str
@@ -40,3 +99,35 @@ def emit_update_status(dto: UpdateStatusDTO, room_id):
         dto.model_dump(),
         to=room_id
     )
+
+
+def request_remote_job(request_data: AISingleClassificationRequest, priority: str = PRIORITY_INTERACTIVE) -> str | None:
+    """
+    Envia o pedido de processamento ao servidor de IA e retorna o job_id, ou None em caso de falha.
+    Antes espera uma vaga no limitador compartilhado por todos os workers (`ai_rate_limiter`).
+    """
+    with span("ai.initiate", partnumber=request_data.partnumber, progress_channel=request_data.progress_channel, priority=priority) as attributes:
+        waiting = time.perf_counter()
+        try:
+            lease_id = ai_rate_limiter.acquire(priority)
+        except AIRateLimitTimeout as e:
+            attributes["error"] = "AIRateLimitTimeout"
+            celery_logger.error(f"Falha ao iniciar job externo: {e}")
+            return None
+        finally:
+            AI_LIMITER_WAIT_SECONDS.labels(priority).observe(time.perf_counter() - waiting)
+
+        started = time.perf_counter()
+        try:
+            job_id = ai_server_client.start_single_classification(request_data)
+            AI_INITIATION_SECONDS.labels("success").observe(time.perf_counter() - started)
+            attributes["job_id"] = job_id
+            celery_logger.info("Iniciado job de processamento externo com ID: %s", job_id)
+            return job_id
+        except AIServerError as e:
+            AI_INITIATION_SECONDS.labels("failure").observe(time.perf_counter() - started)
+            attributes["error"] = "AIServerError"
+            celery_logger.error(f"Falha ao iniciar job externo: {e}")
+            return None
+        finally:
+            ai_rate_limiter.release(lease_id)
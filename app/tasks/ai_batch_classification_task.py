@@ -0,0 +1,216 @@
+import uuid
+from typing import Dict, List
+from celery import Task
+from app.config import settings
+from app.events.events_enum import EventName
+from app.extensions import celery
+from app.schemas.ai_schemas import AISingleClassificationRequest
+from app.schemas.classification_schemas import BatchItemResponse, BatchProgressResponse, SingleClassification, validate_and_get_model
+from app.services.ai_rate_limiter import PRIORITY_BULK
+from app.services.classification_cache import classification_cache_key
+from app.services.result_persistence import enqueue_result
+from app.tasks.progress_routes import delete_route, register_route
+from app.models import TaskStatus
+from . import classification_cache, external_socketio, celery_logger, progress_throttle, redis_client, request_remote_job, task_state_store
+
+
+def batch_state_key(batch_id: str) -> str:
+    return f"batch-{batch_id}"
+
+
+@celery.task(bind=True)
+def ai_batch_classification_task(self: Task, batch_data: dict):
+    """
+    Job pai de um lote: registra o estado agregado no Redis e distribui os itens
+    em chunks, cada um processado por uma única `ai_batch_chunk_task`.
+    """
+    batch_id = self.request.id
+    room_id = batch_data["room_id"]
+    items: List[Dict] = batch_data["items"]
+    total = len(items)
+
+    key = batch_state_key(batch_id)
+    redis_client.hset(key, mapping={"total": total, "done": 0, "failed": 0})
+    redis_client.expire(key, settings.BATCH_STATE_TTL)
+
+    task_state_store.update(batch_id, status=TaskStatus.PROCESSING.value, current=0, total=total)
+    _emit_batch_progress(room_id, "processing", done=0, failed=0, total=total)
+
+    chunk_size = settings.BATCH_CHUNK_SIZE
+    chunks = 0
+    for offset in range(0, total, chunk_size):
+        ai_batch_chunk_task.delay(batch_id, room_id, offset, items[offset:offset + chunk_size])
+        chunks += 1
+
+    celery_logger.info(f"Lote {batch_id} com {total} itens distribuído em {chunks} chunks.")
+    return {"batch_id": batch_id, "total": total, "chunks": chunks}
+
+
+@celery.task(bind=True)
+def ai_batch_chunk_task(self: Task, batch_id: str, room_id: str, offset: int, items: List[Dict]):
+    """
+    Inicia os jobs remotos de um chunk do lote e retorna. Os resultados de cada
+    item são consolidados pelo roteador de progresso via `relay_batch_message`.
+    """
+    started = 0
+    for position, item in enumerate(items):
+        index = offset + position
+        partnumber = item.get("partnumber")
+        cache_key = classification_cache_key(**item)
+
+        cached = classification_cache.get(cache_key)
+        if cached is not None:
+            _record_item_result(
+                batch_id, room_id, index, partnumber, "done",
+                message="Classificação recuperada do cache.",
+                result=cached["result"]
+            )
+            continue
+
+        progress_channel = f"progress-{uuid.uuid4()}"
+        register_route(
+            progress_channel,
+            kind="batch",
+            batch_id=batch_id,
+            room_id=room_id,
+            index=index,
+            partnumber=partnumber,
+            cache_key=cache_key,
+        )
+
+        request_data = AISingleClassificationRequest(**item, progress_channel=progress_channel)
+        if not request_remote_job(request_data, priority=PRIORITY_BULK):
+            delete_route(progress_channel)
+            _record_item_result(
+                batch_id, room_id, index, partnumber, "failed",
+                message="Erro ao iniciar o processamento do partnumber."
+            )
+            continue
+        started += 1
+
+    progress_throttle.flush_all()
+    celery_logger.info(f"Chunk {offset} do lote {batch_id}: {started} job(s) remoto(s) iniciado(s).")
+    return started
+
+
+def relay_batch_message(route: dict, data: dict) -> bool:
+    """
+    Consolida a mensagem do canal de progresso de um item do lote. Progresso
+    intermediário por item é descartado; retorna True quando o item termina.
+    """
+    status = data.get('status')
+    if status not in ('done', 'failed'):
+        return False
+
+    batch_id = route["batch_id"]
+    room_id = route["room_id"]
+    index = int(route["index"])
+    partnumber = route["partnumber"]
+
+    if status == 'done':
+        classification_cache.set(route["cache_key"], partnumber, data.get('result', {}))
+        enqueue_result(redis_client, batch_id, partnumber, data.get('result', {}))
+        _record_item_result(
+            batch_id, room_id, index, partnumber, "done",
+            message="Processamento concluído com sucesso.",
+            result=data.get('result', {})
+        )
+    else:
+        _record_item_result(
+            batch_id, room_id, index, partnumber, "failed",
+            message=data.get('error', 'O processamento falhou sem mensagem de erro.')
+        )
+    return True
+
+
+def _record_item_result(batch_id: str, room_id: str, index: int, partnumber: str, status: str, message: str | None = None, result: dict | None = None):
+    """Emite o resultado do item e atualiza atomicamente o progresso agregado do lote."""
+    item_payload = BatchItemResponse(
+        index=index,
+        partnumber=partnumber,
+        status=status,
+        message=message,
+        result=validate_and_get_model(result, SingleClassification) if result is not None else None
+    )
+    external_socketio.emit(
+        EventName.BATCH_ITEM_FINISHED.value,
+        item_payload.model_dump(exclude_none=True),
+        to=room_id
+    )
+
+    key = batch_state_key(batch_id)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hincrby(key, status, 1)
+    pipe.hgetall(key)
+    _, state = pipe.execute()
+    _update_batch_progress(batch_id, room_id, state)
+
+
+def open_streamed_batch(batch_id: str, room_id: str):
+    """
+    Abre um lote cujo total ainda não é conhecido (itens chegando de um upload).
+    Enquanto não for selado, o lote não termina e o progresso usa o total enfileirado até aqui.
+    """
+    key = batch_state_key(batch_id)
+    redis_client.hset(key, mapping={"queued": 0, "done": 0, "failed": 0})
+    redis_client.expire(key, settings.BATCH_STATE_TTL)
+
+    task_state_store.update(batch_id, status=TaskStatus.PROCESSING.value, room_id=room_id, current=0, total=0)
+    _emit_batch_progress(room_id, "processing", done=0, failed=0, total=0)
+
+
+def enqueue_streamed_chunk(batch_id: str, room_id: str, offset: int, items: List[Dict]):
+    redis_client.hincrby(batch_state_key(batch_id), "queued", len(items))
+    ai_batch_chunk_task.delay(batch_id, room_id, offset, items)
+
+
+def seal_streamed_batch(batch_id: str, room_id: str, total: int):
+    """Fixa o total do lote; se todos os itens já terminaram, o lote é encerrado aqui."""
+    key = batch_state_key(batch_id)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hset(key, "total", total)
+    pipe.hgetall(key)
+    _, state = pipe.execute()
+    _update_batch_progress(batch_id, room_id, state)
+    # o processo web não tem laço de flush: o progresso retido sai agora e a sala é esquecida
+    progress_throttle.flush_all()
+    progress_throttle.discard(room_id)
+    celery_logger.info(f"Lote {batch_id} selado com {total} itens.")
+
+
+def _update_batch_progress(batch_id: str, room_id: str, state: Dict[bytes, bytes]):
+    done = int(state.get(b"done", 0))
+    failed = int(state.get(b"failed", 0))
+    sealed = b"total" in state
+    # lote de upload ainda sem total: reporta o que já foi enfileirado
+    total = int(state[b"total"]) if sealed else int(state.get(b"queued", 0))
+
+    finished = sealed and done + failed >= total
+    task_state_store.update(
+        batch_id,
+        status=TaskStatus.DONE.value if finished else TaskStatus.PROCESSING.value,
+        current=done + failed,
+        total=total,
+        message=f"{done} item(ns) concluído(s), {failed} falha(s)."
+    )
+
+    if finished:
+        _emit_batch_progress(room_id, "done", done, failed, total, event=EventName.BATCH_FINISHED)
+        redis_client.delete(batch_state_key(batch_id))
+        celery_logger.info(f"Lote {batch_id} concluído: {done} sucesso(s), {failed} falha(s) de {total}.")
+    else:
+        _emit_batch_progress(room_id, "processing", done, failed, total)
+
+
+def _emit_batch_progress(room_id: str, status: str, done: int, failed: int, total: int, event: EventName = EventName.BATCH_UPDATE_STATUS):
+    payload = BatchProgressResponse(status=status, done=done, failed=failed, total=total)
+    if event is EventName.BATCH_UPDATE_STATUS:
+        progress_throttle.update(room_id, event.value, payload.model_dump(), to=room_id)
+        return
+
+    progress_throttle.discard(room_id)
+    external_socketio.emit(
+        event.value,
+        payload.model_dump(),
+        to=room_id
+    )
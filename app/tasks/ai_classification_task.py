@@ -1,137 +1,199 @@
-import json
 import uuid
+from typing import Dict, Iterable, List
 from celery import Task
-import requests
 from celery.result import AsyncResult
 from app.events.events_enum import EventName
 from app.extensions import celery
 from app.schemas.ai_schemas import AISingleClassificationRequest
-from app.schemas.classification_schemas import FailedStatusResponse, StartSingleClassificationSchema, UpdateStatusResponse, validate_and_get_model
+from app.schemas.classification_schemas import FailedStatusResponse, StartBatchClassificationSchema, StartSingleClassificationSchema, UpdateStatusResponse, validate_and_get_model
+from app.services.classification_cache import classification_cache_key
 from app.services.protocols import IAsyncTaskClient
-from . import external_socketio, celery_logger, redis_client
+from app.services.result_persistence import enqueue_result
+from app.core.logger_config import logger
+from app.core.tracing import current_trace_id
+from app.services.result_stream import publish_result
+from app.tasks.ai_batch_classification_task import ai_batch_classification_task, enqueue_streamed_chunk, open_streamed_batch, seal_streamed_batch
+from app.tasks.progress_routes import delete_route, register_route
+from app.models import TaskStatus
+from . import external_socketio, celery_logger, classification_cache, inflight_registry, progress_throttle, redis_client, relay_logger, request_remote_job, task_state_store
 from app.config import settings
 
 
 class CeleryTaskClientAI(IAsyncTaskClient):
     def run_single_classification_task(self, task_data:StartSingleClassificationSchema):
-        task: AsyncResult = ai_classification_task.delay(task_data.model_dump(exclude_none=True))
+        task_id = str(uuid.uuid4())
+        cache_key = classification_cache_key(**task_data.model_dump())
+
+        owner_task_id = inflight_registry.acquire(cache_key, task_id, task_data.room_id)
+        if owner_task_id != task_id:
+            celery_logger.info(f"Requisição da sala {task_data.room_id} anexada ao job em andamento {owner_task_id}.")
+            return owner_task_id
+
+        task_state_store.update(task_id, status=TaskStatus.STARTED.value, room_id=task_data.room_id)
+        task: AsyncResult = ai_classification_task.apply_async(
+            args=[task_data.model_dump(exclude_none=True)],
+            task_id=task_id
+        )
+        return task.id
+
+    def run_batch_classification_task(self, task_data:StartBatchClassificationSchema):
+        task_id = str(uuid.uuid4())
+        task_state_store.update(
+            task_id,
+            status=TaskStatus.STARTED.value,
+            room_id=task_data.room_id,
+            current=0,
+            total=len(task_data.items)
+        )
+        task: AsyncResult = ai_batch_classification_task.apply_async(
+            args=[task_data.model_dump(exclude_none=True)],
+            task_id=task_id
+        )
         return task.id
 
+    def run_streamed_batch_classification_task(self, room_id: str, chunks: Iterable[List[Dict]]) -> str:
+        task_id = str(uuid.uuid4())
+        open_streamed_batch(task_id, room_id)
+        total = 0
+        try:
+            for chunk in chunks:
+                enqueue_streamed_chunk(task_id, room_id, total, chunk)
+                total += len(chunk)
+        finally:
+            # mesmo se a leitura falhar no meio, o lote precisa de um total para terminar
+            seal_streamed_batch(task_id, room_id, total)
+        return task_id
+
 
 @celery.task(bind=True)
 def ai_classification_task(self: Task, task_data: dict):
+    """
+    Inicia o job remoto e retorna. O progresso é retransmitido para a sala
+    pelo roteador de progresso (`app/tasks/progress_router.py`).
+    """
     task_id = self.request.id
     progress_channel = f"progress-{uuid.uuid4()}"
     
-    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
-    pubsub.subscribe(progress_channel)
-    celery_logger.info(f"Ouvindo o canal de progresso: {progress_channel}")
-    
     room_id = task_data.pop("room_id")
     partnumber = task_data.get("partnumber")
+    cache_key = classification_cache_key(**task_data)
+
+    register_route(
+        progress_channel,
+        kind="single",
+        task_id=task_id,
+        room_id=room_id,
+        partnumber=partnumber,
+        cache_key=cache_key,
+    )
+    celery_logger.info("Rota registrada para o canal de progresso: %s", progress_channel)
 
     request_data = AISingleClassificationRequest(
         **task_data,
         progress_channel=progress_channel
     )
-    job_id = _initiate_remote_job(request_data, room_id)
+    job_id = _initiate_remote_job(request_data, _job_rooms(cache_key, room_id))
     
     if not job_id:
-        pubsub.unsubscribe(progress_channel)
-        celery_logger.warning(f"Desinscrito do canal {progress_channel} devido à falha na iniciação do job.")
-        return
-    
-    finished_payload = None
-    try:
-        finished_payload = _listen_for_progress(pubsub, room_id)
-    finally:
-        pubsub.unsubscribe(progress_channel)
-        celery_logger.info(f"Desinscrito do canal de progresso: {progress_channel}")
-
-    if finished_payload:
-        _publish_final_result(finished_payload, room_id, partnumber)
-    
-    return finished_payload
+        delete_route(progress_channel)
+        inflight_registry.release(cache_key, task_id)
+        task_state_store.update(task_id, status=TaskStatus.FAILED.value, message="Erro ao iniciar o processamento do partnumber.")
+        celery_logger.warning(f"Rota do canal {progress_channel} removida devido à falha na iniciação do job.")
+        return None
 
+    task_state_store.update(task_id, job_id=job_id, progress_channel=progress_channel)
+    return job_id
+
+
+def _job_rooms(cache_key: str, room_id: str) -> list[str]:
+    """Salas que acompanham o job: a da requisição dona e as das requisições idênticas anexadas."""
+    return inflight_registry.rooms(cache_key) or [room_id]
 
-def _initiate_remote_job(request_data: AISingleClassificationRequest, room_id: str) -> str | None:
-    try:
-        response = requests.post(
-            f"{settings.NEXA_AI_SERVER}/process/single_partnumber",
-            json = request_data.model_dump()
-        )
-        celery_logger.info(f"Requisição POST enviada para {settings.NEXA_AI_SERVER}/process_single_partnumber. Status code: {response.status_code}")
-        response.raise_for_status()
-        job_id = response.json()['job_id']
-        celery_logger.info(f"Iniciado job de processamento externo com ID: {job_id}")
-        return job_id
-    except requests.RequestException as e:
-        celery_logger.error(f"Falha ao iniciar job externo: {e}")
 
+def _initiate_remote_job(request_data: AISingleClassificationRequest, room_ids: list[str]) -> str | None:
+    job_id = request_remote_job(request_data)
+    if not job_id:
         external_socketio.emit(
             EventName.CLASSIFICATION_UPDATE_STATUS.value,
             {
                 "status": "failed",
                 "message": "Erro ao iniciar o processamento do partnumber.",
             },
-            to=room_id
+            to=room_ids
         )
-        
-        return None
+    return job_id
+
+
+def relay_single_message(route: dict, data: dict) -> bool:
+    """
+    Retransmite uma mensagem do canal de progresso de uma classificação única.
+    Retorna True quando a mensagem encerra o job (`failed` ou `done`).
+    """
+    room_id = route["room_id"]
+    cache_key = route["cache_key"]
+    status = data.get('status')
+
+    if status == 'processing':
+        progress_payload = data.get('progress', {})
+        progress_payload['status'] = 'processing'
+        relay_logger.info("Progresso recebido", task_id=route["task_id"], current=progress_payload.get("current"), total=progress_payload.get("total"))
+        progress_payload = validate_and_get_model(progress_payload, UpdateStatusResponse).model_dump(exclude_none=True)
+        task_state_store.update(route["task_id"], **progress_payload)
+        progress_throttle.update(
+            route["task_id"],
+            EventName.CLASSIFICATION_UPDATE_STATUS.value,
+            progress_payload,
+            to=_job_rooms(cache_key, room_id)
+        )
+        return False
 
+    if status in ('failed', 'done'):
+        # eventos finais saem na hora; um progresso ainda retido ficou obsoleto
+        progress_throttle.discard(route["task_id"])
 
-def _listen_for_progress(pubsub, room_id: str) -> dict | None:
-    """Ouve o canal de progresso e processa as mensagens recebidas."""
-    finished_payload = None
-    for message in pubsub.listen():
-        try:
-            data = json.loads(message['data'])
-            status = data.get('status')
-
-            if status == 'processing':
-                progress_payload = data.get('progress', {})
-                celery_logger.info(f"\n[PROGRESS] Progresso recebido: {progress_payload}\n")
-                progress_payload['status'] = 'processing'
-                progress_payload = validate_and_get_model(progress_payload, UpdateStatusResponse).model_dump(exclude_none=True)
-                external_socketio.emit(
-                    EventName.CLASSIFICATION_UPDATE_STATUS.value,
-                    progress_payload, 
-                    to=room_id
-                )
-            elif status == 'failed':
-                fail_payload = {
-                    'status': 'failed',
-                    'message': data.get('error', 'O processamento falhou sem mensagem de erro.')
-                }
-                fail_payload = validate_and_get_model(fail_payload, FailedStatusResponse).model_dump(exclude_none=True)
-
-                external_socketio.emit(
-                    EventName.CLASSIFICATION_UPDATE_STATUS.value,
-                    fail_payload,
-                    to=room_id
-                )
-                celery_logger.error(f"Job externo falhou: {data.get('error')}")
-
-            elif status == 'done':
-                celery_logger.info("Recebida mensagem de conclusão do job.")
-                finished_payload = {
-                    "status": "done",
-                    "message": "Processamento concluído com sucesso.",
-                    "result": data.get('result', {})
-                }
-                break
-        except (json.JSONDecodeError, TypeError) as e:
-            celery_logger.warning(f"Erro ao processar mensagem do Redis: {e}")
-    return finished_payload
-
-
-def _publish_final_result(payload: dict, room_id: str, partnumber: str):
-    """Publica o resultado final no canal principal para interceptação."""
+    if status == 'failed':
+        fail_payload = {
+            'status': 'failed',
+            'message': data.get('error', 'O processamento falhou sem mensagem de erro.')
+        }
+        fail_payload = validate_and_get_model(fail_payload, FailedStatusResponse).model_dump(exclude_none=True)
+
+        room_ids = inflight_registry.release(cache_key, route["task_id"]) or [room_id]
+        task_state_store.update(route["task_id"], **fail_payload)
+        external_socketio.emit(
+            EventName.CLASSIFICATION_UPDATE_STATUS.value,
+            fail_payload,
+            to=room_ids
+        )
+        logger.error("Job externo falhou: %s", data.get('error'), task_id=route["task_id"])
+        return True
+
+    if status == 'done':
+        finished_payload = {
+            "status": "done",
+            "message": "Processamento concluído com sucesso.",
+            "result": data.get('result', {})
+        }
+        # o cache é preenchido antes de liberar o registro: uma requisição idêntica que
+        # chegue antes de a camada web consumir o stream encontra o resultado pronto
+        classification_cache.set(cache_key, route["partnumber"], finished_payload["result"])
+        room_ids = inflight_registry.release(cache_key, route["task_id"]) or [room_id]
+        task_state_store.update(route["task_id"], **finished_payload)
+        _publish_final_result(finished_payload, room_ids, route["partnumber"], cache_key)
+        enqueue_result(redis_client, route["task_id"], route["partnumber"], finished_payload["result"])
+        return True
+
+    return False
+
+
+def _publish_final_result(payload: dict, room_ids: list[str], partnumber: str, cache_key: str):
+    """Adiciona o resultado final ao stream principal para interceptação pela camada web."""
     payload['partnumber'] = partnumber
-    payload['room_id'] = room_id
-    celery_logger.info(f"\n\n[PUBLISH] redis publish payload: {payload}\n\n")
-    redis_client.publish('task_results', json.dumps(payload))
-    celery_logger.info(f"\n\nResultado final para a sala {room_id} publicado com sucesso.\n\n")
+    payload['room_ids'] = room_ids
+    payload['cache_key'] = cache_key
+    payload['trace_id'] = current_trace_id()
+    publish_result(redis_client, payload, settings.RESULT_STREAM_MAXLEN)
+    logger.info("Resultado final publicado", partnumber=partnumber, status=payload["status"], rooms=len(room_ids))
 
 
 
@@ -141,24 +203,23 @@ def _publish_final_result(payload: dict, room_id: str, partnumber: str):
 #     * Cria um nome de canal único (ex: `'progress-123'`).
 #     * Faz a requisição `POST` para o Servidor de Processamento, enviando os dados da tarefa **E** o nome do canal `'progress-123'`.
 
-# 2.  **Worker Celery (Ouvinte):**
-#     * Imediatamente após a requisição `POST`, ele se **INSCREVE** (`SUBSCRIBE`) no canal `'progress-123'`.
-#     * Ele entra em modo de escuta, aguardando mensagens *nesse canal*.
+# 2.  **Roteador de Progresso (Ouvinte):**
+#     * Antes da requisição `POST`, o worker registra a rota `'progress-123'` → sala no Redis e termina a task.
+#     * Um único processo roteador (`progress_router.py`) está inscrito no padrão `'progress-*'` (`PSUBSCRIBE`) e ouve todos os jobs.
 
 # 3.  **Servidor de Processamento (O "Falante"):**
 #     * Recebe a requisição, pega os dados do trabalho e o nome do canal.
 #     * Começa o trabalho pesado.
 #     * A cada passo importante, ele **PUBLICA** (`PUBLISH`) uma mensagem de progresso *para* o canal `'progress-123'`. Ele nunca se inscreve, apenas "fala" para o canal.
 
-# 4.  **Worker Celery (Receptor e Repassador):**
-#     * Enquanto está inscrito, ele recebe as mensagens que o Servidor de Processamento publica.
-#     * Para cada mensagem de progresso recebida, ele a retransmite (`socketio.emit`) para o frontend do usuário.
+# 4.  **Roteador de Progresso (Receptor e Repassador):**
+#     * Para cada mensagem recebida, ele consulta a rota do canal e a retransmite (`socketio.emit`) para a sala do usuário.
 
 # 5.  **Finalização:**
 #     * O Servidor de Processamento termina o trabalho e **PUBLICA** a mensagem final (`"status": "done"`) no canal `'progress-123'`.
-#     * O Worker Celery recebe esta mensagem final.
-#     * Ele se **DESINSCREVE** (`UNSUBSCRIBE`) do canal `'progress-123'`.
-#     * Por fim, ele **PUBLICA** o resultado final e limpo no canal principal da aplicação (`'classification_results'`), como já fazia antes.
+#     * O roteador recebe esta mensagem final e remove a rota do canal `'progress-123'`.
+#     * Por fim, ele adiciona (`XADD`) o resultado final e limpo ao stream principal da aplicação (`'task_results'`),
+#       lido por um grupo de consumidores: cada resultado é tratado por um único processo web.
 
 
 #Comunicação híbrida: HTTP REST + Redis Pub/Sub
@@ -1,4 +1,3 @@
-import json
 import time
 from typing import Dict
 from celery.result import AsyncResult
@@ -6,6 +5,8 @@ from app.events.events_enum import EventName
 from app.extensions import celery
 from app.schemas.classification_schemas import StartSingleClassificationSchema
 from app.services.protocols import IAsyncTaskClient
+from app.services.result_stream import publish_result
+from app.config import settings
 from . import UpdateStatusDTO, emit_update_status, external_socketio, celery_logger, redis_client
 
 
@@ -46,7 +47,7 @@ def classification_task(self, kwargs:Dict):
         'result': result
     }
 
-    redis_client.publish('task_results', json.dumps(payload))
+    publish_result(redis_client, payload, settings.RESULT_STREAM_MAXLEN)
 
     celery_logger.info(f"Task {self.request.id} completed for partnumber {kwargs.get('partnumber')}")
     return result
\ No newline at end of file
@@ -0,0 +1,128 @@
+import time
+import redis
+from app.config import settings
+from app.core.codec import CodecError, decode
+from app.core.logger_config import logger
+from app.core.metrics import AI_JOB_DURATION_SECONDS, AI_JOBS_REAPED_TOTAL, TIME_TO_FIRST_PROGRESS_SECONDS, elapsed_since
+from app.core.tracing import record_span, use_trace
+from app.tasks.ai_batch_classification_task import relay_batch_message
+from app.tasks.ai_classification_task import relay_single_message
+from app.tasks.progress_routes import delete_route, expired_routes, get_route, mark_first_progress, touch_route
+from app.tasks import progress_throttle
+
+
+PROGRESS_CHANNEL_PATTERN = "progress-*"
+
+REAPED_MESSAGES = {
+    "stalled": "O servidor de IA parou de enviar progresso; o processamento foi encerrado.",
+    "timeout": "O processamento excedeu o tempo limite e foi encerrado.",
+}
+
+RELAYS = {
+    "single": relay_single_message,
+    "batch": relay_batch_message,
+}
+
+
+def route_progress_message(channel: str, raw_data) -> bool:
+    """
+    Encaminha uma mensagem de um canal `progress-*` para o relay do tipo de job
+    registrado na rota. Retorna True quando a mensagem encerrou o job.
+    """
+    route = get_route(channel)
+    if route is None:
+        logger.warning("Mensagem recebida no canal %s sem rota registrada; descartada.", channel)
+        return False
+
+    try:
+        data = decode(raw_data)
+    except CodecError as e:
+        logger.warning("Erro ao processar mensagem do Redis: %s", e)
+        return False
+
+    return _dispatch(channel, route, data)
+
+
+def _dispatch(channel: str, route: dict, data: dict) -> bool:
+    relay = RELAYS.get(route.get("kind"))
+    if relay is None:
+        logger.error(f"Rota do canal {channel} com tipo desconhecido: {route.get('kind')}")
+        return False
+
+    with use_trace(data.get("trace_id") or route.get("trace_id")):
+        status = data.get("status")
+        if status in ("done", "failed"):
+            if not delete_route(channel):
+                # outra instância já tratou a mensagem final deste canal
+                return False
+            _observe(AI_JOB_DURATION_SECONDS.labels(route["kind"], status), "ai.job", route, status=status)
+        else:
+            touch_route(channel, float(route.get("stall_timeout") or settings.AI_JOB_STALL_TIMEOUT))
+            if "first_progress_at" not in route and mark_first_progress(channel):
+                _observe(TIME_TO_FIRST_PROGRESS_SECONDS.labels(route["kind"]), "ai.first_progress", route)
+
+        return relay(route, data)
+
+
+def _observe(histogram, span_name: str, route: dict, **attributes):
+    elapsed = elapsed_since(route.get("registered_at"))
+    if elapsed is not None:
+        histogram.observe(elapsed)
+        record_span(span_name, float(route["registered_at"]), elapsed, kind=route["kind"], task_id=route.get("task_id") or route.get("batch_id"), **attributes)
+
+
+def reap_expired_routes() -> int:
+    """
+    Vigia dos jobs remotos: um job travado (sem mensagem além do prazo) ou expirado
+    (além do tempo total) recebe uma falha sintética, que segue o mesmo caminho de
+    uma falha do servidor de IA: emite `failed` para as salas, libera o registro de
+    jobs em andamento, grava o estado da task e remove a rota. Rotas cujo hash já
+    expirou só são retiradas dos índices.
+    """
+    reaped = 0
+    for channel, reason in expired_routes(settings.PROGRESS_WATCHDOG_BATCH_SIZE).items():
+        route = get_route(channel)
+        if route is None:
+            delete_route(channel)
+            continue
+        with use_trace(route.get("trace_id")):
+            logger.warning("Job do canal %s encerrado pelo vigia", channel, reason=reason, task_id=route.get("task_id") or route.get("batch_id"))
+        if _dispatch(channel, route, {"status": "failed", "error": REAPED_MESSAGES[reason]}):
+            AI_JOBS_REAPED_TOTAL.labels(route.get("kind"), reason).inc()
+            reaped += 1
+    return reaped
+
+
+def run_progress_router():
+    """
+    Processo único que ouve todos os canais `progress-*` com uma só inscrição
+    e retransmite progresso, falhas e resultados para as salas registradas.
+    """
+    redis_client = redis.from_url(settings.REDIS_URL)
+    retry_delay = 1
+
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(PROGRESS_CHANNEL_PATTERN)
+            logger.info(f"Roteador de progresso inscrito em '{PROGRESS_CHANNEL_PATTERN}'.")
+            retry_delay = 1
+            next_watchdog = 0.0
+
+            while True:
+                # acorda a tempo de entregar o progresso retido pelo limitador por sala
+                due_in = progress_throttle.next_due_in()
+                message = pubsub.get_message(timeout=1.0 if due_in is None else due_in)
+                try:
+                    if message and message.get("type") == "pmessage":
+                        route_progress_message(message["channel"].decode("utf-8"), message["data"])
+                    progress_throttle.flush_due()
+                    if time.monotonic() >= next_watchdog:
+                        next_watchdog = time.monotonic() + settings.PROGRESS_WATCHDOG_INTERVAL
+                        reap_expired_routes()
+                except Exception as e:
+                    logger.error(f"ERRO no roteador de progresso: {e}")
+        except redis.ConnectionError as e:
+            logger.error(f"Conexão com o Redis perdida no roteador de progresso: {e}. Reconectando em {retry_delay}s.")
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 30)
@@ -0,0 +1,109 @@
+import time
+from typing import Dict, Optional
+from app.config import settings
+from app.core.tracing import current_trace_id
+from . import redis_client
+
+
+ROUTE_KEY_PREFIX = "progress-route"
+# canais com rota registrada, pontuados pelo instante do registro
+ACTIVE_ROUTES_KEY = "progress-routes-active"
+# jobs encerrados por janela de DRAIN_BUCKET_SECONDS, para medir a vazão de saída
+DRAINED_KEY_PREFIX = "progress-routes-drained"
+# prazos de cada rota: pontuados pelo instante em que o job passa do tempo total
+# e pelo instante em que fica parado sem mensagem (renovado a cada progresso)
+DEADLINES_KEY = "progress-routes-deadline"
+STALL_DEADLINES_KEY = "progress-routes-stall"
+DRAIN_BUCKET_SECONDS = 10
+
+
+def register_route(progress_channel: str, job_timeout: float | None = None, stall_timeout: float | None = None, **fields):
+    """
+    Registra o mapeamento canal de progresso → sala antes de iniciar o job remoto,
+    para que o roteador de progresso saiba para onde retransmitir as mensagens.
+    O job que passar de `job_timeout` segundos no total, ou de `stall_timeout`
+    sem nenhuma mensagem, é encerrado como falha pelo vigia do roteador.
+    """
+    key = _route_key(progress_channel)
+    registered_at = time.time()
+    job_timeout = job_timeout or settings.AI_JOB_TIMEOUT
+    stall_timeout = stall_timeout or settings.AI_JOB_STALL_TIMEOUT
+    pipe = redis_client.pipeline(transaction=False)
+    fields = {"trace_id": current_trace_id(), **fields, "stall_timeout": stall_timeout}
+    pipe.hset(key, mapping={**{k: v for k, v in fields.items() if v is not None}, "registered_at": registered_at})
+    # a rota precisa sobreviver ao prazo do job, senão o vigia não a encontra para encerrá-la
+    pipe.expire(key, max(settings.PROGRESS_ROUTE_TTL, int(job_timeout) + 60))
+    pipe.zadd(ACTIVE_ROUTES_KEY, {progress_channel: registered_at})
+    pipe.zadd(DEADLINES_KEY, {progress_channel: registered_at + job_timeout})
+    pipe.zadd(STALL_DEADLINES_KEY, {progress_channel: registered_at + stall_timeout})
+    pipe.execute()
+
+
+def get_route(progress_channel: str) -> Optional[Dict[str, str]]:
+    stored = redis_client.hgetall(_route_key(progress_channel))
+    if not stored:
+        return None
+    return {k.decode("utf-8"): v.decode("utf-8") for k, v in stored.items()}
+
+
+def delete_route(progress_channel: str) -> bool:
+    """Remove a rota; retorna False se ela já tinha sido removida por outro processo."""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.delete(_route_key(progress_channel))
+    pipe.zrem(ACTIVE_ROUTES_KEY, progress_channel)
+    pipe.zrem(DEADLINES_KEY, progress_channel)
+    pipe.zrem(STALL_DEADLINES_KEY, progress_channel)
+    # sem round trip extra: numa mensagem final duplicada o job é contado duas vezes, o que só afeta a estimativa
+    bucket = _drained_key(int(time.time()) // DRAIN_BUCKET_SECONDS)
+    pipe.incr(bucket)
+    pipe.expire(bucket, settings.ADMISSION_DRAIN_WINDOW_SECONDS + 2 * DRAIN_BUCKET_SECONDS)
+    deleted, *_ = pipe.execute()
+    return bool(deleted)
+
+
+def mark_first_progress(progress_channel: str) -> bool:
+    """Marca a rota como já tendo recebido progresso; retorna True apenas na primeira vez."""
+    return bool(redis_client.hsetnx(_route_key(progress_channel), "first_progress_at", time.time()))
+
+
+def touch_route(progress_channel: str, stall_timeout: float):
+    """Renova o prazo sem mensagens da rota; `xx` não recria a entrada de uma rota já encerrada."""
+    redis_client.zadd(STALL_DEADLINES_KEY, {progress_channel: time.time() + stall_timeout}, xx=True)
+
+
+def expired_routes(limit: int) -> Dict[str, str]:
+    """Canais com prazo vencido e o motivo (`timeout` ou `stalled`), no máximo `limit` de cada tipo."""
+    now = time.time()
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrangebyscore(DEADLINES_KEY, "-inf", now, start=0, num=limit)
+    pipe.zrangebyscore(STALL_DEADLINES_KEY, "-inf", now, start=0, num=limit)
+    timed_out, stalled = pipe.execute()
+    expired = {channel.decode("utf-8"): "stalled" for channel in stalled}
+    expired.update({channel.decode("utf-8"): "timeout" for channel in timed_out})
+    return expired
+
+
+def count_active_routes() -> int:
+    """Jobs iniciados e ainda sem mensagem final; rotas mais velhas que o TTL já expiraram e são descartadas."""
+    expired_before = time.time() - settings.PROGRESS_ROUTE_TTL
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zremrangebyscore(ACTIVE_ROUTES_KEY, "-inf", expired_before)
+    pipe.zcard(ACTIVE_ROUTES_KEY)
+    _, count = pipe.execute()
+    return count
+
+
+def drain_rate(window_seconds: int) -> float:
+    """Jobs encerrados por segundo nas últimas janelas completas (a janela corrente ainda está enchendo)."""
+    current = int(time.time()) // DRAIN_BUCKET_SECONDS
+    buckets = max(1, window_seconds // DRAIN_BUCKET_SECONDS)
+    counts = redis_client.mget([_drained_key(current - offset) for offset in range(1, buckets + 1)])
+    return sum(int(count) for count in counts if count) / (buckets * DRAIN_BUCKET_SECONDS)
+
+
+def _route_key(progress_channel: str) -> str:
+    return f"{ROUTE_KEY_PREFIX}:{progress_channel}"
+
+
+def _drained_key(bucket: int) -> str:
+    return f"{DRAINED_KEY_PREFIX}:{bucket}"
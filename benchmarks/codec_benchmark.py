@@ -0,0 +1,67 @@
+"""
+Micro-benchmark dos codecs JSON e msgpack com os formatos reais de payload do
+pipeline (progresso do servidor de IA, resultado final no stream `task_results`
+e lote da fila do `result_writer`).
+
+Uso: python -m benchmarks.codec_benchmark [--number 20000]
+"""
+import argparse
+import timeit
+from app.core.codec import CODECS
+from app.schemas.classification_schemas import TaskResultMessage
+
+
+RESULT = {
+    "ncm": "85423190",
+    "description": "Circuito integrado monolítico, microcontrolador de 32 bits com memória flash de 512 KB",
+    "exception": "01",
+    "nve": "AA01",
+    "fabricante": "STMicroelectronics",
+    "endereco": "39, Chemin du Champ des Filles, Plan-Les-Ouates, Genebra",
+    "pais": "Suíça",
+    "confidence_score": 0.97,
+}
+
+PAYLOADS = {
+    "progresso": {
+        "status": "processing",
+        "job_id": "3f1c2a9e-7b4d-4c1e-9a8f-2d6b5e0c1a77",
+        "progress": {"current": 3, "total": 7, "message": "Consultando a tabela TIPI..."},
+    },
+    "resultado final": {
+        "status": "done",
+        "message": "Processamento concluído com sucesso.",
+        "partnumber": "STM32F411CEU6",
+        "result": RESULT,
+        "room_ids": ["b1946ac9-2491-4c2f-8e7d-5f0e1c9d3a42", "0d8f7c6b-5a4e-4d3c-9b2a-1f0e9d8c7b6a"],
+        "cache_key": "classification-cache:9c1185a5c5e9fc54612808977ee8f548b2258d31",
+    },
+    "lote do result_writer (500)": [
+        {"task_id": f"task-{i}", "partnumber": f"PN-{i:06d}", "result": RESULT} for i in range(500)
+    ],
+}
+
+
+def bench(number: int):
+    print(f"{'payload':<30}{'codec':<22}{'bytes':>8}{'encode µs':>12}{'decode µs':>12}")
+    for name, payload in PAYLOADS.items():
+        runs = number if not isinstance(payload, list) else max(1, number // 500)
+        for content_type, codec in CODECS.items():
+            raw = codec.encode(payload)
+            encode_s = timeit.timeit(lambda: codec.encode(payload), number=runs)
+            decode_s = timeit.timeit(lambda: codec.decode(raw), number=runs)
+            print(f"{name:<30}{content_type:<22}{len(raw):>8}{encode_s / runs * 1e6:>12.2f}{decode_s / runs * 1e6:>12.2f}")
+
+    raw_by_codec = {ct: codec.encode(PAYLOADS["resultado final"]) for ct, codec in CODECS.items()}
+    print()
+    print(f"{'decode_model (TaskResultMessage)':<52}{'µs':>8}")
+    for content_type, codec in CODECS.items():
+        raw = raw_by_codec[content_type]
+        seconds = timeit.timeit(lambda: codec.decode_model(raw, TaskResultMessage), number=number)
+        print(f"{content_type:<52}{seconds / number * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="repetições por medição")
+    bench(parser.parse_args().number)
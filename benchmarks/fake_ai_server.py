@@ -0,0 +1,110 @@
+"""
+Servidor de IA de mentira para testes de carga: implementa
+`POST /process/single_partnumber`, responde o `job_id` na hora e publica no
+`progress_channel` uma sequência configurável de progresso seguida do resultado
+final (ou de uma falha, conforme `--failure-rate`), no codec pedido em `content_type`.
+
+Uso: python -m benchmarks.fake_ai_server [--port 5001] [--steps 3] [--step-delay 0.2]
+     [--jitter 0.5] [--start-delay 0.05] [--failure-rate 0.0]
+"""
+import argparse
+import heapq
+import itertools
+import random
+import threading
+import time
+import uuid
+from typing import Callable, List, Tuple
+import redis
+from flask import Flask, jsonify, request
+from app.config import settings
+from app.core.codec import encode
+
+
+class PublishScheduler:
+    """
+    Uma única thread publica todas as mensagens agendadas, em ordem de horário:
+    milhares de jobs simultâneos não viram milhares de threads.
+    """
+
+    def __init__(self, publish: Callable[[str, bytes], None]):
+        self.publish = publish
+        self._queue: List[Tuple[float, int, str, bytes]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def schedule(self, at: float, channel: str, message: bytes):
+        with self._condition:
+            heapq.heappush(self._queue, (at, next(self._sequence), channel, message))
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._condition.wait(None if not self._queue else self._queue[0][0] - time.monotonic())
+                _, _, channel, message = heapq.heappop(self._queue)
+            self.publish(channel, message)
+
+
+def build_result(partnumber: str) -> dict:
+    return {
+        "partnumber": partnumber,
+        "ncm": "85423190",
+        "description": f"Circuito integrado ({partnumber})",
+        "exception": None,
+        "nve": None,
+        "fabricante": "Fabricante de Teste",
+        "endereco": "Rua dos Testes, 1",
+        "pais": "Brasil",
+        "confidence_score": round(random.uniform(0.6, 0.99), 3),
+    }
+
+
+def create_fake_ai_app(scheduler: PublishScheduler, steps: int, step_delay: float, jitter: float, start_delay: float, failure_rate: float) -> Flask:
+    app = Flask(__name__)
+
+    def delay(base: float) -> float:
+        return max(0.0, base * random.uniform(1 - jitter, 1 + jitter))
+
+    @app.post("/process/single_partnumber")
+    def process_single_partnumber():
+        body = request.get_json()
+        channel = body["progress_channel"]
+        content_type = body.get("content_type")
+        job_id = str(uuid.uuid4())
+        envelope = {"job_id": job_id, "trace_id": body.get("trace_id") or request.headers.get("X-Trace-Id")}
+
+        at = time.monotonic() + delay(start_delay)
+        for step in range(1, steps + 1):
+            progress = {"current": step, "total": steps, "message": f"Etapa {step} de {steps}"}
+            scheduler.schedule(at, channel, encode({"status": "processing", "progress": progress, **envelope}, content_type))
+            at += delay(step_delay)
+
+        if random.random() < failure_rate:
+            final = {"status": "failed", "error": "Falha simulada pelo servidor de IA de teste.", **envelope}
+        else:
+            final = {"status": "done", "result": build_result(body["partnumber"]), **envelope}
+        scheduler.schedule(at, channel, encode(final, content_type))
+
+        return jsonify({"job_id": job_id})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--steps", type=int, default=3, help="mensagens de progresso por job")
+    parser.add_argument("--step-delay", type=float, default=0.2, help="segundos entre mensagens")
+    parser.add_argument("--jitter", type=float, default=0.5, help="variação relativa dos atrasos (0 a 1)")
+    parser.add_argument("--start-delay", type=float, default=0.05, help="segundos até o primeiro progresso")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fração dos jobs que terminam em falha")
+    args = parser.parse_args()
+
+    redis_client = redis.from_url(settings.REDIS_URL)
+    scheduler = PublishScheduler(redis_client.publish)
+    app = create_fake_ai_app(scheduler, args.steps, args.step_delay, args.jitter, args.start_delay, args.failure_rate)
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,251 @@
+"""
+Teste de carga de ponta a ponta: N clientes Socket.IO simultâneos fazem
+`POST /classify-partnumber`, entram na sala devolvida e esperam o
+`classification_finished` (ou o `classification_update_status` com `failed`).
+
+Os clientes são divididos em grupos de `--fanout`: a cada rodada os membros de um
+grupo pedem o mesmo partnumber ao mesmo tempo, então o worker junta os pedidos num
+único job e o resultado final é emitido para várias salas; a diferença entre o
+primeiro e o último membro a receber o evento mede o custo do fan-out.
+
+Use com o servidor de IA de teste (`python -m benchmarks.fake_ai_server`) no lugar
+do real. O resultado vai para `benchmarks/results/<data>-<commit>.json`; `--compare`
+mostra a variação em relação a uma execução anterior.
+
+Uso: python -m benchmarks.load_test [--url http://localhost:5000] [--clients 50]
+     [--requests 10] [--fanout 1] [--timeout 60] [--compare results/anterior.json]
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+import requests
+import socketio
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+class VirtualUser:
+    """Um cliente Socket.IO com conexão persistente que faz um pedido por vez."""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on("classification_update_status", self._on_update_status)
+        self.sio.on("classification_finished", self._on_finished)
+        self._done = threading.Event()
+        self._current: Optional[Dict] = None
+
+    def connect(self):
+        self.sio.connect(self.url, transports=["websocket"], wait_timeout=self.timeout)
+
+    def close(self):
+        self.sio.disconnect()
+        self.http.close()
+
+    def classify(self, partnumber: str) -> Dict:
+        sample = {"partnumber": partnumber, "events": 0, "status": None}
+        started = time.perf_counter()
+        try:
+            response = self.http.post(f"{self.url}/classify-partnumber", json={"partnumber": partnumber}, timeout=self.timeout)
+        except requests.RequestException as e:
+            return {**sample, "status": "http_error", "error": str(e)}
+        sample["post_seconds"] = time.perf_counter() - started
+
+        if response.status_code == 200:
+            return {**sample, "status": "cached", "e2e_seconds": sample["post_seconds"], "finished_at": time.perf_counter()}
+        if response.status_code != 202:
+            return {**sample, "status": "http_error", "error": f"HTTP {response.status_code}"}
+
+        # a sala só é conhecida na resposta: eventos emitidos antes do join se perdem e viram timeout
+        self._current = {**sample, "started": started}
+        self._done.clear()
+        self.sio.emit("join", {"room_id": response.json()["room_id"]})
+        if not self._done.wait(self.timeout):
+            self._current["status"] = "timeout"
+        sample, self._current = self._current, None
+        sample.pop("started")
+        return sample
+
+    def _on_update_status(self, data):
+        current = self._current
+        if current is None:
+            return
+        now = time.perf_counter()
+        current["events"] += 1
+        current.setdefault("first_progress_seconds", now - current["started"])
+        if data.get("status") == "failed":
+            self._finish(current, "failed", now)
+
+    def _on_finished(self, data):
+        current = self._current
+        if current is None:
+            return
+        current["events"] += 1
+        self._finish(current, data.get("status") or "done", time.perf_counter())
+
+    def _finish(self, current: Dict, status: str, now: float):
+        current["status"] = status
+        current["e2e_seconds"] = now - current["started"]
+        current["finished_at"] = now
+        self._done.set()
+
+
+def run_user(user: VirtualUser, group: int, rounds: int, barrier: threading.Barrier, run_id: str, samples: List[Dict], lock: threading.Lock):
+    for round_number in range(rounds):
+        barrier.wait()
+        sample = user.classify(f"BENCH{run_id}G{group}R{round_number}")
+        sample["group"] = group
+        sample["round"] = round_number
+        with lock:
+            samples.append(sample)
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def summarize(samples: List[Dict], wall_seconds: float) -> Dict:
+    by_status: Dict[str, int] = {}
+    for sample in samples:
+        by_status[sample["status"]] = by_status.get(sample["status"], 0) + 1
+
+    completed = [s for s in samples if s["status"] in ("done", "failed", "cached")]
+
+    # espalhamento da entrega do mesmo resultado entre as salas de um grupo (fan-out)
+    finishes: Dict[tuple, List[float]] = {}
+    for sample in samples:
+        if sample["status"] == "done":
+            finishes.setdefault((sample["group"], sample["round"]), []).append(sample["finished_at"])
+    spreads = [max(times) - min(times) for times in finishes.values() if len(times) > 1]
+
+    return {
+        "requests": len(samples),
+        "by_status": by_status,
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(completed) / wall_seconds if wall_seconds else None,
+        "e2e_seconds": distribution([s["e2e_seconds"] for s in completed]),
+        "post_seconds": distribution([s["post_seconds"] for s in samples if "post_seconds" in s]),
+        "first_progress_seconds": distribution([s["first_progress_seconds"] for s in samples if "first_progress_seconds" in s]),
+        "events_per_request": statistics.fmean(s["events"] for s in samples) if samples else None,
+        "fanout_spread_seconds": distribution(spreads),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_summary(summary: Dict):
+    print(f"requisições: {summary['requests']}  {summary['by_status']}")
+    print(f"duração: {summary['wall_seconds']:.2f}s  vazão: {summary['throughput_rps'] or 0:.1f} req/s  eventos/requisição: {summary['events_per_request'] or 0:.2f}")
+    for key in ("e2e_seconds", "post_seconds", "first_progress_seconds", "fanout_spread_seconds"):
+        d = summary[key]
+        if d["count"]:
+            print(f"{key:<24} p50={d['p50'] * 1000:>9.1f}ms  p95={d['p95'] * 1000:>9.1f}ms  p99={d['p99'] * 1000:>9.1f}ms  (n={d['count']})")
+
+
+def print_comparison(previous: Dict, current: Dict):
+    """Variação percentual de cada métrica em relação à execução anterior."""
+    print(f"\ncomparação com {previous['commit']} ({previous['started_at']}):")
+    rows = [("throughput_rps", previous["summary"]["throughput_rps"], current["summary"]["throughput_rps"])]
+    for key in ("e2e_seconds", "post_seconds", "first_progress_seconds", "fanout_spread_seconds"):
+        for p in ("p50", "p95", "p99"):
+            rows.append((f"{key}.{p}", previous["summary"][key][p], current["summary"][key][p]))
+    for name, before, after in rows:
+        if before is None or after is None:
+            continue
+        delta = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{name:<32} {before:>12.4f} -> {after:>12.4f}  {delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000", help="endereço da API (HTTP e Socket.IO)")
+    parser.add_argument("--clients", type=int, default=50, help="clientes Socket.IO simultâneos")
+    parser.add_argument("--requests", type=int, default=10, help="pedidos por cliente")
+    parser.add_argument("--fanout", type=int, default=1, help="clientes que pedem o mesmo partnumber a cada rodada")
+    parser.add_argument("--timeout", type=float, default=60.0, help="segundos de espera pelo resultado de cada pedido")
+    parser.add_argument("--label", default="", help="descrição livre gravada no resultado")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída (padrão: benchmarks/results/<data>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    if args.clients % args.fanout:
+        parser.error("--clients precisa ser múltiplo de --fanout")
+
+    run_id = uuid.uuid4().hex[:8].upper()
+    users = [VirtualUser(args.url, args.timeout) for _ in range(args.clients)]
+    for user in users:
+        user.connect()
+
+    samples: List[Dict] = []
+    lock = threading.Lock()
+    barriers = [threading.Barrier(args.fanout) for _ in range(args.clients // args.fanout)]
+    threads = [
+        threading.Thread(target=run_user, args=(user, i // args.fanout, args.requests, barriers[i // args.fanout], run_id, samples, lock))
+        for i, user in enumerate(users)
+    ]
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+
+    for user in users:
+        user.close()
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "label": args.label,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "config": {k: getattr(args, k) for k in ("url", "clients", "requests", "fanout", "timeout")},
+        "summary": summarize(samples, wall_seconds),
+    }
+    print_summary(result["summary"])
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{started_at:%Y%m%d-%H%M%S}-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\nresultado gravado em {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
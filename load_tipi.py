@@ -0,0 +1,34 @@
+import argparse
+import json
+from app import create_app
+from app.extensions import db
+from app.services.tipi_loader import apply_tipi_diff, read_tipi_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atualiza a tabela `tipi` a partir do arquivo oficial (CSV ou XLSX).")
+    parser.add_argument("path", help="arquivo da TIPI exportado (.csv ou .xlsx)")
+    parser.add_argument("--encoding", default="utf-8-sig", help="codificação do CSV (ex.: latin-1)")
+    parser.add_argument("--flag-classifications", action="store_true", help="marca para revisão as classificações de NCMs alteradas ou excluídas")
+    parser.add_argument("--report", help="grava em JSON a lista de NCMs inseridas, atualizadas e excluídas")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        report = apply_tipi_diff(
+            db.session,
+            read_tipi_file(args.path, encoding=args.encoding),
+            flag_classifications=args.flag_classifications,
+        )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(
+        f"{len(report['inserted'])} inserida(s), {len(report['updated'])} atualizada(s), "
+        f"{len(report['deleted'])} excluída(s) em {report['elapsed_seconds']}s."
+    )
+
+
+if __name__ == "__main__":
+    main()
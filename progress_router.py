@@ -0,0 +1,14 @@
+import logging
+from app.config import settings
+from app.core.metrics import start_metrics_server
+from app.tasks.progress_router import run_progress_router
+
+# Os relays usam o logger das tasks do Celery, que fora do worker não tem handler configurado.
+task_log_handler = logging.StreamHandler()
+task_log_handler.setFormatter(logging.Formatter("[%(levelname)s] %(name)s - %(message)s"))
+logging.getLogger("celery.task").addHandler(task_log_handler)
+logging.getLogger("celery.task").setLevel(logging.INFO)
+
+if __name__ == "__main__":
+    start_metrics_server(settings.PROGRESS_ROUTER_METRICS_PORT, "roteador de progresso")
+    run_progress_router()
@@ -0,0 +1,46 @@
+import threading
+import redis
+from app import create_app
+from app.config import settings
+from app.extensions import db
+from app.services.result_persistence import ResultWriter
+from app.services.task_state import OrphanTaskReaper, TaskStateFlusher, TaskStateStore
+
+app = create_app()
+
+
+def run_task_state_flusher(redis_client: redis.Redis):
+    with app.app_context():
+        TaskStateFlusher(
+            store=TaskStateStore(redis_client, ttl=settings.TASK_STATE_TTL, events_maxlen=settings.TASK_EVENTS_MAXLEN, events_ttl=settings.TASK_EVENTS_TTL),
+            session=db.session,
+            batch_size=settings.TASK_STATE_FLUSH_BATCH_SIZE,
+            flush_interval=settings.TASK_STATE_FLUSH_INTERVAL,
+            poll_interval=settings.RESULT_WRITER_POLL_INTERVAL,
+        ).run()
+
+
+def run_orphan_task_reaper(redis_client: redis.Redis):
+    with app.app_context():
+        OrphanTaskReaper(
+            store=TaskStateStore(redis_client, ttl=settings.TASK_STATE_TTL, events_maxlen=settings.TASK_EVENTS_MAXLEN, events_ttl=settings.TASK_EVENTS_TTL),
+            session=db.session,
+            max_age=settings.TASK_ORPHAN_MAX_AGE,
+            interval=settings.TASK_REAPER_INTERVAL,
+            batch_size=settings.TASK_STATE_FLUSH_BATCH_SIZE,
+        ).run()
+
+
+if __name__ == "__main__":
+    redis_client = redis.from_url(settings.REDIS_URL)
+    threading.Thread(target=run_task_state_flusher, args=(redis_client,), daemon=True).start()
+    threading.Thread(target=run_orphan_task_reaper, args=(redis_client,), daemon=True).start()
+
+    with app.app_context():
+        ResultWriter(
+            redis_client=redis_client,
+            session=db.session,
+            batch_size=settings.RESULT_WRITER_BATCH_SIZE,
+            flush_interval=settings.RESULT_WRITER_FLUSH_INTERVAL,
+            poll_interval=settings.RESULT_WRITER_POLL_INTERVAL,
+        ).run()
@@ -1,12 +1,21 @@
 import eventlet
 eventlet.monkey_patch()
 from app import create_app
-from app.extensions import socketio  
+from app.config import settings
+from app.extensions import db, socketio
 from app.events import *
 
 app = create_app()
 
-socketio.start_background_task(redis_listener)
+socketio.start_background_task(redis_listener, app.container.classification_cache())
+
+
+def refresh_partnumber_index():
+    with app.app_context():
+        app.container.partnumber_index().run_refresher(db.session, settings.PARTNUMBER_INDEX_REFRESH_INTERVAL)
+
+
+socketio.start_background_task(refresh_partnumber_index)
 
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=5000, debug=True)
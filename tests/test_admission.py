@@ -0,0 +1,128 @@
+# Teste unitário do controle de admissão para verificar:
+# se aceita pedidos abaixo dos limites da classe de prioridade,
+# se recusa com 429 e Retry-After estimado pela vazão de saída,
+# se recusa com 503 quando nada está drenando,
+# se aceita o pedido quando o Redis não responde,
+# se /classify-partnumber devolve a recusa com o cabeçalho Retry-After e ainda serve o cache.
+
+
+import json
+import pytest
+import redis
+from app import create_app
+from app.containers import Container
+from app.schemas.classification_schemas import SingleClassification, SingleClassificationResponse
+from app.services.admission import AdmissionController, AdmissionDecision
+
+
+class FakeRedis:
+    def __init__(self, depths):
+        self.depths = depths
+
+    def llen(self, queue):
+        if self.depths is None:
+            raise redis.ConnectionError("sem Redis")
+        return self.depths.get(queue, 0)
+
+
+def make_controller(depths, inflight=0, rate=1.0):
+    return AdmissionController(
+        FakeRedis(depths),
+        queues={"interactive": "interactive", "bulk": "bulk"},
+        max_queue_depth={"interactive": 100, "bulk": 10},
+        max_inflight={"interactive": 1000, "bulk": 500},
+        count_inflight=lambda: inflight,
+        drain_rate=lambda: rate,
+        max_retry_after=300,
+        snapshot_ttl=0,
+    )
+
+
+def test_admits_below_limits():
+    controller = make_controller({"interactive": 99, "bulk": 9}, inflight=499)
+
+    assert controller.check("interactive") is None
+    assert controller.check("bulk") is None
+
+
+def test_rejects_with_retry_after_from_drain_rate():
+    controller = make_controller({"bulk": 30}, rate=0.5)
+
+    decision = controller.check("bulk")
+
+    assert decision.status == 429
+    assert decision.retry_after == 42  # (30 - 10 + 1) / 0.5
+    assert controller.check("interactive") is None
+
+
+def test_inflight_limit_is_per_priority():
+    controller = make_controller({}, inflight=600, rate=100.0)
+
+    assert controller.check("interactive") is None
+    assert controller.check("bulk").retry_after == 2
+
+
+def test_stalled_pipeline_returns_503():
+    controller = make_controller({"interactive": 500}, rate=0.0)
+
+    decision = controller.check("interactive")
+
+    assert decision.status == 503
+    assert decision.retry_after == 300
+
+
+def test_admits_when_redis_is_down():
+    assert make_controller(None).check("interactive") is None
+
+
+class FakeAdmission:
+    def check(self, priority):
+        return AdmissionDecision(429, 17, "Fila de processamento cheia.")
+
+
+class FakeService:
+    cached = None
+
+    def get_cached_classification(self, schema):
+        return self.cached
+
+    def start_single_classification(self, schema):
+        raise AssertionError("pedido recusado não deve ser enfileirado")
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+@pytest.fixture
+def client(service):
+    container = Container()
+    container.classification_service.override(service)
+    container.admission_controller.override(FakeAdmission())
+    app = create_app(container)
+    with app.test_client() as client:
+        yield client
+
+
+def test_rejected_request_gets_retry_after(client):
+    response = client.post("/classify-partnumber", data=json.dumps({"partnumber": "PN-1"}), content_type="application/json")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "17"
+    assert response.get_json()["retry_after"] == 17
+    assert "X-Trace-Id" in response.headers
+
+
+def test_cache_is_served_under_load(client, service):
+    service.cached = SingleClassificationResponse(
+        status="done",
+        message="ok",
+        partnumber="PN-1",
+        result=SingleClassification(partnumber="PN-1", ncm="85423190", confidence_score=0.9),
+    )
+
+    response = client.post("/classify-partnumber", data=json.dumps({"partnumber": "PN-1"}), content_type="application/json")
+
+    assert response.status_code == 200
+    assert response.get_json()["cached"] is True
@@ -0,0 +1,97 @@
+# Teste unitário do limitador de inícios de job no servidor de IA para verificar:
+# se a vaga é devolvida ao fim do bloco, mesmo com erro,
+# se o lote pede a reserva dos interativos e o interativo não,
+# se a espera segue o tempo informado pelo Redis e termina no prazo da prioridade.
+
+
+import pytest
+from app.services import ai_rate_limiter
+from app.services.ai_rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE, AIRateLimiter, AIRateLimitTimeout
+
+
+class FakeRedis:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.removed = []
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.calls.append(args)
+            return self.replies.pop(0) if self.replies else 0
+        return run
+
+    def zrem(self, key, member):
+        self.removed.append(member)
+
+
+def make_limiter(redis_client, **kwargs):
+    options = dict(
+        max_per_second=10,
+        burst=10,
+        max_concurrent=4,
+        interactive_reserve=2,
+        lease_seconds=30,
+        wait_timeouts={PRIORITY_INTERACTIVE: 1.0, PRIORITY_BULK: 1.0},
+    )
+    options.update(kwargs)
+    return AIRateLimiter(redis_client, **options)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ai_rate_limiter.time, "sleep", slept.append)
+    return slept
+
+
+def test_slot_releases_lease_even_on_error(sleeps):
+    redis_client = FakeRedis([0])
+    limiter = make_limiter(redis_client)
+
+    with pytest.raises(RuntimeError):
+        with limiter.slot():
+            raise RuntimeError("falha no POST")
+
+    assert redis_client.removed == [redis_client.calls[0][4]]
+
+
+def test_bulk_leaves_reserve_for_interactive(sleeps):
+    redis_client = FakeRedis([0, 0])
+    limiter = make_limiter(redis_client)
+
+    limiter.acquire(PRIORITY_INTERACTIVE)
+    limiter.acquire(PRIORITY_BULK)
+
+    assert redis_client.calls[0][3] == 0
+    assert redis_client.calls[1][3] == 2
+
+
+def test_waits_for_token_then_acquires(sleeps):
+    redis_client = FakeRedis([200, -1, 0])
+    limiter = make_limiter(redis_client)
+
+    assert limiter.acquire() is not None
+    assert len(sleeps) == 2
+    assert 0.2 <= sleeps[0] <= 0.3
+    assert sleeps[1] >= limiter.poll_interval
+
+
+def test_gives_up_after_priority_timeout(sleeps):
+    redis_client = FakeRedis([-1] * 1000)
+    limiter = make_limiter(redis_client, wait_timeouts={PRIORITY_INTERACTIVE: 0.0})
+
+    with pytest.raises(AIRateLimitTimeout):
+        limiter.acquire(PRIORITY_INTERACTIVE)
+    assert sleeps == []
+
+
+def test_disabled_limiter_does_not_touch_redis():
+    redis_client = FakeRedis([])
+    limiter = make_limiter(redis_client, enabled=False)
+
+    with limiter.slot(PRIORITY_BULK):
+        pass
+
+    assert redis_client.calls == []
+    assert redis_client.removed == []
@@ -0,0 +1,79 @@
+# Teste unitário do AIServerClient contra um servidor HTTP local para verificar:
+# se repete a chamada em erros 5xx,
+# se não repete em erros 4xx,
+# se desiste após o número máximo de tentativas.
+
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from app.schemas.ai_schemas import AISingleClassificationRequest
+from app.services.ai_server_client import AIServerClient, AIServerError
+
+
+class FakeAIServer(BaseHTTPRequestHandler):
+    responses = []
+    calls = 0
+
+    def do_POST(self):
+        FakeAIServer.calls += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        status, body = FakeAIServer.responses.pop(0)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ai_client():
+    server = HTTPServer(("127.0.0.1", 0), FakeAIServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeAIServer.calls = 0
+
+    yield AIServerClient(
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        connect_timeout=1,
+        read_timeout=1,
+        max_retries=2,
+        backoff_base=0.01,
+        backoff_max=0.01,
+        pool_size=2,
+    )
+
+    server.shutdown()
+
+
+request_data = AISingleClassificationRequest(progress_channel="progress-test", partnumber="PN-1")
+
+
+def test_retries_on_server_error(ai_client):
+    FakeAIServer.responses = [(503, {}), (200, {"job_id": "job-1"})]
+
+    assert ai_client.start_single_classification(request_data) == "job-1"
+    assert FakeAIServer.calls == 2
+    assert ai_client.stats()["retries"] == 1
+
+
+def test_does_not_retry_client_error(ai_client):
+    FakeAIServer.responses = [(422, {"detail": "inválido"})]
+
+    with pytest.raises(AIServerError):
+        ai_client.start_single_classification(request_data)
+    assert FakeAIServer.calls == 1
+
+
+def test_gives_up_after_max_retries(ai_client):
+    FakeAIServer.responses = [(500, {}), (502, {}), (503, {})]
+
+    with pytest.raises(AIServerError):
+        ai_client.start_single_classification(request_data)
+    assert FakeAIServer.calls == 3
+    assert ai_client.stats()["errors"] == 1
@@ -0,0 +1,145 @@
+# Teste unitário da melhor classificação e do histórico de partnumbers para verificar:
+# se a melhor é a elegível de maior confiança, com empate decidido pela mais recente,
+# se o ponteiro acompanha inserções, mudanças de status e remoções feitas pelo ORM,
+# se o histórico pagina por `before` sem repetir nem pular itens, até a última página,
+# se o histórico vazio e o partnumber desconhecido são distinguidos.
+
+
+import uuid
+from decimal import Decimal
+import pytest
+from sqlalchemy import delete
+from app import create_app
+from app.containers import Container
+from app.extensions import db
+from app.models import Classification, ClassificationStatus, Partnumber
+from app.services.best_classification import refresh_best_classifications
+
+
+@pytest.fixture
+def app():
+    app = create_app(Container())
+    app.config["TESTING"] = True
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def session(app):
+    return db.session
+
+
+@pytest.fixture
+def make_partnumber(session):
+    created = []
+
+    def make(*confidences):
+        partnumber = Partnumber(code=f"TEST-{uuid.uuid4().hex[:12]}")
+        session.add(partnumber)
+        session.flush()
+        for confidence in confidences:
+            session.add(Classification(
+                partnumber_id=partnumber.id,
+                confidence_rate=Decimal(str(confidence)) if confidence is not None else None,
+            ))
+        session.commit()
+        created.append(partnumber.id)
+        return partnumber
+
+    yield make
+
+    session.rollback()
+    session.execute(delete(Classification).where(Classification.partnumber_id.in_(created)))
+    session.execute(delete(Partnumber).where(Partnumber.id.in_(created)))
+    session.commit()
+
+
+def classifications_of(session, partnumber):
+    return sorted(session.query(Classification).filter_by(partnumber_id=partnumber.id), key=lambda c: c.id)
+
+
+def best_id(session, partnumber):
+    session.expire(partnumber)
+    return partnumber.best_classification_id
+
+
+def test_highest_confidence_wins_and_ties_go_to_most_recent(session, make_partnumber):
+    partnumber = make_partnumber(0.7, 0.9, None, 0.9)
+    first, second, unscored, latest = classifications_of(session, partnumber)
+
+    refresh_best_classifications(session, [partnumber.id])
+    assert best_id(session, partnumber) == latest.id
+
+    latest.status = ClassificationStatus.REJECTED
+    second.status = ClassificationStatus.REPLACED
+    session.commit()
+    assert best_id(session, partnumber) == first.id
+
+    first.status = ClassificationStatus.REPLACED
+    session.commit()
+    assert best_id(session, partnumber) == unscored.id
+
+
+def test_listener_follows_orm_inserts_and_deletes(session, make_partnumber):
+    partnumber = make_partnumber(0.5)
+    (original,) = classifications_of(session, partnumber)
+    assert best_id(session, partnumber) == original.id
+
+    better = Classification(partnumber_id=partnumber.id, confidence_rate=Decimal("0.95"))
+    session.add(better)
+    session.commit()
+    assert best_id(session, partnumber) == better.id
+
+    session.delete(better)
+    session.commit()
+    assert best_id(session, partnumber) == original.id
+
+    session.delete(original)
+    session.commit()
+    assert best_id(session, partnumber) is None
+
+
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
+
+
+def test_history_pages_by_before_cursor(session, make_partnumber, client):
+    partnumber = make_partnumber(0.1, 0.2, 0.3, 0.4, 0.5)
+    ids = [c.id for c in reversed(classifications_of(session, partnumber))]
+
+    pages = []
+    cursor = None
+    while True:
+        query = f"?limit=2&before={cursor}" if cursor else "?limit=2"
+        data = client.get(f"/partnumbers/{partnumber.code}/classifications{query}").get_json()
+        pages.append([item["id"] for item in data["items"]])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [ids[0:2], ids[2:4], ids[4:5]]
+
+
+def test_exact_last_page_has_no_cursor(make_partnumber, client):
+    partnumber = make_partnumber(0.1, 0.2)
+
+    data = client.get(f"/partnumbers/{partnumber.code}/classifications?limit=2").get_json()
+
+    assert len(data["items"]) == 2
+    assert data["next_cursor"] is None
+
+
+def test_empty_history_and_unknown_partnumber(make_partnumber, client):
+    partnumber = make_partnumber()
+
+    response = client.get(f"/partnumbers/{partnumber.code}/classifications")
+    assert response.status_code == 200
+    assert response.get_json() == {"code": partnumber.code, "items": [], "next_cursor": None}
+
+    response = client.get(f"/partnumbers/{partnumber.code}/classifications?before=1")
+    assert response.status_code == 200
+    assert response.get_json()["items"] == []
+
+    assert client.get("/partnumbers/NAO-EXISTE-0000/classifications").status_code == 404
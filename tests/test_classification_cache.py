@@ -0,0 +1,75 @@
+# Teste unitário do ClassificationCache para verificar:
+# se a chave ignora diferenças de caixa e espaços,
+# se o LRU local responde antes do Redis,
+# se as evicções são contadas.
+
+
+from app.services.classification_cache import ClassificationCache, classification_cache_key
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.store.__setitem__(
+            key, {k.encode(): str(v).encode() for k, v in mapping.items()}
+        ))
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        for op in self.ops:
+            op()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def hgetall(self, key):
+        return self.store.get(key, {})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+
+def test_cache_key_normalization():
+    a = classification_cache_key("ABC-123", "  Resistor   10k ", "Acme", None)
+    b = classification_cache_key("abc-123", "resistor 10K", "ACME", "", room_id="sala")
+    c = classification_cache_key("abc-123", "resistor 10K", "ACME", "Outro")
+
+    assert a == b
+    assert a != c
+
+
+def test_cache_local_and_redis_hits():
+    redis_client = FakeRedis()
+    cache = ClassificationCache(redis_client, max_entries=10, ttl=60)
+
+    assert cache.get("k1") is None
+    cache.set("k1", "PN-1", {"ncm": "85423190"})
+    assert cache.get("k1")["result"] == {"ncm": "85423190"}
+
+    other_process = ClassificationCache(redis_client, max_entries=10, ttl=60)
+    assert other_process.get("k1")["partnumber"] == "PN-1"
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["local_hits"] == 1
+    assert other_process.stats()["redis_hits"] == 1
+
+
+def test_cache_lru_eviction():
+    cache = ClassificationCache(FakeRedis(), max_entries=2, ttl=60)
+    cache.set("k1", "PN-1", {})
+    cache.set("k2", "PN-2", {})
+    cache.get("k1")
+    cache.set("k3", "PN-3", {})
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    assert cache._get_local("k2") is None
+    assert cache._get_local("k1") is not None
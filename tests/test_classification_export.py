@@ -0,0 +1,71 @@
+# Teste unitário da exportação de classificações para verificar:
+# se o CSV começa pelo cabeçalho antes de qualquer linha,
+# se decimais, datas e enums são serializados em CSV e NDJSON,
+# se as linhas são agrupadas em blocos,
+# se os filtros entram no SELECT.
+
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from app.models import ClassificationStatus
+from app.schemas.classification_schemas import ClassificationExportQuery
+from app.services.classification_export import FIELDNAMES, build_export_query, encode_export
+
+
+def make_row(classification_id):
+    row = dict.fromkeys(FIELDNAMES)
+    row.update({
+        "classification_id": classification_id,
+        "partnumber": f"PN-{classification_id}",
+        "ncm": "84713012",
+        "confidence_rate": Decimal("0.875"),
+        "status": ClassificationStatus.ACTIVE,
+        "created_at": datetime(2025, 1, 2, 3, 4, 5),
+    })
+    return row
+
+
+def test_csv_header_is_sent_before_rows_are_read():
+    def rows():
+        raise AssertionError("a consulta não deveria ter começado")
+        yield
+
+    chunks = encode_export(rows(), "csv", chunk_bytes=1024)
+
+    assert next(chunks).decode().startswith("classification_id,partnumber,ncm")
+
+
+def test_csv_values():
+    data = b"".join(encode_export([make_row(1)], "csv", chunk_bytes=1024)).decode()
+
+    assert data.splitlines()[1] == "1,PN-1,84713012,,,,0.875,active,,,,,2025-01-02T03:04:05"
+
+
+def test_ndjson_values_and_chunking():
+    chunks = list(encode_export((make_row(i) for i in range(1, 101)), "ndjson", chunk_bytes=1024))
+    lines = b"".join(chunks).decode().splitlines()
+
+    assert len(chunks) > 1
+    assert len(lines) == 100
+    assert json.loads(lines[0])["status"] == "active"
+    assert json.loads(lines[0])["confidence_rate"] == 0.875
+
+
+def test_filters_are_applied_in_the_query():
+    filters = ClassificationExportQuery(
+        status=["review"],
+        manufacturer=" Yageo ",
+        ncm_prefix="8471.30",
+        task_id="task-1",
+        created_from="2025-01-01",
+    )
+
+    compiled = build_export_query(filters).compile(compile_kwargs={"literal_binds": True})
+    sql = str(compiled)
+
+    assert "lower(manufacturers.name) = 'yageo'" in sql
+    assert "tipi.ncm LIKE '847130' || '%'" in sql
+    assert "classifications.task_id = 'task-1'" in sql
+    assert "classifications.status IN ('REVIEW')" in sql
+    assert "LEFT OUTER JOIN partnumbers" in sql
@@ -2,18 +2,35 @@
 # se a rota existe,
 # se valida o payload,
 # se retorna o status code correto,
+# se aceita planilhas por multipart e como corpo cru,
 
 
 import json
 import pytest
 from app import create_app
 from app.containers import Container
+import io
+from app.schemas.classification_schemas import SingleClassificationResponse, UploadClassificationReport
 
 
 class FakeService:
+    def get_cached_classification(self, schema):
+        return None
+
     def start_single_classification(self, schema):
         return "fake-task-id"
 
+    def start_batch_classification(self, schema):
+        return "fake-batch-id"
+
+    def start_upload_classification(self, rows, room_id):
+        items = [item for _, item in rows]
+        return UploadClassificationReport(
+            task_id="fake-upload-id" if items else None,
+            room_id=room_id,
+            total=len(items),
+        )
+
 
 @pytest.fixture
 def client():
@@ -48,6 +65,33 @@ def test_classification_resource_success(client):
     assert data["task_id"] == "fake-task-id"
 
 
+def test_classification_resource_cache_hit():
+    class CachedService(FakeService):
+        def get_cached_classification(self, schema):
+            return SingleClassificationResponse(
+                status="done",
+                message="Classificação recuperada do cache.",
+                partnumber=schema.partnumber,
+                result={"ncm": "85423190", "confidence_score": 0.9},
+            )
+
+    container = Container()
+    container.classification_service.override(CachedService())
+    app = create_app(container)
+
+    with app.test_client() as cached_client:
+        response = cached_client.post(
+            "/classify-partnumber",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["cached"] is True
+    assert data["result"]["ncm"] == "85423190"
+
+
 def test_classification_resource_invalid_payload(client):
     response = client.post(
         "/classify-partnumber",
@@ -58,3 +102,64 @@ def test_classification_resource_invalid_payload(client):
     assert response.status_code == 400
     data = response.get_json()
     assert "errors" in data
+
+
+def test_batch_classification_resource_success(client):
+    response = client.post(
+        "/classify-partnumbers",
+        data=json.dumps({"items": [payload, {"partnumber": "5678"}]}),
+        content_type="application/json"
+    )
+
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["task_id"] == "fake-batch-id"
+    assert data["total"] == 2
+    assert "room_id" in data
+
+
+def test_batch_classification_resource_empty_items(client):
+    response = client.post(
+        "/classify-partnumbers",
+        data=json.dumps({"items": []}),
+        content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert "errors" in response.get_json()
+
+
+def test_upload_classification_multipart(client):
+    response = client.post(
+        "/classify-partnumbers/upload",
+        data={"file": (io.BytesIO(b"partnumber,descricao\nPN-1,a\nPN-2,b\n"), "itens.csv"), "room_id": "sala-1"},
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["task_id"] == "fake-upload-id"
+    assert data["room_id"] == "sala-1"
+    assert data["total"] == 2
+
+
+def test_upload_classification_raw_csv_body(client):
+    response = client.post(
+        "/classify-partnumbers/upload",
+        data=b"partnumber\nPN-1\n",
+        content_type="text/csv"
+    )
+
+    assert response.status_code == 202
+    assert response.get_json()["total"] == 1
+
+
+def test_upload_classification_rejects_unknown_format(client):
+    response = client.post(
+        "/classify-partnumbers/upload",
+        data={"file": (io.BytesIO(b"%PDF"), "itens.pdf")},
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 400
+    assert "errors" in response.get_json()
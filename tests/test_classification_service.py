@@ -0,0 +1,97 @@
+# Teste unitário da busca por partnumbers parecidos no ClassificationService para verificar:
+# se um equivalente acima do limiar de correspondência responde com a classificação dele e vai para o cache,
+# se sem equivalente (ou sem classificação atual) o pedido segue para a IA,
+# se um parecido entre os limiares segue como pista para o servidor de IA,
+# se abaixo do limiar de pista nada é enviado.
+
+
+from decimal import Decimal
+import pytest
+from app.models import Classification, Manufacturer, Partnumber, Tipi
+from app.schemas.classification_schemas import SingleClassificationRequest, StartSingleClassificationSchema
+from app.services import classification_service
+from app.services.classification_service import ClassificationService
+from app.services.partnumber_index import PartnumberIndex
+
+
+class FakeCache:
+    def __init__(self):
+        self.stored = {}
+
+    def get(self, key):
+        return None
+
+    def set(self, key, partnumber, result):
+        self.stored[key] = (partnumber, result)
+
+
+class FakeTaskClient:
+    def __init__(self):
+        self.started = []
+
+    def run_single_classification_task(self, schema):
+        self.started.append(schema)
+        return "task-1"
+
+
+@pytest.fixture
+def best(monkeypatch):
+    classifications = {
+        1: Classification(
+            id=10,
+            partnumber=Partnumber(id=1, code="STM32F411CEU6"),
+            tipi=Tipi(ncm="85423190", ex=None),
+            manufacturer=Manufacturer(name="ST", country="CH"),
+            short_description="Microcontrolador",
+            long_description="Microcontrolador ARM",
+            confidence_rate=Decimal("0.970"),
+        ),
+    }
+    monkeypatch.setattr(classification_service, "load_best_classification", lambda session, partnumber_id: classifications.get(partnumber_id))
+    return classifications
+
+
+@pytest.fixture
+def service():
+    index = PartnumberIndex(max_candidates=100, load_batch_size=10)
+    index.add(1, "STM32F411CEU6")
+    index.add(2, "GRM188R71H104KA93D")
+    return ClassificationService(
+        task_client=FakeTaskClient(),
+        cache=FakeCache(),
+        partnumber_index=index,
+        match_threshold=0.9,
+        hint_threshold=0.7,
+    )
+
+
+def test_equivalent_partnumber_answers_from_its_classification(service, best):
+    response = service.get_cached_classification(SingleClassificationRequest(partnumber="stm32f411-ceu6"))
+
+    assert response.status == "done"
+    assert response.partnumber == "stm32f411-ceu6"
+    assert response.result.ncm == "85423190"
+    assert "STM32F411CEU6" in response.message
+    assert [partnumber for partnumber, _ in service.cache.stored.values()] == ["stm32f411-ceu6"]
+
+
+def test_no_match_or_no_current_classification_goes_to_ai(service, best):
+    assert service.get_cached_classification(SingleClassificationRequest(partnumber="LM7805CT")) is None
+    # parecido, mas sem classificação atual (todas rejeitadas)
+    assert service.get_cached_classification(SingleClassificationRequest(partnumber="GRM188R71H104KA93D")) is None
+    assert service.cache.stored == {}
+
+
+def test_similar_partnumber_is_sent_as_hint(service, best):
+    service.start_single_classification(StartSingleClassificationSchema(partnumber="STM32F411CEU6TR", room_id="sala-1"))
+
+    hint = service.task_client.started[0].hint
+    assert hint.partnumber == "STM32F411CEU6"
+    assert 0.7 <= hint.similarity < 0.9
+    assert hint.ncm == "85423190"
+
+
+def test_dissimilar_partnumber_has_no_hint(service, best):
+    service.start_single_classification(StartSingleClassificationSchema(partnumber="LM7805CT", room_id="sala-1"))
+
+    assert service.task_client.started[0].hint is None
@@ -0,0 +1,46 @@
+# Teste unitário do codec de payloads para verificar:
+# se msgpack e JSON fazem ida e volta,
+# se o codec é detectado pelo primeiro byte (compatibilidade com JSON),
+# se o resultado final é decodificado direto no schema, sem os campos de roteamento no evento.
+
+
+import json
+import pytest
+from app.core.codec import CodecError, decode, decode_model, encode
+from app.schemas.classification_schemas import TaskResultMessage
+
+
+PAYLOAD = {
+    "status": "done",
+    "message": "Processamento concluído com sucesso.",
+    "partnumber": "PN-1",
+    "result": {"ncm": "85423190", "confidence_score": 0.97},
+    "room_ids": ["sala-1", "sala-2"],
+    "cache_key": "chave",
+}
+
+
+@pytest.mark.parametrize("content_type", ["application/msgpack", "application/json"])
+def test_round_trip(content_type):
+    raw = encode(PAYLOAD, content_type)
+
+    assert decode(raw, content_type) == PAYLOAD
+    assert decode(raw) == PAYLOAD
+
+
+def test_detects_legacy_json():
+    assert decode(json.dumps(PAYLOAD)) == PAYLOAD
+
+
+def test_invalid_payload_raises_codec_error():
+    with pytest.raises(CodecError):
+        decode(b"\xc1")
+
+
+def test_decode_model_excludes_routing_fields():
+    message = decode_model(encode(PAYLOAD, "application/msgpack"), TaskResultMessage)
+
+    assert message.room_ids == ["sala-1", "sala-2"]
+    assert message.cache_key == "chave"
+    assert "room_ids" not in message.model_dump()
+    assert message.model_dump()["result"]["ncm"] == "85423190"
@@ -0,0 +1,82 @@
+# Teste unitário do registro de jobs em andamento para verificar:
+# se a primeira requisição vira dona do job e as idênticas apenas anexam suas salas,
+# se o release da dona devolve todas as salas e libera a chave para um novo job,
+# se o release de uma task que não é a dona não encerra o registro,
+# se cada progresso renova o prazo do registro, que expira sem notícias do job,
+# se a configuração recusa um prazo menor que o do job remoto.
+
+
+import fakeredis
+import pytest
+from pydantic import ValidationError
+from app.config import Settings
+from app.services.inflight_registry import InflightRegistry
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def registry(redis_client):
+    return InflightRegistry(redis_client, ttl=60)
+
+
+def test_first_request_owns_and_others_attach(registry):
+    assert registry.acquire("pn-1", "task-1", "sala-1") == "task-1"
+    assert registry.acquire("pn-1", "task-2", "sala-2") == "task-1"
+    assert registry.acquire("pn-2", "task-3", "sala-3") == "task-3"
+
+    assert sorted(registry.rooms("pn-1")) == ["sala-1", "sala-2"]
+
+
+def test_owner_release_fans_out_to_every_room(registry):
+    registry.acquire("pn-1", "task-1", "sala-1")
+    registry.acquire("pn-1", "task-2", "sala-2")
+
+    assert sorted(registry.release("pn-1", "task-1")) == ["sala-1", "sala-2"]
+    assert registry.rooms("pn-1") == []
+    assert registry.acquire("pn-1", "task-4", "sala-4") == "task-4"
+
+
+def test_release_by_non_owner_keeps_registry(registry):
+    registry.acquire("pn-1", "task-1", "sala-1")
+
+    assert registry.release("pn-1", "task-2") == []
+    assert registry.rooms("pn-1") == ["sala-1"]
+
+
+def test_progress_renews_and_silence_expires(registry, redis_client):
+    registry.acquire("pn-1", "task-1", "sala-1")
+    registry.acquire("pn-1", "task-2", "sala-2")
+    for key in ("inflight:pn-1", "inflight-rooms:pn-1"):
+        redis_client.expire(key, 5)
+
+    registry.rooms("pn-1")
+
+    assert redis_client.ttl("inflight:pn-1") == 60
+    assert redis_client.ttl("inflight-rooms:pn-1") == 60
+
+    # sem progresso o registro expira: a próxima requisição idêntica assume um novo job
+    redis_client.delete("inflight:pn-1")
+    assert sorted(registry.rooms("pn-1")) == ["sala-1", "sala-2"]
+    assert redis_client.ttl("inflight-rooms:pn-1") == 60
+    assert registry.acquire("pn-1", "task-5", "sala-5") == "task-5"
+    assert registry.release("pn-1", "task-1") == []
+    assert registry.release("pn-1", "task-5") == ["sala-5"]
+
+
+def test_disabled_registry_always_owns(redis_client):
+    registry = InflightRegistry(redis_client, ttl=60, enabled=False)
+
+    assert registry.acquire("pn-1", "task-1", "sala-1") == "task-1"
+    assert registry.acquire("pn-1", "task-2", "sala-2") == "task-2"
+    assert redis_client.keys() == []
+
+
+def test_ttl_shorter_than_job_timeout_is_rejected():
+    with pytest.raises(ValidationError):
+        Settings(INFLIGHT_TTL=600, AI_JOB_TIMEOUT=900)
+
+    assert Settings(INFLIGHT_TTL=600, AI_JOB_TIMEOUT=900, INFLIGHT_DEDUP_ENABLED=False).INFLIGHT_TTL == 600
@@ -0,0 +1,96 @@
+# Teste unitário do logger estruturado para verificar:
+# se a mensagem só é formatada pelo handler, e não na thread que loga,
+# se os campos estruturados e a taxa de amostragem saem no log JSON,
+# se um logger amostrado descarta registros abaixo de WARNING mas nunca os de erro,
+# se os arquivos de log levam o pid do processo.
+
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from queue import Queue
+from app.core import logger_config
+from app.core.logger_config import JsonFormatter, LazyQueueHandler, StructuredLogger
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError("formatado na thread que loga")
+
+
+def make_logger(name: str, sample_rate: float = 1.0):
+    queue = Queue()
+    base = logging.getLogger(f"test.{name}")
+    base.propagate = False
+    base.setLevel(logging.INFO)
+    base.handlers = [LazyQueueHandler(queue)]
+    return StructuredLogger(base, sample_rate), queue
+
+
+def test_message_is_formatted_only_by_the_handler():
+    log, queue = make_logger("lazy")
+
+    log.info("valor %s", Unformattable())
+    record = queue.get_nowait()
+
+    assert record.msg == "valor %s"
+    assert isinstance(record.args[0], Unformattable)
+
+
+def test_fields_and_sample_rate_go_to_json():
+    log, queue = make_logger("fields", sample_rate=0.999999)
+
+    log.info("Progresso recebido", task_id="t-1", current=2)
+    logged = json.loads(JsonFormatter().format(queue.get_nowait()))
+
+    assert logged["message"] == "Progresso recebido"
+    assert logged["task_id"] == "t-1"
+    assert logged["current"] == 2
+    assert logged["sample_rate"] == 0.999999
+
+
+def test_fields_do_not_override_fixed_keys():
+    log, queue = make_logger("override")
+
+    log.info("mensagem", level="campo", line=0)
+    logged = json.loads(JsonFormatter().format(queue.get_nowait()))
+
+    assert logged["level"] == "INFO"
+    assert logged["line"] != 0
+
+
+def test_sampling_drops_info_but_keeps_errors():
+    log, queue = make_logger("sampled", sample_rate=0.0)
+
+    for _ in range(100):
+        log.info("descartado")
+    log.error("mantido")
+
+    assert queue.qsize() == 1
+    assert queue.get_nowait().getMessage() == "mantido"
+
+
+def test_level_gate_skips_record_creation():
+    log, queue = make_logger("level")
+
+    log.debug("valor %s", Unformattable())
+
+    assert queue.empty()
+
+
+def test_timestamp_matches_isoformat():
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "x", None, None)
+    logged = json.loads(JsonFormatter().format(record))
+
+    timestamp = datetime.fromisoformat(logged["timestamp"])
+    assert abs(timestamp - datetime.fromtimestamp(record.created, timezone.utc)).total_seconds() < 0.00001
+
+
+def test_sinks_are_per_process(monkeypatch):
+    monkeypatch.setattr(logger_config.settings, "LOG_SINK_NAME", "web")
+    files = [handler.baseFilename for handler in logger_config.logger.listener.handlers if hasattr(handler, "baseFilename")]
+
+    assert logger_config.sink_name() == "web"
+    assert len(files) == 2
+    assert all(f".{os.getpid()}." in path for path in files)
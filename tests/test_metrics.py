@@ -0,0 +1,81 @@
+# Teste unitário das métricas para verificar:
+# se /metrics responde no formato texto do Prometheus com os gauges atualizados,
+# se a validação e o enfileiramento de /classify-partnumber são medidos,
+# se a primeira mensagem de progresso e a mensagem final alimentam os histogramas do roteador.
+
+
+import json
+import pytest
+from prometheus_client import REGISTRY
+from app import create_app
+from app.containers import Container
+from app.tasks import progress_router
+
+
+class FakeService:
+    def get_cached_classification(self, schema):
+        return None
+
+    def start_single_classification(self, schema):
+        return "fake-task-id"
+
+
+def observations(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(f"{name}_count", labels) or 0.0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("app.api.metrics_resource.count_active_routes", lambda: 7)
+    container = Container()
+    container.classification_service.override(FakeService())
+    app = create_app(container)
+    with app.test_client() as client:
+        yield client
+
+
+def test_metrics_endpoint_exposes_gauges(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    body = response.get_data(as_text=True)
+    assert "nexa_inflight_jobs 7.0" in body
+    assert "nexa_active_rooms 0.0" in body
+    assert "# TYPE nexa_ai_job_duration_seconds histogram" in body
+
+
+def test_single_classification_stages_are_timed(client):
+    validated = observations("nexa_request_validation_seconds", endpoint="classify-partnumber")
+    enqueued = observations("nexa_enqueue_seconds", kind="single")
+
+    client.post("/classify-partnumber", data=json.dumps({"partnumber": "PN-1"}), content_type="application/json")
+
+    assert observations("nexa_request_validation_seconds", endpoint="classify-partnumber") == validated + 1
+    assert observations("nexa_enqueue_seconds", kind="single") == enqueued + 1
+
+
+def test_router_observes_first_progress_once_and_job_duration(monkeypatch):
+    route = {"kind": "single", "registered_at": "0"}
+    marked = set()
+
+    def mark_first_progress(channel):
+        first_time = channel not in marked
+        marked.add(channel)
+        return first_time
+
+    monkeypatch.setattr(progress_router, "get_route", lambda channel: dict(route))
+    monkeypatch.setattr(progress_router, "mark_first_progress", mark_first_progress)
+    monkeypatch.setattr(progress_router, "delete_route", lambda channel: True)
+    monkeypatch.setattr(progress_router, "touch_route", lambda channel, stall_timeout: None)
+    monkeypatch.setitem(progress_router.RELAYS, "single", lambda route, data: data["status"] == "done")
+
+    first = observations("nexa_time_to_first_progress_seconds", kind="single")
+    done = observations("nexa_ai_job_duration_seconds", kind="single", status="done")
+
+    progress_router.route_progress_message("progress-1", json.dumps({"status": "processing"}))
+    progress_router.route_progress_message("progress-1", json.dumps({"status": "processing"}))
+    assert progress_router.route_progress_message("progress-1", json.dumps({"status": "done"}))
+
+    assert observations("nexa_time_to_first_progress_seconds", kind="single") == first + 1
+    assert observations("nexa_ai_job_duration_seconds", kind="single", status="done") == done + 1
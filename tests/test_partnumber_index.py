@@ -0,0 +1,51 @@
+# Teste unitário do PartnumberIndex para verificar:
+# se variantes de grafia do mesmo partnumber são normalizadas para o mesmo código,
+# se a busca por similaridade respeita o limiar,
+# se o índice desabilitado não responde.
+
+
+from app.services.partnumber_index import PartnumberIndex, normalize_partnumber
+
+
+def build_index(enabled=True):
+    index = PartnumberIndex(max_candidates=100, load_batch_size=10, enabled=enabled)
+    index.add(1, "ABC-123/X")
+    index.add(2, "STM32F411CEU6")
+    index.add(3, "GRM188R71H104KA93D")
+    return index
+
+
+def test_normalize_partnumber_variants():
+    assert normalize_partnumber("ABC-123/X") == "ABC123X"
+    assert normalize_partnumber("abc123x") == "ABC123X"
+    assert normalize_partnumber("ABC 123 X") == "ABC123X"
+
+
+def test_exact_variant_matches_with_full_similarity():
+    match = build_index().search("abc 123 x", min_similarity=0.9)[0]
+
+    assert match.partnumber_id == 1
+    assert match.similarity == 1.0
+
+
+def test_near_duplicate_respects_threshold():
+    index = build_index()
+
+    matches = index.search("STM32F411CEU6TR", min_similarity=0.7)
+    assert [m.partnumber_id for m in matches] == [2]
+    assert 0.7 <= matches[0].similarity < 1.0
+
+    assert index.search("STM32F411CEU6TR", min_similarity=0.95) == []
+    assert index.search("XYZ-999", min_similarity=0.5) == []
+
+
+def test_disabled_index_returns_nothing():
+    assert build_index(enabled=False).search("ABC-123/X", min_similarity=0.9) == []
+
+
+def test_add_reports_new_codes_only():
+    index = build_index()
+
+    assert index.add(4, "abc 123 x") is False
+    assert index.add(4, "LM7805CT") is True
+    assert len(index) == 4
@@ -0,0 +1,75 @@
+# Teste unitário da leitura incremental do PartnumberIndex para verificar:
+# se a primeira leitura traz apenas partnumbers já classificados,
+# se um partnumber antigo entra no índice quando ganha a melhor classificação depois,
+# se a releitura da janela de recuo não duplica nem conta códigos já indexados.
+
+
+import uuid
+from decimal import Decimal
+import pytest
+from sqlalchemy import delete
+from app import create_app
+from app.containers import Container
+from app.extensions import db
+from app.models import Classification, Partnumber
+from app.services.partnumber_index import PartnumberIndex
+
+
+@pytest.fixture
+def session():
+    app = create_app(Container())
+    with app.app_context():
+        yield db.session
+
+
+@pytest.fixture
+def make_partnumber(session):
+    created = []
+
+    def make(code, classified):
+        partnumber = Partnumber(code=f"{code}-{uuid.uuid4().hex[:8]}")
+        session.add(partnumber)
+        session.flush()
+        if classified:
+            session.add(Classification(partnumber_id=partnumber.id, confidence_rate=Decimal("0.9")))
+        session.commit()
+        created.append(partnumber.id)
+        return partnumber
+
+    yield make
+
+    session.rollback()
+    session.execute(delete(Classification).where(Classification.partnumber_id.in_(created)))
+    session.execute(delete(Partnumber).where(Partnumber.id.in_(created)))
+    session.commit()
+
+
+def make_index():
+    return PartnumberIndex(max_candidates=100, load_batch_size=2, refresh_overlap=60)
+
+
+def test_late_classified_partnumber_enters_index(session, make_partnumber):
+    pending = make_partnumber("PENDENTE", classified=False)
+    classified = make_partnumber("CLASSIFICADO", classified=True)
+    index = make_index()
+
+    index.refresh(session)
+    assert index.search(classified.code, min_similarity=1.0)[0].partnumber_id == classified.id
+    assert index.search(pending.code, min_similarity=1.0) == []
+
+    # id menor que o último lido: só a marca de `updated_at` o encontra
+    session.add(Classification(partnumber_id=pending.id, confidence_rate=Decimal("0.8")))
+    session.commit()
+
+    assert index.refresh(session) == 1
+    assert index.search(pending.code, min_similarity=1.0)[0].partnumber_id == pending.id
+
+
+def test_overlap_rereads_are_not_counted(session, make_partnumber):
+    make_partnumber("RELIDO", classified=True)
+    index = make_index()
+    index.refresh(session)
+    size = len(index)
+
+    assert index.refresh(session) == 0
+    assert len(index) == size
@@ -0,0 +1,52 @@
+# Teste unitário do ProgressThrottle para verificar:
+# se a primeira atualização da sala sai imediatamente,
+# se dentro do intervalo apenas a mais recente fica retida,
+# se o descarte impede progresso antigo depois do evento final.
+
+
+from app.services.progress_throttle import ProgressThrottle
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.emitted = []
+
+    def __call__(self, event, payload, to):
+        self.emitted.append((event, payload["current"], to))
+
+
+def test_keeps_only_newest_pending_update():
+    emitter = FakeEmitter()
+    throttle = ProgressThrottle(emitter, max_per_second=1)
+
+    for current in range(1, 5):
+        throttle.update("sala-1", "classification_update_status", {"current": current}, to="sala-1")
+
+    assert emitter.emitted == [("classification_update_status", 1, "sala-1")]
+    assert throttle.next_due_in() > 0
+
+    throttle.flush_all()
+    assert emitter.emitted[-1] == ("classification_update_status", 4, "sala-1")
+    assert throttle.next_due_in() is None
+
+
+def test_discard_drops_pending_update():
+    emitter = FakeEmitter()
+    throttle = ProgressThrottle(emitter, max_per_second=1)
+
+    throttle.update("sala-1", "classification_update_status", {"current": 1}, to="sala-1")
+    throttle.update("sala-1", "classification_update_status", {"current": 2}, to="sala-1")
+    throttle.discard("sala-1")
+    throttle.flush_all()
+
+    assert len(emitter.emitted) == 1
+
+
+def test_disabled_emits_everything():
+    emitter = FakeEmitter()
+    throttle = ProgressThrottle(emitter, max_per_second=0)
+
+    for current in range(3):
+        throttle.update("sala-1", "classification_update_status", {"current": current}, to="sala-1")
+
+    assert len(emitter.emitted) == 3
@@ -0,0 +1,73 @@
+# Teste unitário do vigia de jobs remotos para verificar:
+# se um job travado ou expirado vira uma falha entregue pelo relay do tipo do job,
+# se a falha não é entregue duas vezes quando a mensagem final chega junto,
+# se rotas cujo hash já expirou só são retiradas dos índices,
+# se cada mensagem de progresso renova o prazo sem mensagens da rota.
+
+
+import json
+import pytest
+from app.tasks import progress_router
+
+
+@pytest.fixture
+def router(monkeypatch):
+    state = {
+        "routes": {
+            "progress-1": {"kind": "single", "task_id": "t-1", "registered_at": "0", "stall_timeout": "30"},
+            "progress-2": {"kind": "batch", "batch_id": "b-1", "registered_at": "0", "stall_timeout": "30"},
+        },
+        "relayed": [],
+        "deleted": [],
+        "touched": [],
+    }
+
+    def delete_route(channel):
+        state["deleted"].append(channel)
+        return state["routes"].pop(channel, None) is not None
+
+    def relay(route, data):
+        state["relayed"].append((route.get("task_id") or route.get("batch_id"), data))
+        return data["status"] in ("done", "failed")
+
+    monkeypatch.setattr(progress_router, "get_route", lambda channel: dict(state["routes"][channel]) if channel in state["routes"] else None)
+    monkeypatch.setattr(progress_router, "delete_route", delete_route)
+    monkeypatch.setattr(progress_router, "touch_route", lambda channel, stall_timeout: state["touched"].append((channel, stall_timeout)))
+    monkeypatch.setattr(progress_router, "mark_first_progress", lambda channel: False)
+    monkeypatch.setitem(progress_router.RELAYS, "single", relay)
+    monkeypatch.setitem(progress_router.RELAYS, "batch", relay)
+    return state
+
+
+def test_expired_jobs_fail_through_their_relay(router, monkeypatch):
+    monkeypatch.setattr(progress_router, "expired_routes", lambda limit: {"progress-1": "stalled", "progress-2": "timeout"})
+
+    assert progress_router.reap_expired_routes() == 2
+
+    relayed = dict(router["relayed"])
+    assert relayed["t-1"] == {"status": "failed", "error": progress_router.REAPED_MESSAGES["stalled"]}
+    assert relayed["b-1"] == {"status": "failed", "error": progress_router.REAPED_MESSAGES["timeout"]}
+    assert router["routes"] == {}
+
+
+def test_final_message_and_watchdog_do_not_both_deliver(router, monkeypatch):
+    monkeypatch.setattr(progress_router, "expired_routes", lambda limit: {"progress-1": "stalled"})
+    route = progress_router.get_route("progress-1")
+    progress_router.delete_route("progress-1")
+
+    assert progress_router._dispatch("progress-1", route, {"status": "failed", "error": "x"}) is False
+    assert progress_router.reap_expired_routes() == 0
+    assert router["relayed"] == []
+
+
+def test_orphan_index_entries_are_removed(router, monkeypatch):
+    monkeypatch.setattr(progress_router, "expired_routes", lambda limit: {"progress-9": "timeout"})
+
+    assert progress_router.reap_expired_routes() == 0
+    assert router["deleted"] == ["progress-9"]
+
+
+def test_progress_renews_stall_deadline(router):
+    progress_router.route_progress_message("progress-1", json.dumps({"status": "processing"}))
+
+    assert router["touched"] == [("progress-1", 30.0)]
@@ -0,0 +1,76 @@
+# Teste unitário da gravação em lote dos resultados para verificar:
+# se a linha da task criada para as classificações não a marca como concluída,
+# se o status de uma task já gravada não é alterado pelo resultado de um item,
+# se a NCM devolvida pela IA com pontos usa a mesma chave (ncm, ex) do carregador da TIPI,
+# se a classificação ligada a uma NCM excluída da TIPI nasce para revisão.
+
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.models import ClassificationStatus, TaskStatus
+from app.services import result_persistence
+
+
+class FakeSession:
+    def __init__(self, rows=()):
+        self.statements = []
+        self.rows = rows
+
+    def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return self.rows
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(result_persistence, "_upsert_partnumbers", lambda session, codes: {code: 1 for code in codes})
+    monkeypatch.setattr(result_persistence, "_upsert_manufacturers", lambda session, results: {})
+    monkeypatch.setattr(result_persistence, "_upsert_tipi", lambda session, results: {})
+    monkeypatch.setattr(result_persistence, "refresh_best_classifications", lambda session, ids: None)
+    return FakeSession()
+
+
+def test_batch_item_does_not_finish_the_batch_row(session):
+    result_persistence.bulk_upsert_results(session, [
+        {"task_id": "lote-1", "partnumber": "PN-1", "result": {"ncm": "85423190"}},
+        {"task_id": "lote-1", "partnumber": "PN-2", "result": {"ncm": "85423190"}},
+    ])
+
+    compiled = session.statements[0][0].compile(dialect=postgresql.dialect())
+    assert compiled.params["id_m0"] == "lote-1"
+    assert compiled.params["status_m0"] == TaskStatus.PROCESSING
+    assert "ON CONFLICT (id) DO NOTHING" in str(compiled)
+
+
+def test_dotted_ncm_uses_official_tipi_key():
+    session = FakeSession(rows=[(7, "85423190", "01", None)])
+
+    tipi_ids = result_persistence._upsert_tipi(session, [
+        {"result": {"ncm": "8542.31.90", "exception": "1"}},
+        {"result": {"ncm": "85423190", "exception": 1}},
+    ])
+
+    compiled = session.statements[0][0].compile(dialect=postgresql.dialect())
+    assert (compiled.params["ncm_m0"], compiled.params["ex_m0"]) == ("85423190", "01")
+    assert "ncm_m1" not in compiled.params
+    assert tipi_ids == {("85423190", "01"): (7, False)}
+
+
+def test_soft_deleted_tipi_classification_goes_to_review(session, monkeypatch):
+    monkeypatch.setattr(result_persistence, "_upsert_tipi", lambda session, results: {
+        ("85423190", None): (7, True),
+        ("84713012", None): (8, False),
+    })
+
+    result_persistence.bulk_upsert_results(session, [
+        {"task_id": "t-1", "partnumber": "PN-1", "result": {"ncm": "8542.31.90"}},
+        {"task_id": "t-2", "partnumber": "PN-2", "result": {"ncm": "8471.30.12"}},
+        {"task_id": "t-3", "partnumber": "PN-3", "result": {}},
+    ])
+
+    rows = session.statements[-1][1]
+    assert [(row["tipi_id"], row["status"]) for row in rows] == [
+        (7, ClassificationStatus.REVIEW),
+        (8, ClassificationStatus.ACTIVE),
+        (None, ClassificationStatus.ACTIVE),
+    ]
@@ -0,0 +1,90 @@
+# Teste unitário do ResultStreamConsumer para verificar:
+# se o XACK acontece somente após o handler concluir,
+# se um payload que não decodifica é confirmado na hora em vez de ficar pendente,
+# se entradas com entregas demais são descartadas na reivindicação.
+
+
+import json
+from typing import Optional
+from pydantic import BaseModel
+from app.core.codec import encode
+from app.services.result_stream import ResultStreamConsumer
+
+
+class FakeRedis:
+    def __init__(self, pending=None, claimed=None):
+        self.acked = []
+        self.pending = pending or []
+        self.claimed = claimed or []
+
+    def xack(self, stream, group, entry_id):
+        self.acked.append(entry_id)
+
+    def xpending_range(self, stream, group, min, max, count, idle):
+        return self.pending
+
+    def xclaim(self, stream, group, consumer, min_idle_time, message_ids):
+        return [entry for entry in self.claimed if entry[0] in message_ids]
+
+
+class Result(BaseModel):
+    partnumber: Optional[str] = None
+    invalid: bool = False
+
+
+def make_consumer(redis_client):
+    return ResultStreamConsumer(redis_client, Result, "web-1", block_ms=10, batch_size=10, claim_idle_ms=1000, max_deliveries=3)
+
+
+def entry(entry_id, data):
+    return (entry_id, {b"ct": b"application/msgpack", b"data": encode(data, "application/msgpack")})
+
+
+def test_ack_only_after_handler_succeeds():
+    redis_client = FakeRedis()
+    handled = []
+
+    def handler(data):
+        if data.invalid:
+            raise ValueError("payload inválido")
+        handled.append(data.partnumber)
+
+    make_consumer(redis_client).process(handler, [
+        entry(b"1-0", {"partnumber": "PN-1"}),
+        entry(b"2-0", {"invalid": True}),
+        # entradas antigas, sem content type, ainda em JSON
+        (b"3-0", {b"data": json.dumps({"partnumber": "PN-3"}).encode()}),
+    ])
+
+    assert handled == ["PN-1", "PN-3"]
+    assert redis_client.acked == [b"1-0", b"3-0"]
+
+
+def test_reclaim_drops_poison_entries_and_processes_the_rest():
+    redis_client = FakeRedis(
+        pending=[
+            {"message_id": b"1-0", "consumer": b"web-0", "time_since_delivered": 5000, "times_delivered": 1},
+            {"message_id": b"2-0", "consumer": b"web-0", "time_since_delivered": 5000, "times_delivered": 3},
+        ],
+        claimed=[entry(b"1-0", {"partnumber": "PN-1"})],
+    )
+    handled = []
+
+    make_consumer(redis_client).reclaim(lambda data: handled.append(data.partnumber))
+
+    assert handled == ["PN-1"]
+    assert redis_client.acked == [b"2-0", b"1-0"]
+
+
+def test_undecodable_entry_is_acked_without_reaching_the_handler():
+    redis_client = FakeRedis()
+    handled = []
+
+    make_consumer(redis_client).process(lambda data: handled.append(data.partnumber), [
+        (b"1-0", {b"ct": b"application/msgpack", b"data": b"\xc1"}),
+        (b"2-0", {b"ct": b"application/json"}),
+        entry(b"3-0", {"partnumber": "PN-3"}),
+    ])
+
+    assert handled == ["PN-3"]
+    assert redis_client.acked == [b"1-0", b"2-0", b"3-0"]
@@ -0,0 +1,119 @@
+# Teste unitário do histórico de eventos por sala para verificar:
+# se o emissor grava o evento em cada sala antes de emiti-lo,
+# se quem entra na sala depois do resultado final recebe o que perdeu, em ordem,
+# se eventos gravados durante a leitura do histórico também são reenviados,
+# se a entrada na sala não depende do Redis responder.
+
+
+import pytest
+import redis
+import app.events as events
+from app.services.room_events import RecordingEmitter, RoomEventLog
+
+
+class FakeRedis:
+    def __init__(self):
+        self.streams = {}
+        self.expires = {}
+        self.sequence = 0
+        self.down = False
+        self.on_xrange = None
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        pass
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.sequence += 1
+        entry_id = f"{self.sequence}-0"
+        entries = self.streams.setdefault(key, [])
+        entries.append((entry_id.encode(), {k.encode(): v.encode() for k, v in fields.items()}))
+        del entries[:-maxlen]
+        return entry_id
+
+    def expire(self, key, ttl):
+        self.expires[key] = ttl
+
+    def xrange(self, key, min="-"):
+        if self.down:
+            raise redis.ConnectionError("sem Redis")
+        entries = list(self.streams.get(key, []))
+        if self.on_xrange is not None:
+            callback, self.on_xrange = self.on_xrange, None
+            callback()
+        if min == "-":
+            return entries
+        after = int(min[1:].split("-")[0])
+        return [entry for entry in entries if int(entry[0].decode().split("-")[0]) > after]
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data, to):
+        self.emitted.append((event, data, to))
+
+
+@pytest.fixture
+def log():
+    return RoomEventLog(FakeRedis(), maxlen=3, ttl=600)
+
+
+@pytest.fixture
+def joined(monkeypatch, log):
+    state = {"rooms": [], "emitted": []}
+    monkeypatch.setattr(events, "room_event_log", log)
+    monkeypatch.setattr(events, "join_room", state["rooms"].append)
+    monkeypatch.setattr(events, "emit", lambda event, payload: state["emitted"].append((event, payload)))
+    return state
+
+
+def test_emitter_records_before_emitting(log):
+    socketio = FakeSocketIO()
+    emitter = RecordingEmitter(socketio, log)
+
+    emitter.emit("classification_finished", {"status": "done"}, to=["sala-1", "sala-2"])
+
+    assert socketio.emitted == [("classification_finished", {"status": "done"}, ["sala-1", "sala-2"])]
+    assert [event for _, event, _ in log.read("sala-2")] == ["classification_finished"]
+    assert log.redis_client.expires["room-events:sala-1"] == 600
+
+
+def test_log_keeps_only_latest_events(log):
+    for current in range(5):
+        log.record("classification_update_status", {"current": current}, "sala-1")
+
+    assert [payload["current"] for _, _, payload in log.read("sala-1")] == [2, 3, 4]
+
+
+def test_late_joiner_receives_missed_events_in_order(joined, log):
+    log.record("classification_update_status", {"status": "processing", "current": 1}, "sala-1")
+    log.record("classification_finished", {"status": "done"}, "sala-1")
+
+    events.replay_missed_events("sala-1")
+
+    assert joined["rooms"] == ["sala-1"]
+    assert joined["emitted"] == [
+        ("classification_update_status", {"status": "processing", "current": 1}),
+        ("classification_finished", {"status": "done"}),
+    ]
+
+
+def test_event_recorded_during_join_is_not_lost(joined, log):
+    log.redis_client.on_xrange = lambda: log.record("classification_finished", {"status": "done"}, "sala-1")
+
+    events.replay_missed_events("sala-1")
+
+    assert joined["emitted"] == [("classification_finished", {"status": "done"})]
+
+
+def test_join_works_without_redis(joined, log):
+    log.redis_client.down = True
+
+    events.replay_missed_events("sala-1")
+
+    assert joined["rooms"] == ["sala-1"]
+    assert joined["emitted"] == []
@@ -0,0 +1,81 @@
+# Teste unitário do relay da classificação única para verificar:
+# se o resultado já está no cache quando o registro de jobs em andamento é liberado,
+# se uma requisição idêntica que chega antes de a camada web consumir o stream
+# é respondida pelo cache em vez de iniciar um novo job.
+
+
+import fakeredis
+import pytest
+from app.schemas.classification_schemas import SingleClassificationRequest
+from app.services.classification_cache import ClassificationCache, classification_cache_key
+from app.services.classification_service import ClassificationService
+from app.services.inflight_registry import InflightRegistry
+from app.services.partnumber_index import PartnumberIndex
+from app.services.result_stream import RESULTS_STREAM_KEY
+from app.tasks import ai_classification_task
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, payload, to=None):
+        self.emitted.append((event, payload, to))
+
+
+class FakeStateStore:
+    def update(self, task_id, **fields):
+        pass
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def worker(redis_client, monkeypatch):
+    registry = InflightRegistry(redis_client, ttl=60)
+    cache = ClassificationCache(redis_client, max_entries=10, ttl=60)
+    monkeypatch.setattr(ai_classification_task, "redis_client", redis_client)
+    monkeypatch.setattr(ai_classification_task, "inflight_registry", registry)
+    monkeypatch.setattr(ai_classification_task, "classification_cache", cache)
+    monkeypatch.setattr(ai_classification_task, "task_state_store", FakeStateStore())
+    monkeypatch.setattr(ai_classification_task, "external_socketio", FakeEmitter())
+    monkeypatch.setattr(ai_classification_task, "enqueue_result", lambda *args: None)
+    return registry
+
+
+def test_identical_request_after_release_hits_the_cache(worker, redis_client, monkeypatch):
+    cache_key = classification_cache_key("STM32F411CEU6")
+    worker.acquire(cache_key, "task-1", "sala-1")
+    # cache da camada web: outro processo, mesmo Redis
+    web_cache = ClassificationCache(redis_client, max_entries=10, ttl=60)
+
+    release = worker.release
+    seen_at_release = []
+
+    def checking_release(key, task_id):
+        seen_at_release.append(web_cache.get(key))
+        return release(key, task_id)
+
+    monkeypatch.setattr(worker, "release", checking_release)
+
+    route = {"task_id": "task-1", "room_id": "sala-1", "cache_key": cache_key, "partnumber": "STM32F411CEU6"}
+    finished = ai_classification_task.relay_single_message(route, {"status": "done", "result": {"ncm": "85423190", "confidence_score": 0.97}})
+
+    assert finished is True
+    assert seen_at_release == [{"partnumber": "STM32F411CEU6", "result": {"ncm": "85423190", "confidence_score": 0.97}}]
+
+    # o resultado ainda não foi consumido pela camada web
+    assert redis_client.xlen(RESULTS_STREAM_KEY) == 1
+    service = ClassificationService(
+        task_client=None,
+        cache=web_cache,
+        partnumber_index=PartnumberIndex(max_candidates=10, load_batch_size=10, enabled=False),
+        match_threshold=0.9,
+        hint_threshold=0.7,
+    )
+    response = service.get_cached_classification(SingleClassificationRequest(partnumber="stm32f411ceu6"))
+    assert response.status == "done"
+    assert response.result.ncm == "85423190"
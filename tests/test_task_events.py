@@ -0,0 +1,163 @@
+# Teste unitário dos eventos de task por SSE e long-poll para verificar:
+# se cada mudança de status gravada no estado da task entra no stream dela e avisa o canal,
+# se o stream SSE retoma a partir do Last-Event-ID e termina no evento final,
+# se sem histórico o cliente recebe o estado atual,
+# se o long-poll espera o aviso de um novo evento e devolve o id para a próxima chamada,
+# se tasks desconhecidas retornam 404.
+
+
+import json
+import threading
+from contextlib import contextmanager
+import pytest
+from app import create_app
+from app.containers import Container
+from app.services.task_events import TASK_EVENTS_CHANNEL, parse_event_id
+from app.services.task_state import TaskStateStore
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pipe = FakePipeline()
+
+    def pipeline(self, transaction=False):
+        return self.pipe
+
+
+def test_status_change_is_appended_to_task_stream():
+    redis_client = FakeRedis()
+    store = TaskStateStore(redis_client, ttl=60, events_maxlen=50, events_ttl=30)
+
+    store.update("task-1", job_id="job-1")
+    store.update("task-1", status="processing", current=1, total=3, progress_channel="progress-1")
+
+    calls = {name: (args, kwargs) for name, args, kwargs in redis_client.pipe.calls}
+    args, kwargs = calls["xadd"]
+    assert args[0] == "task-events:task-1"
+    assert args[1]["event"] == "processing"
+    assert json.loads(args[1]["data"]) == {"status": "processing", "current": 1, "total": 3}
+    assert kwargs["maxlen"] == 50
+    assert calls["publish"][0] == (TASK_EVENTS_CHANNEL, "task-1")
+    assert [name for name, _, _ in redis_client.pipe.calls].count("xadd") == 1
+
+
+def test_invalid_event_id_restarts_from_beginning():
+    assert parse_event_id("1718000000000-3") == "1718000000000-3"
+    assert parse_event_id("abc") == "0-0"
+    assert parse_event_id(None) == "0-0"
+
+
+class FakeHub:
+    def __init__(self):
+        self.streams = {}
+        self.reads = []
+        self.on_wait = None
+
+    def read(self, task_id, after="0-0"):
+        self.reads.append((task_id, after))
+        return [event for event in self.streams.get(task_id, []) if event[0] > after]
+
+    @contextmanager
+    def subscribe(self, task_id):
+        waiter = threading.Event()
+        original_wait = waiter.wait
+
+        def wait(timeout=None):
+            if self.on_wait is not None:
+                self.on_wait()
+                waiter.set()
+            return original_wait(0)
+
+        waiter.wait = wait
+        yield waiter
+
+
+class FakeTaskStateStore:
+    states = {
+        "task-2": {"status": "processing", "current": 1, "total": 4, "room_id": "sala-2", "updated_at": 1.0},
+    }
+
+    def get(self, task_id):
+        return self.states.get(task_id)
+
+
+@pytest.fixture
+def hub():
+    hub = FakeHub()
+    hub.streams["task-1"] = [
+        ("1-0", "started", {"status": "started"}),
+        ("2-0", "processing", {"status": "processing", "current": 1, "total": 2}),
+        ("3-0", "done", {"status": "done", "result": {"ncm": "85423190"}}),
+    ]
+    return hub
+
+
+@pytest.fixture
+def client(hub):
+    container = Container()
+    container.task_state_store.override(FakeTaskStateStore())
+    container.task_event_hub.override(hub)
+
+    app = create_app(container)
+    app.config["TESTING"] = True
+
+    with app.test_client() as client:
+        yield client
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_sse_resumes_after_last_event_id(client):
+    response = client.get("/tasks/task-1/events", headers={"Last-Event-ID": "1-0"})
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/event-stream")
+    events = parse_sse(response.get_data(as_text=True))
+    assert [event_id for event_id, _, _ in events] == ["2-0", "3-0"]
+    assert events[-1][2]["result"] == {"ncm": "85423190"}
+
+
+def test_sse_without_history_starts_from_current_state(client, hub):
+    def finish():
+        hub.streams["task-2"] = [("5-0", "failed", {"status": "failed", "message": "Erro"})]
+    hub.on_wait = finish
+
+    events = parse_sse(client.get("/tasks/task-2/events").get_data(as_text=True))
+
+    assert events[0] == (None, "processing", {"status": "processing", "current": 1, "total": 4})
+    assert events[1][:2] == ("5-0", "failed")
+
+
+def test_long_poll_waits_for_next_event(client, hub):
+    hub.streams["task-2"] = [("4-0", "processing", {"status": "processing", "current": 1, "total": 4})]
+    hub.on_wait = lambda: hub.streams["task-2"].append(("5-0", "done", {"status": "done"}))
+
+    response = client.get("/tasks/task-2/events/poll?after=4-0&timeout=1")
+
+    data = response.get_json()
+    assert [event["id"] for event in data["events"]] == ["5-0"]
+    assert data["last_event_id"] == "5-0"
+    assert data["finished"] is True
+
+
+def test_unknown_task_returns_404(client):
+    assert client.get("/tasks/desconhecida/events").status_code == 404
+    assert client.get("/tasks/desconhecida/events/poll").status_code == 404
@@ -0,0 +1,46 @@
+# Teste unitário de TaskStatusResource para verificar:
+# se retorna o estado ao vivo do Redis,
+# se retorna 404 para tasks desconhecidas.
+
+
+import pytest
+from app import create_app
+from app.containers import Container
+
+
+class FakeTaskStateStore:
+    states = {
+        "task-1": {"status": "processing", "current": 2, "total": 5, "message": "Analisando dados...", "room_id": "sala-1"},
+    }
+
+    def get(self, task_id):
+        return self.states.get(task_id)
+
+
+@pytest.fixture
+def client():
+    container = Container()
+    container.task_state_store.override(FakeTaskStateStore())
+
+    app = create_app(container)
+    app.config["TESTING"] = True
+
+    with app.test_client() as client:
+        yield client
+
+
+def test_task_status_live_state(client):
+    response = client.get("/tasks/task-1")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["source"] == "live"
+    assert data["status"] == "processing"
+    assert data["current"] == 2
+
+
+def test_task_status_not_found(client):
+    response = client.get("/tasks/desconhecida")
+
+    assert response.status_code == 404
+    assert "error" in response.get_json()
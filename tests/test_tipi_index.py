@@ -0,0 +1,81 @@
+# Teste unitário do TipiIndex para verificar:
+# se a consulta por NCM traz as exceções e a hierarquia de níveis,
+# se a busca combina termos da descrição (último como prefixo) e prefixo de NCM,
+# se o índice só é reconstruído quando a assinatura da tabela muda.
+
+
+from decimal import Decimal
+from app.services.tipi_index import TipiIndex
+
+
+ROWS = [
+    (1, "84", None, "Reatores nucleares, caldeiras, máquinas e aparelhos mecânicos", None),
+    (2, "8471", None, "Máquinas automáticas para processamento de dados", None),
+    (3, "8471.30.12", None, "Portáteis, com teclado alfanumérico", Decimal("0.00")),
+    (4, "8471.30.12", "01", "Ex 01 - Com tela sensível ao toque", Decimal("5.00")),
+    (5, "8542.31.90", None, "Outros circuitos integrados processadores", Decimal("0.00")),
+]
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def one(self):
+        return self.value
+
+    def all(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, rows, signature=(5, 5, None)):
+        self.rows = rows
+        self.signature = signature
+        self.row_loads = 0
+
+    def execute(self, stmt):
+        if len(stmt.selected_columns) == 3:
+            return FakeResult(self.signature)
+        self.row_loads += 1
+        return FakeResult(self.rows)
+
+
+def build_index(session):
+    index = TipiIndex(check_interval=0)
+    index.ensure_fresh(session)
+    return index
+
+
+def test_lookup_returns_exceptions_and_hierarchy():
+    index = build_index(FakeSession(ROWS))
+
+    found = index.lookup("8471.30.12")
+
+    assert found["level"] == "subitem"
+    assert [e["ex"] for e in found["entries"]] == [None, "01"]
+    assert [h["level"] for h in found["hierarchy"]] == ["capitulo", "posicao"]
+    assert index.lookup("84713099") is None
+
+
+def test_search_by_tokens_and_prefix():
+    index = build_index(FakeSession(ROWS))
+
+    assert [e["id"] for e in index.search("maquinas process")] == [2]
+    assert [e["id"] for e in index.search("process")] == [2, 5]
+    assert [e["id"] for e in index.search("process", prefix="85")] == [5]
+    assert [e["id"] for e in index.search(prefix="8471.30")] == [3, 4]
+
+
+def test_rebuilds_only_when_signature_changes():
+    session = FakeSession(ROWS)
+    index = build_index(session)
+
+    index.ensure_fresh(session)
+    assert session.row_loads == 1
+
+    session.signature = (6, 6, None)
+    session.rows = ROWS + [(6, "8542.32.00", None, "Memórias", None)]
+    index.ensure_fresh(session)
+    assert session.row_loads == 2
+    assert index.lookup("85423200") is not None
@@ -0,0 +1,48 @@
+# Teste unitário do carregador da TIPI para verificar:
+# se o cabeçalho oficial é reconhecido e as linhas normalizadas (NCM, EX, alíquota),
+# se linhas sem NCM e chaves duplicadas são ignoradas,
+# se o CSV gerado para o COPY representa NULL como campo vazio.
+
+
+from decimal import Decimal
+import pytest
+from app.services.tipi_loader import TipiFileError, _CsvStream, normalize_rows
+
+
+OFFICIAL_ROWS = [
+    ["NCM", "EX", "DESCRIÇÃO", "ALÍQUOTA (%)"],
+    ["Capítulo 84", None, "Reatores nucleares, caldeiras, máquinas", None],
+    ["84.71", "", "Máquinas automáticas para processamento de dados", ""],
+    ["8471.30.12", "", "Portáteis, com teclado alfanumérico", "0"],
+    ["8471.30.12", "1", "Com tela sensível ao toque", "6,5"],
+    ["8471.30.12", "01", "Duplicada", "7"],
+    ["", "", "Nota: texto explicativo", ""],
+    ["2402.20.00", "", "Cigarros que contenham tabaco", "NT"],
+]
+
+
+def test_normalize_official_rows():
+    rows = list(normalize_rows(OFFICIAL_ROWS))
+
+    assert rows == [
+        ("84", None, "Reatores nucleares, caldeiras, máquinas", None),
+        ("8471", None, "Máquinas automáticas para processamento de dados", None),
+        ("84713012", None, "Portáteis, com teclado alfanumérico", Decimal("0.00")),
+        ("84713012", "01", "Com tela sensível ao toque", Decimal("6.50")),
+        ("24022000", None, "Cigarros que contenham tabaco", None),
+    ]
+
+
+def test_missing_ncm_column_raises():
+    with pytest.raises(TipiFileError):
+        list(normalize_rows([["Produto", "Descrição"]]))
+
+
+def test_copy_stream_writes_nulls_as_empty_fields():
+    stream = _CsvStream([("84713012", None, 'Texto com "aspas", vírgula', Decimal("6.50"))])
+
+    data = b""
+    while chunk := stream.read(8):
+        data += chunk
+
+    assert data.decode("utf-8") == '84713012,,"Texto com ""aspas"", vírgula",6.50\n'
@@ -0,0 +1,72 @@
+# Teste unitário do trace de ponta a ponta para verificar:
+# se o trace atual e o span saem no log JSON,
+# se o trace recebido em X-Trace-Id é continuado e devolvido pela API,
+# se o trace viaja no cabeçalho da mensagem do Celery e é restaurado no worker.
+
+
+import json
+import logging
+from celery import signals
+from app import create_app
+from app.containers import Container
+from app.core import tracing
+from app.core.logger_config import JsonFormatter, TraceIdFilter
+from app.core.tracing import TRACE_HEADER, current_trace_id, use_trace
+
+
+class FakeService:
+    def get_cached_classification(self, schema):
+        return None
+
+    def start_single_classification(self, schema):
+        return "fake-task-id"
+
+
+def test_json_log_carries_trace_and_span():
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "span x", None, None)
+    record.span = {"name": "x", "duration_ms": 1.5}
+    with use_trace("trace-1"):
+        TraceIdFilter().filter(record)
+
+    logged = json.loads(JsonFormatter().format(record))
+
+    assert logged["trace_id"] == "trace-1"
+    assert logged["span"]["name"] == "x"
+
+
+def test_api_continues_received_trace(monkeypatch):
+    spans = []
+    monkeypatch.setattr(tracing, "record_span", lambda name, start, duration, **attrs: spans.append((name, current_trace_id(), attrs)))
+    container = Container()
+    container.classification_service.override(FakeService())
+    app = create_app(container)
+
+    with app.test_client() as client:
+        response = client.post(
+            "/classify-partnumber",
+            data=json.dumps({"partnumber": "PN-1"}),
+            content_type="application/json",
+            headers={TRACE_HEADER: "trace-from-client"},
+        )
+
+    assert response.status_code == 202
+    assert response.headers[TRACE_HEADER] == "trace-from-client"
+    assert ("http.classify_partnumber", "trace-from-client", {"status": 202, "task_id": "fake-task-id"}) in spans
+
+
+def test_trace_travels_in_celery_headers():
+    headers = {}
+    with use_trace("trace-2"):
+        signals.before_task_publish.send(sender="ai_classification_task", headers=headers, body=None)
+
+    class Request:
+        trace_id = headers["trace_id"]
+
+    class Task:
+        name = "ai_classification_task"
+        request = Request()
+
+    signals.task_prerun.send(sender=Task, task_id="task-1", task=Task)
+    assert current_trace_id() == "trace-2"
+    signals.task_postrun.send(sender=Task, task_id="task-1", task=Task, state="SUCCESS")
+    assert current_trace_id() is None
@@ -0,0 +1,120 @@
+# Teste unitário da ingestão de planilhas para verificar:
+# se o CSV é lido de um stream não seekable, com cabeçalho em português,
+# se o XLSX é lido em modo streaming,
+# se linhas inválidas viram erros com o número da linha e as válidas saem em chunks,
+# se nenhum lote é criado quando não há linha válida.
+
+
+import io
+import pytest
+from app.services.classification_service import ClassificationService
+from app.services.upload_ingestion import UploadFileError, read_upload_rows, upload_format
+
+
+class NonSeekableStream(io.RawIOBase):
+    """Simula o corpo cru da requisição: só leitura sequencial."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._data.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class FakeTaskClient:
+    def __init__(self):
+        self.chunks = []
+
+    def run_streamed_batch_classification_task(self, room_id, chunks):
+        for chunk in chunks:
+            self.chunks.append(chunk)
+        return "upload-batch-id"
+
+
+CSV = (
+    "Partnumber;Descrição;Fabricante\n"
+    "PN-0001;Resistor 10k;Yageo\n"
+    ";;\n"
+    "X;Curto demais;\n"
+    "PN-0002;;\n"
+    "PN-0003;Capacitor;Murata\n"
+).encode("utf-8")
+
+
+def test_upload_format_by_extension_or_content_type():
+    assert upload_format("itens.CSV", None) == "csv"
+    assert upload_format(None, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet") == "xlsx"
+    with pytest.raises(UploadFileError):
+        upload_format("itens.pdf", "application/pdf")
+
+
+def test_csv_read_from_non_seekable_stream():
+    rows = list(read_upload_rows(NonSeekableStream(CSV), "csv"))
+
+    assert rows == [
+        (2, {"partnumber": "PN-0001", "description": "Resistor 10k", "manufacturer": "Yageo"}),
+        (4, {"partnumber": "X", "description": "Curto demais"}),
+        (5, {"partnumber": "PN-0002"}),
+        (6, {"partnumber": "PN-0003", "description": "Capacitor", "manufacturer": "Murata"}),
+    ]
+
+
+def test_xlsx_rows():
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.active.append(["PN", "Fornecedor"])
+    workbook.active.append(["PN-0001", "Arrow"])
+    workbook.active.append([12345, None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    rows = list(read_upload_rows(NonSeekableStream(buffer.getvalue()), "xlsx"))
+
+    assert rows == [(2, {"partnumber": "PN-0001", "supplier": "Arrow"}), (3, {"partnumber": "12345"})]
+
+
+def test_missing_partnumber_column_raises_before_any_row():
+    with pytest.raises(UploadFileError):
+        read_upload_rows(io.BytesIO(b"codigo;descricao\nA;B\n"), "csv")
+
+
+def test_valid_rows_are_chunked_and_invalid_rows_reported():
+    task_client = FakeTaskClient()
+    service = ClassificationService(task_client, cache=None, chunk_size=2)
+
+    report = service.start_upload_classification(read_upload_rows(io.BytesIO(CSV), "csv"), room_id="room-1")
+
+    assert report.task_id == "upload-batch-id"
+    assert report.total == 3
+    assert report.rejected == 1
+    assert report.errors[0].line == 4
+    assert report.errors[0].field == "partnumber"
+    assert [len(chunk) for chunk in task_client.chunks] == [2, 1]
+    assert task_client.chunks[0][1] == {"partnumber": "PN-0002"}
+
+
+def test_row_limit_stops_reading():
+    task_client = FakeTaskClient()
+    service = ClassificationService(task_client, cache=None, chunk_size=10, upload_max_rows=2)
+
+    report = service.start_upload_classification(read_upload_rows(io.BytesIO(CSV), "csv"), room_id="room-1")
+
+    assert report.total + report.rejected == 3
+    assert "Limite de 2 linhas" in report.errors[-1].message
+
+
+def test_no_valid_rows_creates_no_batch():
+    task_client = FakeTaskClient()
+    service = ClassificationService(task_client, cache=None)
+
+    report = service.start_upload_classification(iter([(2, {"partnumber": "X"})]), room_id="room-1")
+
+    assert report.task_id is None
+    assert report.rejected == 1
+    assert task_client.chunks == []
@@ -0,0 +1,85 @@
+"""
+Reconstrói a cascata de spans de uma classificação a partir dos logs JSON.
+
+    python trace_waterfall.py <task_id ou trace_id> [--logs "logs/*.json*"]
+
+Os logs de todos os processos (web, worker, roteador de progresso) precisam
+estar acessíveis pelo padrão informado, incluindo os arquivos rotacionados.
+"""
+import argparse
+import glob
+import json
+import sys
+from typing import Dict, Iterator, List, Set
+
+
+BAR_WIDTH = 50
+
+
+def iter_spans(paths: List[str]) -> Iterator[Dict]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if '"span"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("span") and record.get("trace_id"):
+                    yield record
+
+
+def resolve_trace_ids(paths: List[str], key: str) -> Set[str]:
+    """O argumento pode ser o próprio trace_id ou o id de uma task/lote registrado em algum span."""
+    trace_ids = set()
+    for record in iter_spans(paths):
+        if record["trace_id"] == key or record["span"].get("task_id") == key:
+            trace_ids.add(record["trace_id"])
+    return trace_ids
+
+
+def render(spans: List[Dict]) -> str:
+    spans.sort(key=lambda s: s["start"])
+    origin = spans[0]["start"]
+    total_ms = max((s["start"] - origin) * 1000 + s["duration_ms"] for s in spans) or 1.0
+    scale = BAR_WIDTH / total_ms
+    name_width = max(len(s["name"]) for s in spans)
+
+    lines = []
+    for s in spans:
+        offset_ms = (s["start"] - origin) * 1000
+        bar_start = int(offset_ms * scale)
+        bar = " " * bar_start + "█" * max(1, int(s["duration_ms"] * scale))
+        extras = {k: v for k, v in s.items() if k not in ("name", "span_id", "start", "duration_ms")}
+        lines.append(
+            f"{s['name']:<{name_width}}  +{offset_ms:>10.1f}ms  {s['duration_ms']:>10.1f}ms  "
+            f"|{bar:<{BAR_WIDTH}}|  {json.dumps(extras, ensure_ascii=False)}"
+        )
+    lines.append(f"total: {total_ms:.1f}ms em {len(spans)} span(s)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cascata de spans de uma classificação.")
+    parser.add_argument("id", help="task_id, batch_id ou trace_id")
+    parser.add_argument("--logs", default="logs/*.json*", help="padrão glob dos arquivos de log JSON")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.logs))
+    if not paths:
+        sys.exit(f"Nenhum arquivo de log encontrado em {args.logs}.")
+
+    trace_ids = resolve_trace_ids(paths, args.id)
+    if not trace_ids:
+        sys.exit(f"Nenhum span encontrado para {args.id}.")
+
+    for trace_id in sorted(trace_ids):
+        spans = [record["span"] for record in iter_spans(paths) if record["trace_id"] == trace_id]
+        print(f"trace {trace_id}")
+        print(render(spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()